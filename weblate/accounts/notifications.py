@@ -198,6 +198,27 @@ def notify_new_translation(unit, oldunit, user):
     send_mails(mails)
 
 
+def notify_new_translations(translation, units, user):
+    """Notify subscribed users about new translations of units.
+
+    Subscriptions are looked up once for all units, which are expected to
+    belong to given translation and to have old_unit set.
+    """
+    mails = []
+    subscriptions = Profile.objects.subscribed_any_translation(
+        translation.subproject.project,
+        translation.language,
+        user
+    )
+    for subscription in subscriptions:
+        for unit in units:
+            mails.append(
+                send_any_translation(subscription, unit, unit.old_unit)
+            )
+
+    send_mails(mails)
+
+
 def notify_new_contributor(unit, user):
     """Notify about new contributor."""
     mails = []
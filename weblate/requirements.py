@@ -267,6 +267,13 @@ def get_versions():
         '3.4',
     ))
 
+    result.append(get_single(
+        'Requests',
+        'http://python-requests.org/',
+        'requests',
+        '2.5',
+    ))
+
     return result
 
 
@@ -522,8 +522,9 @@ EMAIL_SUBJECT_PREFIX = '[{0}] '.format(SITE_TITLE)
 # Enable remote hooks
 ENABLE_HOOKS = True
 
-# Whether to run hooks in background
-BACKGROUND_HOOKS = True
+# Whether to queue repository updates triggered by hooks, these are
+# processed by the run_updates management command
+BACKGROUND_HOOKS = False
 
 # Number of nearby messages to show in each direction
 NEARBY_MESSAGES = 5
@@ -531,6 +532,9 @@ NEARBY_MESSAGES = 5
 # Enable lazy commits
 LAZY_COMMITS = True
 
+# Delay writing translation files
+LAZY_WRITES = False
+
 # Offload indexing
 OFFLOAD_INDEXING = False
 
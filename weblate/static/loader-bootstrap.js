@@ -350,17 +350,40 @@ function failedMachineTranslation(jqXHR, textStatus, errorThrown) {
     );
 }
 
-function loadMachineTranslations(data, textStatus) {
-    decreaseLoading('#mt-loading');
-    data.forEach(function (el, idx) {
-        increaseLoading('#mt-loading');
-        $.ajax({
-            url: $('#js-translate').attr('href') + '?service=' + el,
-            success: processMachineTranslation,
-            error: failedMachineTranslation,
-            dataType: 'json'
-        });
+function processMachineTranslationLines(text, processed) {
+    var end = text.lastIndexOf('\n');
+    if (end < processed) {
+        return processed;
+    }
+    text.substring(processed, end).split('\n').forEach(function (line) {
+        if (line !== '') {
+            increaseLoading('#mt-loading');
+            processMachineTranslation(JSON.parse(line));
+        }
     });
+    return end + 1;
+}
+
+function loadMachineTranslations() {
+    /* The results are streamed as JSON lines as the services respond */
+    var xhr = new XMLHttpRequest();
+    var processed = 0;
+    xhr.open('GET', $('#js-translate-all').attr('href'));
+    xhr.onprogress = function () {
+        processed = processMachineTranslationLines(xhr.responseText, processed);
+    };
+    xhr.onload = function () {
+        if (xhr.status !== 200) {
+            failedMachineTranslation(xhr, xhr.statusText);
+            return;
+        }
+        processMachineTranslationLines(xhr.responseText, processed);
+        decreaseLoading('#mt-loading');
+    };
+    xhr.onerror = function () {
+        failedMachineTranslation(xhr, xhr.statusText);
+    };
+    xhr.send();
 }
 
 function isNumber(n) {
@@ -623,12 +646,7 @@ $(function () {
         }
         machineTranslationLoaded = true;
         increaseLoading('#mt-loading');
-        $.ajax({
-            url: $('#js-mt-services').attr('href'),
-            success: loadMachineTranslations,
-            error: failedMachineTranslation,
-            dataType: 'json'
-        });
+        loadMachineTranslations();
     });
 
     /* Git commit tooltip */
@@ -32,7 +32,9 @@ import django
 
 import six
 
-from weblate.trans.models import SubProject, IndexUpdate
+from weblate.trans.filelock import STATS as LOCK_STATS
+from weblate.trans.machine import MACHINE_TRANSLATION_SERVICES
+from weblate.trans.models import SubProject, IndexUpdate, UpdateJob
 from weblate import settings_example
 from weblate.accounts.avatar import HAS_LIBRAVATAR
 from weblate.trans.util import (
@@ -140,6 +142,22 @@ def performance(request):
             'production-indexing',
             IndexUpdate.objects.count(),
         ))
+    # Check queued repository updates
+    if settings.BACKGROUND_HOOKS:
+        pending_updates = UpdateJob.objects.pending().count()
+        if pending_updates < 20:
+            repo_updates = True
+        elif pending_updates < 200:
+            repo_updates = None
+        else:
+            repo_updates = False
+
+        checks.append((
+            _('Repository updates processing'),
+            repo_updates,
+            'production-updates',
+            pending_updates,
+        ))
     # Check for sane caching
     caches = settings.CACHES['default']['BACKEND'].split('.')[-1]
     if caches in ['MemcachedCache', 'PyLibMCCache', 'DatabaseCache']:
@@ -165,6 +183,53 @@ def performance(request):
         settings.CACHES['avatar']['BACKEND']
         if 'avatar' in settings.CACHES else '',
     ))
+    # Machine translation caching
+    mt_stats = [
+        '{0}: {1[hits]} hits, {1[misses]} misses'.format(
+            service.name, service.get_cache_stats()
+        )
+        for dummy, service in MACHINE_TRANSLATION_SERVICES.items()
+        if service.cache_translations
+    ]
+    checks.append((
+        _('Machine translation caching'),
+        'machine-translation' in settings.CACHES,
+        'production-cache-machine-translation',
+        ', '.join(mt_stats),
+    ))
+    # Machine translation services health
+    mt_health = []
+    mt_disabled = False
+    for dummy, service in MACHINE_TRANSLATION_SERVICES.items():
+        if service.latency.total == 0:
+            continue
+        mt_health.append('{0}: {1} requests, 95% within {2} s{3}'.format(
+            service.name,
+            service.latency.total,
+            service.latency.percentile(95),
+            ' (disabled)' if service.circuit.is_open else '',
+        ))
+        mt_disabled |= service.circuit.is_open
+    checks.append((
+        _('Machine translation services'),
+        not mt_disabled,
+        'production-machine-translation',
+        ', '.join(mt_health),
+    ))
+    # Waiting for repository locks in this process
+    checks.append((
+        _('Repository locking'),
+        LOCK_STATS.timeouts == 0,
+        'production-locking',
+        '{0} acquired, {1} contended (average wait {2:.3f} s, '
+        'maximal {3:.3f} s), {4} timeouts'.format(
+            LOCK_STATS.acquired,
+            LOCK_STATS.contended,
+            LOCK_STATS.wait_avg,
+            LOCK_STATS.wait_max,
+            LOCK_STATS.timeouts,
+        ),
+    ))
     # Check email setup
     default_mails = (
         'root@localhost',
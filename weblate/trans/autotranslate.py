@@ -19,17 +19,37 @@
 #
 
 from django.core.exceptions import PermissionDenied
-from django.db import transaction
 
 from weblate.permissions.helpers import can_access_project
+from weblate.trans.bulk import store_units
 from weblate.trans.models import Unit, Change, SubProject
+from weblate.trans.util import join_plural
+
+
+def get_source_map(sources, units):
+    """Return mapping of source strings to target and fuzzy flag.
+
+    The first matching unit is used for each source string.
+    """
+    result = {}
+    matching = sources.filter(
+        source__in=units.values('source')
+    ).values_list(
+        'source', 'target', 'fuzzy'
+    )
+    for source, target, fuzzy in matching.iterator():
+        if source not in result:
+            result[source] = (target, fuzzy)
+    return result
 
 
 def auto_translate(user, translation, source, inconsistent, overwrite,
-                   check_acl=True):
-    """Perform automatic translation based on other components."""
-    updated = 0
+                   check_acl=True, progress=None):
+    """Perform automatic translation based on other components.
 
+    The optional progress is called with number of processed and total
+    units.
+    """
     if inconsistent:
         units = translation.unit_set.filter_type(
             'check:inconsistent', translation
@@ -63,25 +83,73 @@ def auto_translate(user, translation, source, inconsistent, overwrite,
 
     translation.commit_pending(None)
 
+    source_map = get_source_map(sources, units)
+
+    changed = []
     for unit in units.iterator():
-        with transaction.atomic():
-            # Get first matching entry
-            update = sources.filter(source=unit.source)[0]
-            # No save if translation is same
-            if unit.fuzzy == update.fuzzy and unit.target == update.target:
-                continue
-            # Copy translation
-            unit.fuzzy = update.fuzzy
-            unit.target = update.target
-            # Create signle change object for whole merge
-            Change.objects.create(
-                action=Change.ACTION_AUTO,
-                unit=unit,
-                user=user,
-                author=user
-            )
-            # Save unit to backend
-            unit.save_backend(None, False, False, user=user)
-            updated += 1
-
-    return updated
+        if unit.source not in source_map:
+            continue
+        target, fuzzy = source_map[unit.source]
+        # No save if translation is same
+        if unit.fuzzy == fuzzy and unit.target == target:
+            continue
+        # Copy translation
+        unit.fuzzy = fuzzy
+        unit.target = target
+        changed.append(unit)
+
+    return store_units(
+        user, translation, changed, Change.ACTION_AUTO, progress
+    )
+
+
+def machine_translate(user, translation, service, overwrite=False,
+                      progress=None):
+    """Perform automatic translation using machine translation service.
+
+    The best translation for each string is used and the units are marked
+    as fuzzy. The optional progress is called with number of processed
+    and total units.
+    """
+    if overwrite:
+        units = translation.unit_set.all()
+    else:
+        units = translation.unit_set.filter(translated=False)
+    units = list(units)
+
+    texts = sorted({
+        text for unit in units for text in unit.get_source_plurals()
+    })
+    results = dict(zip(
+        texts,
+        service.translate_batch(
+            translation.subproject.project.source_language.code,
+            translation.language.code,
+            texts
+        )
+    ))
+
+    changed = []
+    for unit in units:
+        sources = unit.get_source_plurals()
+        if unit.is_plural():
+            # Use plural source for all plural forms except the first one
+            sources = [
+                sources[min(plural, len(sources) - 1)]
+                for plural in range(translation.language.nplurals)
+            ]
+        targets = []
+        for source in sources:
+            if not results[source]:
+                break
+            best = max(results[source], key=lambda item: item['quality'])
+            targets.append(best['text'])
+        if len(targets) != len(sources):
+            continue
+        unit.target = join_plural(targets)
+        unit.fuzzy = True
+        changed.append(unit)
+
+    return store_units(
+        user, translation, changed, Change.ACTION_AUTO, progress
+    )
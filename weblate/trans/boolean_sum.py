@@ -21,12 +21,16 @@
 from django.db.models import Sum, When, Case, IntegerField
 
 
-def do_boolean_sum(field):
-    """Wrapper to generate SUM on boolean values"""
+def do_boolean_sum(field, value=1):
+    """Wrapper to generate SUM on boolean values
+
+    Optionally the value can be field name to sum only where the boolean
+    is set.
+    """
     cond = {field: True}
     return Sum(
         Case(
-            When(then=1, **cond),
+            When(then=value, **cond),
             default=0,
             output_field=IntegerField()
         )
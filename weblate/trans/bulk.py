@@ -0,0 +1,844 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Bulk database operations on translation units."""
+
+from __future__ import unicode_literals
+
+from collections import defaultdict
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, When, Value, Q
+from django.http import HttpRequest
+from django.utils import timezone
+
+from weblate.accounts.models import get_author_name
+from weblate.accounts.notifications import notify_new_translations
+from weblate.logger import LOGGER
+from weblate.trans.checks import CHECKS
+from weblate.trans.memory import TRANSLATION_MEMORY
+from weblate.trans.models.change import Change
+from weblate.trans.models.check import Check
+from weblate.trans.models.comment import Comment
+from weblate.trans.models.source import Source
+from weblate.trans.models.suggestion import Suggestion
+from weblate.trans.models.unit import Unit
+from weblate.trans.search import update_index_units
+
+# Number of objects processed in single query
+BATCH_SIZE = 500
+
+# Keep number of query parameters bellow SQLite limit of 999
+MAX_PARAMS = 900
+
+UNIT_UPDATE_FIELDS = (
+    'position', 'location', 'flags', 'source', 'target', 'fuzzy',
+    'translated', 'comment', 'content_hash', 'previous_source', 'priority',
+    'num_words', 'has_comment', 'has_suggestion',
+)
+
+
+def chunks(items, size=BATCH_SIZE):
+    """Split list into chunks of given size."""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def bulk_update(model, objects, fields):
+    """Update fields of already saved objects using CASE expressions."""
+    model_fields = [model._meta.get_field(field) for field in fields]
+    size = max(1, MAX_PARAMS // (2 * len(fields) + 1))
+    for batch in chunks(objects, size):
+        updates = {}
+        for field in model_fields:
+            updates[field.attname] = Case(
+                *[
+                    When(pk=obj.pk, then=Value(getattr(obj, field.attname)))
+                    for obj in batch
+                ],
+                output_field=field
+            )
+        model.objects.filter(
+            pk__in=[obj.pk for obj in batch]
+        ).update(**updates)
+
+
+def filter_hashes(queryset, hashes):
+    """Return set of content hashes present in the queryset."""
+    result = set()
+    for batch in chunks(hashes):
+        result.update(
+            queryset.filter(
+                content_hash__in=batch
+            ).values_list(
+                'content_hash', flat=True
+            ).distinct()
+        )
+    return result
+
+
+class BulkChecks(object):
+    """Quality checks of many units at once.
+
+    Loads existing checks for all the units at once, evaluates the checks
+    in memory and writes the differences in batches. The failing check
+    flags and translation stats are updated once at the end.
+    """
+    def __init__(self):
+        # Tuples of unit, same_state, same_content and is_new
+        self.units = []
+        # Existing checks, indexed by (project, language, content_hash)
+        self.checks = defaultdict(dict)
+        # Checks to create, indexed by (project, language, content_hash)
+        self.created = defaultdict(dict)
+        self.deleted = set()
+        # Keys of checks to update failing checks flag for
+        self.changed = set()
+        # Results of checks evaluated for all units at once
+        self.bulk_results = {}
+
+    def add(self, unit, same_state=True, same_content=True, is_new=False):
+        """Add unit to check."""
+        self.units.append((unit, same_state, same_content, is_new))
+
+    @staticmethod
+    def get_keys(unit):
+        """Return keys of target and source checks for unit."""
+        project_id = unit.translation.subproject.project_id
+        return (
+            (project_id, unit.translation.language_id, unit.content_hash),
+            (project_id, None, unit.content_hash),
+        )
+
+    def load_checks(self):
+        """Load existing checks for all units."""
+        hashes = defaultdict(set)
+        languages = defaultdict(set)
+        for unit, dummy, dummy, dummy in self.units:
+            target_key = self.get_keys(unit)[0]
+            hashes[target_key[0]].add(target_key[2])
+            languages[target_key[0]].add(target_key[1])
+        for project_id, project_hashes in hashes.items():
+            for batch in chunks(project_hashes):
+                checks = Check.objects.filter(
+                    project_id=project_id,
+                    content_hash__in=batch,
+                ).filter(
+                    Q(language_id__in=languages[project_id]) |
+                    Q(language=None)
+                )
+                for check in checks:
+                    key = (project_id, check.language_id, check.content_hash)
+                    self.checks[key][check.check] = check
+
+    def load_same_source(self):
+        """Return keys of units which have translated unit with same source.
+
+        This is needed for get_checks_to_run on untranslated units.
+        """
+        hashes = defaultdict(set)
+        for unit, same_state, dummy, is_new in self.units:
+            if (not same_state or is_new) and not unit.translated:
+                target_key = self.get_keys(unit)[0]
+                hashes[target_key[:2]].add(target_key[2])
+        result = set()
+        for (project_id, language_id), key_hashes in hashes.items():
+            for batch in chunks(key_hashes):
+                translated = Unit.objects.filter(
+                    translation__language_id=language_id,
+                    translation__subproject__project_id=project_id,
+                    content_hash__in=batch,
+                    translated=True,
+                ).values_list(
+                    'content_hash', flat=True
+                ).distinct()
+                result.update(
+                    (project_id, language_id, content_hash)
+                    for content_hash in translated
+                )
+        return result
+
+    def create(self, key, check):
+        """Create check in memory.
+
+        The checks are saved using bulk_create, so the post_save handler
+        is not invoked and the failing check flags are updated at the end.
+        """
+        self.created[key][check] = Check(
+            content_hash=key[2],
+            project_id=key[0],
+            language_id=key[1],
+            ignore=False,
+            check=check,
+        )
+        self.checks[key][check] = None
+        self.changed.add(key)
+
+    def delete(self, key, checks):
+        """Delete checks in memory."""
+        for check in checks:
+            existing = self.checks[key].pop(check)
+            if existing is None:
+                del self.created[key][check]
+            else:
+                self.deleted.add(existing.pk)
+            self.changed.add(key)
+
+    def process_target(self, unit, same_state, same_content, is_new,
+                       same_source):
+        """Evaluate target checks for single unit, see Unit.run_checks.
+
+        Returns checks to run and whether to do cleanup for the source
+        checks evaluation.
+        """
+        target_key = self.get_keys(unit)[0]
+        checks_to_run, cleanup_checks, delete_checks = unit.get_checks_to_run(
+            same_state, is_new, target_key in same_source
+        )
+
+        if delete_checks:
+            self.delete(target_key, list(self.checks[target_key]))
+
+        src = unit.get_source_plurals()
+        tgt = unit.get_target_plurals()
+        old_target_checks = set(self.checks[target_key])
+
+        for check, check_obj in checks_to_run.items():
+            if not check_obj.target:
+                continue
+            if check_obj.check_target(
+                    src, tgt, unit, self.bulk_results.get(check)):
+                if check in old_target_checks:
+                    old_target_checks.remove(check)
+                else:
+                    self.create(target_key, check)
+
+        # Delete no longer failing checks
+        if cleanup_checks:
+            self.delete(target_key, old_target_checks)
+
+        if is_new or not same_content:
+            self.changed.add(target_key)
+
+        return checks_to_run, cleanup_checks
+
+    def process_source(self, unit, checks_to_run, cleanup_checks):
+        """Evaluate source checks for single unit, see Unit.run_checks."""
+        source_key = self.get_keys(unit)[1]
+        src = unit.get_source_plurals()
+        old_source_checks = set(self.checks[source_key])
+
+        for check, check_obj in checks_to_run.items():
+            if check_obj.source and check_obj.check_source(src, unit):
+                if check in old_source_checks:
+                    old_source_checks.remove(check)
+                else:
+                    self.create(source_key, check)
+
+        # Delete no longer failing checks
+        if cleanup_checks:
+            self.delete(source_key, old_source_checks)
+
+    def save_checks(self):
+        """Write the changes to the database."""
+        for batch in chunks(self.deleted):
+            Check.objects.filter(pk__in=batch).delete()
+        Check.objects.bulk_create(
+            [
+                check
+                for checks in self.created.values()
+                for check in checks.values()
+            ],
+            batch_size=BATCH_SIZE
+        )
+        self.created.clear()
+        self.deleted.clear()
+
+    def update_flags(self):
+        """Update failing check flags and stats of affected translations."""
+        from weblate.trans.models.translation import Translation
+
+        hashes = defaultdict(set)
+        for project_id, language_id, content_hash in self.changed:
+            hashes[(project_id, language_id)].add(content_hash)
+
+        translations = set()
+        for (project_id, language_id), key_hashes in hashes.items():
+            for batch in chunks(key_hashes):
+                units = Unit.objects.filter(
+                    translation__subproject__project_id=project_id,
+                    content_hash__in=batch,
+                )
+                if language_id is None:
+                    # Source checks do not affect the flag
+                    translations.update(
+                        units.values_list('translation_id', flat=True)
+                    )
+                    continue
+                units = units.filter(translation__language_id=language_id)
+                failing = set(
+                    Check.objects.filter(
+                        project_id=project_id,
+                        language_id=language_id,
+                        content_hash__in=batch,
+                        ignore=False,
+                    ).values_list(
+                        'content_hash', flat=True
+                    )
+                )
+                translations.update(
+                    units.values_list('translation_id', flat=True)
+                )
+                units.filter(
+                    translated=True, content_hash__in=failing
+                ).exclude(
+                    has_failing_check=True
+                ).update(
+                    has_failing_check=True
+                )
+                units.filter(
+                    Q(translated=False) | ~Q(content_hash__in=failing)
+                ).exclude(
+                    has_failing_check=False
+                ).update(
+                    has_failing_check=False
+                )
+
+        # Keep the units in memory in sync with the database
+        for unit, dummy, dummy, dummy in self.units:
+            target_key = self.get_keys(unit)[0]
+            if target_key in self.changed:
+                unit.has_failing_check = (
+                    unit.translated and
+                    any(
+                        check is None or not check.ignore
+                        for check in self.checks[target_key].values()
+                    )
+                )
+                unit.old_stats = unit.get_stats_counters()
+
+        for translation in Translation.objects.filter(pk__in=translations):
+            translation.update_stats()
+            translation.invalidate_cache()
+
+    def load_bulk_results(self):
+        """Evaluate checks which support check_target_bulk."""
+        units = [item[0] for item in self.units]
+        for check, check_obj in CHECKS.items():
+            if check_obj.target:
+                result = check_obj.check_target_bulk(units)
+                if result is not None:
+                    self.bulk_results[check] = result
+
+    def run(self):
+        """Run the checks on all added units."""
+        if not self.units:
+            return
+        self.load_checks()
+        self.load_bulk_results()
+        same_source = self.load_same_source()
+        sources = [
+            (
+                unit,
+                self.process_target(
+                    unit, same_state, same_content, is_new, same_source
+                )
+            )
+            for unit, same_state, same_content, is_new in self.units
+        ]
+        self.save_checks()
+        # Source checks can depend on the target checks being saved,
+        # for example the multiple_failures check
+        for unit, (checks_to_run, cleanup_checks) in sources:
+            self.process_source(unit, checks_to_run, cleanup_checks)
+        self.save_checks()
+        self.update_flags()
+
+
+class UnitSync(object):
+    """Synchronization of database units with translation file.
+
+    Loads all existing units of the translation at once, calculates
+    the differences in memory and writes them back in batches.
+    """
+    def __init__(self, translation, user=None):
+        self.translation = translation
+        self.subproject = translation.subproject
+        if user is not None and not user.is_authenticated:
+            user = None
+        self.user = user
+        # Units seen in the file, indexed by id_hash
+        self.units = {}
+        # Pending updates, indexed by id_hash
+        self.pending = {}
+        self.duplicates = []
+        self.was_new = False
+
+    def process_unit(self, existing, ttunit, pos):
+        """Update database unit from translate-toolkit unit."""
+        id_hash = ttunit.get_id_hash()
+
+        if id_hash in self.units:
+            # Duplicate string, it is updated with latest occurence
+            dbunit = self.units[id_hash]
+            created = False
+            self.duplicates.append(dbunit)
+        else:
+            dbunit = existing.get(id_hash)
+            created = dbunit is None
+            if created:
+                dbunit = Unit(
+                    translation=self.translation,
+                    id_hash=id_hash,
+                    content_hash=ttunit.get_content_hash(),
+                    source=ttunit.get_source(),
+                    context=ttunit.get_context()
+                )
+            self.units[id_hash] = dbunit
+
+        result = dbunit.prepare_update_from_unit(ttunit, pos, created)
+
+        if result is not None:
+            same_content, same_state, contentsum_changed = result
+            if id_hash in self.pending:
+                state = self.pending[id_hash]
+                state['same_content'] &= same_content
+                state['same_state'] &= same_state
+                state['contentsum_changed'] |= contentsum_changed
+            else:
+                self.pending[id_hash] = {
+                    'created': created,
+                    'same_content': same_content,
+                    'same_state': same_state,
+                    'contentsum_changed': contentsum_changed,
+                }
+
+        # Check if unit is new and untranslated
+        self.was_new = (
+            self.was_new or
+            (created and not dbunit.translated) or
+            (
+                not dbunit.translated and
+                dbunit.translated != dbunit.old_unit.translated
+            ) or
+            (dbunit.fuzzy and dbunit.fuzzy != dbunit.old_unit.fuzzy)
+        )
+
+    def update_sources(self):
+        """Create missing source objects and update priorities.
+
+        Returns list of id_hash values of created sources.
+        """
+        priorities = dict(
+            Source.objects.filter(
+                subproject=self.subproject
+            ).values_list(
+                'id_hash', 'priority'
+            )
+        )
+        created = [
+            id_hash for id_hash in self.pending if id_hash not in priorities
+        ]
+        Source.objects.bulk_create(
+            [
+                Source(id_hash=id_hash, subproject=self.subproject)
+                for id_hash in created
+            ],
+            batch_size=BATCH_SIZE
+        )
+        for id_hash in self.pending:
+            self.units[id_hash].priority = priorities.get(id_hash, 100)
+        return created
+
+    def update_flags(self):
+        """Update comment and suggestion flags on changed content."""
+        hashes = [
+            self.units[id_hash].content_hash
+            for id_hash, state in self.pending.items()
+            if state['contentsum_changed']
+        ]
+        if not hashes:
+            return
+        project = self.subproject.project
+        language = self.translation.language
+        comments = filter_hashes(
+            Comment.objects.filter(project=project).filter(
+                Q(language=language) | Q(language=None)
+            ),
+            hashes
+        )
+        suggestions = filter_hashes(
+            Suggestion.objects.filter(project=project, language=language),
+            hashes
+        )
+        for id_hash, state in self.pending.items():
+            if state['contentsum_changed']:
+                unit = self.units[id_hash]
+                unit.has_comment = unit.content_hash in comments
+                unit.has_suggestion = unit.content_hash in suggestions
+
+    def save_units(self):
+        """Write pending units to the database."""
+        to_create = []
+        to_update = []
+        for id_hash, state in self.pending.items():
+            unit = self.units[id_hash]
+            # Store number of words
+            if not state['same_content'] or not unit.num_words:
+                unit.num_words = len(unit.get_source_plurals()[0].split())
+            if state['created']:
+                to_create.append(unit)
+            else:
+                to_update.append(unit)
+
+        if to_create:
+            Unit.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+            # Fetch primary keys as those are not set by bulk_create on
+            # all databases
+            pks = dict(
+                self.translation.unit_set.values_list('id_hash', 'pk')
+            )
+            for unit in to_create:
+                unit.pk = pks[unit.id_hash]
+                # pylint: disable=W0212
+                unit._state.adding = False
+
+        bulk_update(Unit, to_update, UNIT_UPDATE_FIELDS)
+
+        # Translation stats are recalculated after the synchronization
+        for unit in to_create + to_update:
+            unit.old_stats = unit.get_stats_counters()
+
+        return to_create
+
+    def create_changes(self, new_sources):
+        """Create change objects for new source strings and duplicates."""
+        changes = [
+            Change(
+                unit=self.units[id_hash],
+                translation=self.translation,
+                subproject=self.subproject,
+                action=Change.ACTION_NEW_SOURCE,
+            )
+            for id_hash in new_sources
+        ]
+        for unit in self.duplicates:
+            self.translation.log_error(
+                'duplicate string to translate: %s (%s)',
+                unit,
+                repr(unit.source)
+            )
+            changes.append(
+                Change(
+                    unit=unit,
+                    translation=self.translation,
+                    subproject=self.subproject,
+                    action=Change.ACTION_DUPLICATE_STRING,
+                    user=self.user,
+                    author=self.user
+                )
+            )
+        Change.objects.bulk_create(changes, batch_size=BATCH_SIZE)
+
+    def run_checks(self):
+        """Run quality checks on changed units."""
+        checks = BulkChecks()
+        for id_hash, state in self.pending.items():
+            if not state['same_content'] or not state['same_state']:
+                checks.add(
+                    self.units[id_hash],
+                    state['same_state'],
+                    state['same_content'],
+                    state['created'],
+                )
+        checks.run()
+
+    def update_index(self, created):
+        """Update fulltext index for changed and new units."""
+        update_index_units(
+            [
+                self.units[id_hash]
+                for id_hash, state in self.pending.items()
+                if state['created'] or not state['same_content']
+            ],
+            created
+        )
+
+    def update_memory(self):
+        """Update translation memory for changed and new units."""
+        TRANSLATION_MEMORY.update_units(
+            [self.units[id_hash] for id_hash in self.pending]
+        )
+
+    def sync(self):
+        """Perform the synchronization.
+
+        Returns set of primary keys of units present in the file.
+        """
+        existing = {
+            unit.id_hash: unit for unit in self.translation.unit_set.all()
+        }
+
+        pos = 0
+        for ttunit in self.translation.store.all_units():
+            if not ttunit.is_translatable():
+                continue
+            pos += 1
+            self.process_unit(existing, ttunit, pos)
+
+        if self.pending:
+            new_sources = self.update_sources()
+            self.update_flags()
+            created = self.save_units()
+            self.run_checks()
+            self.update_index(created)
+            self.update_memory()
+        else:
+            new_sources = []
+
+        self.create_changes(new_sources)
+
+        return {unit.pk for unit in self.units.values()}
+
+
+def store_units(user, translation, units, action, progress=None):
+    """Store updated units into the translation file at once.
+
+    The file is written once, changes with given action are created in
+    bulk and the checks, stats and fulltext index are updated once for all
+    units. The optional progress is called with number of processed and
+    total units.
+    """
+    author = get_author_name(user)
+    # Commit possible previous changes by other author
+    translation.commit_pending(None, author)
+    store = translation.store
+    old_translated = translation.translated
+    updated = []
+
+    with translation.subproject.repository.lock, transaction.atomic():
+        for pos, unit in enumerate(units):
+            pounit, add = store.find_unit(
+                unit.context, unit.get_source_plurals()[0]
+            )
+            if pounit is None or pounit.is_obsolete():
+                translation.log_error('message %s disappeared!', unit)
+                continue
+            translation.store_unit(pounit, add, unit)
+            unit.translated = pounit.is_translated()
+            unit.flags = pounit.get_flags()
+            unit.pending = False
+            updated.append(unit)
+            if progress is not None and (pos + 1) % BATCH_SIZE == 0:
+                progress(pos + 1, len(units))
+
+        if not updated:
+            return 0
+
+        translation.update_store_header(author, timezone.now())
+        store.save()
+        translation.store_hash()
+        if settings.LAZY_WRITES:
+            translation.cache_store(store)
+
+        bulk_update(
+            Unit,
+            updated,
+            ('target', 'fuzzy', 'translated', 'flags', 'pending')
+        )
+        changes = []
+        for unit in updated:
+            kwargs = {}
+            # Action type to store
+            if action is not None:
+                kwargs['action'] = action
+            elif unit.old_unit.translated:
+                kwargs['action'] = Change.ACTION_CHANGE
+            else:
+                kwargs['action'] = Change.ACTION_NEW
+            # Should we store history of edits?
+            if translation.subproject.save_history:
+                kwargs['target'] = unit.target
+                kwargs['old'] = unit.old_unit.target
+            changes.append(
+                Change(
+                    unit=unit,
+                    translation=translation,
+                    subproject=translation.subproject,
+                    user=user,
+                    author=user,
+                    **kwargs
+                )
+            )
+        Change.objects.bulk_create(changes, batch_size=BATCH_SIZE)
+
+        checks = BulkChecks()
+        for unit in updated:
+            checks.add(unit, same_state=False, same_content=False)
+        checks.run()
+
+    translation.update_stats()
+    translation.invalidate_cache()
+    update_index_units(updated)
+    TRANSLATION_MEMORY.update_units(updated)
+
+    # Notify subscribed users about new translations
+    notify_new_translations(translation, updated, user)
+
+    user.profile.translated += len(updated)
+    user.profile.save()
+
+    if (old_translated < translation.translated and
+            translation.translated == translation.total):
+        Change.objects.create(
+            translation=translation,
+            action=Change.ACTION_COMPLETE,
+            user=user,
+            author=user
+        )
+
+    if progress is not None:
+        progress(len(units), len(units))
+
+    translation.git_commit(None, author, timezone.now(), sync=True)
+
+    return len(updated)
+
+
+def get_user_request(user):
+    """Return request for storing changes done by user outside of a view."""
+    request = HttpRequest()
+    request.user = user
+    return request
+
+
+def group_units(units):
+    """Group units by translation, sharing the translation object."""
+    result = defaultdict(list)
+    translations = {}
+    for unit in units:
+        translation = translations.setdefault(
+            unit.translation_id, unit.translation
+        )
+        unit.translation = translation
+        result[translation].append(unit)
+    return result
+
+
+def store_grouped(request, grouped, action):
+    """Store grouped units, yielding number of updated units."""
+    for translation, units in grouped.items():
+        if translation.is_template():
+            # Changing template updates source strings as well
+            updated = 0
+            for unit in units:
+                if unit.save_backend(request, False, change_action=action):
+                    updated += 1
+            yield updated
+        else:
+            yield store_units(request.user, translation, units, action)
+
+
+def propagate_units(request, units, action):
+    """Propagate translation of units to other components.
+
+    This is the same as Unit.propagate, but the matching units are
+    looked up for all units at once and stored for each translation
+    at once.
+    """
+    hashes = defaultdict(dict)
+    for unit in units:
+        key = (
+            unit.translation.subproject.project_id,
+            unit.translation.language_id,
+        )
+        hashes[key][unit.content_hash] = unit
+    pks = {unit.pk for unit in units}
+
+    changed = []
+    for (project_id, language_id), sources in hashes.items():
+        for batch in chunks(sources):
+            related = Unit.objects.filter(
+                translation__subproject__project_id=project_id,
+                translation__subproject__allow_translation_propagation=True,
+                translation__language_id=language_id,
+                content_hash__in=batch,
+            ).select_related(
+                'translation__subproject__project',
+                'translation__language',
+            )
+            for unit in related:
+                if unit.pk in pks:
+                    continue
+                source = sources[unit.content_hash]
+                if (unit.target == source.target and
+                        unit.fuzzy == source.fuzzy):
+                    continue
+                unit.target = source.target
+                unit.fuzzy = source.fuzzy
+                changed.append(unit)
+
+    return sum(store_grouped(request, group_units(changed), action))
+
+
+def propagate_background(user, pks, action):
+    """Propagate units to other components in background thread.
+
+    The thread is started once the current transaction is committed, so
+    that it sees the saved units.
+    """
+    def run():
+        try:
+            units = []
+            for batch in chunks(pks):
+                units.extend(
+                    Unit.objects.filter(pk__in=batch).select_related(
+                        'translation__subproject__project',
+                        'translation__language',
+                    )
+                )
+            propagate_units(get_user_request(user), units, action)
+        except Exception as error:
+            LOGGER.error('failed to propagate translations: %s', error)
+        finally:
+            # The thread has own database connection
+            connection.close()
+
+    def start():
+        thread = threading.Thread(target=run, name='propagate')
+        thread.daemon = True
+        thread.start()
+
+    transaction.on_commit(start)
+
+
+def propagate_changes(request, units, action):
+    """Propagate units to other components.
+
+    The propagation is done in background with BACKGROUND_PROPAGATION.
+    """
+    if settings.BACKGROUND_PROPAGATION:
+        propagate_background(
+            request.user, [unit.pk for unit in units], action
+        )
+    else:
+        propagate_units(request, units, action)
@@ -22,6 +22,7 @@
 import re
 from django.utils.translation import ugettext_lazy as _
 from weblate.trans.checks.base import TargetCheck
+from weblate.trans.checks.memo import SOURCE_MEMO
 
 ANGULARJS_INTERPOLATION_MATCH = re.compile(
     r'''
@@ -46,7 +47,9 @@ class AngularJSInterpolationCheck(TargetCheck):
     severity = 'danger'
 
     def check_single(self, source, target, unit):
-        src_match = ANGULARJS_INTERPOLATION_MATCH.findall(source)
+        src_match = SOURCE_MEMO.findall(
+            ANGULARJS_INTERPOLATION_MATCH, source
+        )
 
         # Any interpolation strings in source?
         if len(src_match) == 0:
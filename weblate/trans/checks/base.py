@@ -59,8 +59,11 @@ class Check(object):
 
         return False
 
-    def check_target(self, sources, targets, unit):
-        """Check target strings."""
+    def check_target(self, sources, targets, unit, bulk_result=None):
+        """Check target strings.
+
+        The bulk_result is result of check_target_bulk for the unit batch.
+        """
         if self.enable_check_value:
             return self.check_target_unit_with_flag(
                 sources, targets, unit
@@ -70,8 +73,18 @@ class Check(object):
         # No checking of not translated units
         if self.ignore_untranslated and not unit.translated:
             return False
+        if bulk_result is not None:
+            return unit.pk in bulk_result
         return self.check_target_unit(sources, targets, unit)
 
+    def check_target_bulk(self, units):
+        """Evaluate check_target_unit for many units at once.
+
+        Returns set of primary keys of units where the check fires or None
+        if the check does not support this.
+        """
+        return None
+
     def check_target_unit_with_flag(self, sources, targets, unit):
         """Check flag value"""
         raise NotImplementedError()
@@ -18,9 +18,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from collections import defaultdict
+
 from django.utils.translation import ugettext_lazy as _
 from weblate.trans.checks.base import TargetCheck
 
+# Number of content hashes queried at once
+BATCH_SIZE = 500
+
 
 class PluralsCheck(TargetCheck):
     """Check for incomplete plural forms"""
@@ -89,6 +94,50 @@ class ConsistencyCheck(TargetCheck):
 
         return related.exists()
 
+    def check_target_bulk(self, units):
+        """Find inconsistent translations for many units at once.
+
+        Distinct targets of all units sharing the source are fetched in
+        single query for each project and language.
+        """
+        from weblate.trans.models.unit import Unit
+
+        groups = defaultdict(list)
+        for unit in units:
+            if unit.translation.subproject.allow_translation_propagation:
+                key = (
+                    unit.translation.subproject.project_id,
+                    unit.translation.language_id,
+                )
+                groups[key].append(unit)
+
+        result = set()
+        for (project_id, language_id), group in groups.items():
+            hashes = sorted({unit.content_hash for unit in group})
+            # Targets and whether they are translated for each source
+            targets = defaultdict(set)
+            for start in range(0, len(hashes), BATCH_SIZE):
+                related = Unit.objects.filter(
+                    translation__subproject__project_id=project_id,
+                    translation__subproject__allow_translation_propagation=(
+                        True
+                    ),
+                    translation__language_id=language_id,
+                    content_hash__in=hashes[start:start + BATCH_SIZE],
+                ).values_list(
+                    'content_hash', 'target', 'translated'
+                ).distinct()
+                for content_hash, target, translated in related:
+                    targets[content_hash].add((target, translated))
+
+            for unit in group:
+                for target, translated in targets[unit.content_hash]:
+                    if target != unit.target and (
+                            translated or unit.translated):
+                        result.add(unit.pk)
+                        break
+        return result
+
     def check_single(self, source, target, unit):
         """We don't check target strings here."""
         return False
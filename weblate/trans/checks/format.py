@@ -23,6 +23,7 @@ import re
 from django.utils.translation import ugettext_lazy as _
 
 from weblate.trans.checks.base import TargetCheck
+from weblate.trans.checks.memo import SOURCE_MEMO
 
 PYTHON_PRINTF_MATCH = re.compile(
     r'''
@@ -150,32 +151,38 @@ class BaseFormatCheck(TargetCheck):
             return text.replace('\'', '')
         return text
 
-    def check_format(self, source, target, ignore_missing):
-        """Generic checker for format strings."""
-        if len(target) == 0 or len(source) == 0:
-            return False
-
-        uses_position = True
-
+    def extract_matches(self, text):
+        """Return list of format strings in the text."""
         # We ignore %% in the matches as this is really not relevant. However
         # it needs to be matched to prevent handling %%s as %s.
-
-        # Calculate value
-        src_matches = [
+        return [
             self.cleanup_string(x[0])
-            for x in self.regexp.findall(source)
+            for x in self.regexp.findall(text)
             if x[0] != '%'
         ]
+
+    def parse_source(self, source):
+        """Return format strings in source and whether they use position."""
+        uses_position = True
+        src_matches = self.extract_matches(source)
         if src_matches:
             uses_position = max(
                 [self.is_position_based(x) for x in src_matches]
             )
+        return tuple(src_matches), uses_position
 
-        tgt_matches = [
-            self.cleanup_string(x[0])
-            for x in self.regexp.findall(target)
-            if x[0] != '%'
-        ]
+    def check_format(self, source, target, ignore_missing):
+        """Generic checker for format strings."""
+        if len(target) == 0 or len(source) == 0:
+            return False
+
+        # Calculate value
+        src_matches, uses_position = SOURCE_MEMO.get(
+            (self.check_id, source), self.parse_source, source
+        )
+        src_matches = list(src_matches)
+
+        tgt_matches = self.extract_matches(target)
 
         if not uses_position:
             src_matches = set(src_matches)
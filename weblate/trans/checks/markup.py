@@ -29,6 +29,7 @@ from django.utils.translation import ugettext_lazy as _
 import six
 
 from weblate.trans.checks.base import TargetCheck
+from weblate.trans.checks.memo import SOURCE_MEMO
 
 BBCODE_MATCH = re.compile(
     r'(?P<start>\[(?P<tag>[^]]+)(@[^]]*)?\])(.*?)(?P<end>\[\/(?P=tag)\])',
@@ -53,7 +54,7 @@ class BBCodeCheck(TargetCheck):
 
     def check_single(self, source, target, unit):
         # Parse source
-        src_match = BBCODE_MATCH.findall(source)
+        src_match = SOURCE_MEMO.findall(BBCODE_MATCH, source)
         # Any BBCode in source?
         if len(src_match) == 0:
             return False
@@ -97,7 +98,18 @@ class BaseXMLCheck(TargetCheck):
         """Quick check if source looks like XML."""
         if 'xml-text' in flags:
             return True
-        return '<' in source and len(XML_MATCH.findall(source))
+        return '<' in source and len(SOURCE_MEMO.findall(XML_MATCH, source))
+
+    def parse_tags(self, text):
+        """Return list of top level tags or None for invalid XML."""
+        try:
+            return [x.tag for x in self.parse_xml(text)]
+        except SyntaxError:
+            return None
+
+    def get_source_tags(self, source):
+        """Memoized parse_tags for source strings."""
+        return SOURCE_MEMO.get(('xml', source), self.parse_tags, source)
 
     def check_single(self, source, target, unit):
         """Check for single phrase, not dealing with plurals."""
@@ -116,9 +128,7 @@ class XMLValidityCheck(BaseXMLCheck):
             return False
 
         # Check if source is XML
-        try:
-            self.parse_xml(source)
-        except SyntaxError:
+        if self.get_source_tags(source) is None:
             # Source is not valid XML, we give up
             return False
 
@@ -144,18 +154,14 @@ class XMLTagsCheck(BaseXMLCheck):
             return False
 
         # Check if source is XML
-        try:
-            source_tree = self.parse_xml(source)
-            source_tags = [x.tag for x in source_tree]
-        except SyntaxError:
+        source_tags = self.get_source_tags(source)
+        if source_tags is None:
             # Source is not valid XML, we give up
             return False
 
         # Check target
-        try:
-            target_tree = self.parse_xml(target)
-            target_tags = [x.tag for x in target_tree]
-        except SyntaxError:
+        target_tags = self.parse_tags(target)
+        if target_tags is None:
             # Target is not valid XML
             return False
 
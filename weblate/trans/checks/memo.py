@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Memoization of source string processing in checks.
+
+The source strings are same for all translations of a component, so
+the checks parse them once and reuse the result for other languages.
+"""
+
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import threading
+
+# Number of memoized results
+SOURCE_MEMO_SIZE = 10000
+
+
+class SourceMemo(object):
+    """LRU cache of results of processing source strings."""
+
+    def __init__(self, size=SOURCE_MEMO_SIZE):
+        self.size = size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get(self, key, func, *args):
+        """Return result of func(*args), memoized under key.
+
+        The key has to include everything the result depends on and the
+        result must not be modified by the caller.
+        """
+        with self.lock:
+            if key in self.entries:
+                result = self.entries.pop(key)
+                self.entries[key] = result
+                self.hits += 1
+                return result
+        result = func(*args)
+        with self.lock:
+            self.misses += 1
+            self.entries[key] = result
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return result
+
+    def findall(self, regex, text):
+        """Memoized regex.findall returning tuple."""
+        return self.get(
+            ('findall', regex, text),
+            lambda: tuple(regex.findall(text))
+        )
+
+
+SOURCE_MEMO = SourceMemo()
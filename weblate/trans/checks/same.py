@@ -30,6 +30,7 @@ from weblate.trans.checks.format import (
     PYTHON_BRACE_MATCH,
 )
 from weblate.trans.checks.data import SAME_BLACKLIST
+from weblate.trans.checks.memo import SOURCE_MEMO
 
 # Email address to ignore
 EMAIL_RE = re.compile(
@@ -141,6 +142,13 @@ class SameCheck(TargetCheck):
         if unit.comment.startswith('Tag: ') and unit.comment[5:] in DB_TAGS:
             return True
 
+        flags = frozenset(unit.all_flags)
+        return SOURCE_MEMO.get(
+            ('same', source, flags), self.should_ignore_source, source, flags
+        )
+
+    def should_ignore_source(self, source, flags):
+        """Check whether given source string should be ignored."""
         # Lower case source
         lower_source = source.lower()
 
@@ -151,7 +159,7 @@ class SameCheck(TargetCheck):
             result = True
         else:
             # Strip format strings
-            stripped = strip_string(lower_source, unit.all_flags)
+            stripped = strip_string(lower_source, flags)
 
             # Ignore strings which don't contain any string to translate
             # or just single letter (usually unit or something like that)
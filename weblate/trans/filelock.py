@@ -18,11 +18,16 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-"""File based locking for Unix and Windows systems."""
+"""File based locking for Unix and Windows systems.
+
+The lock can be held in exclusive or shared mode. Waiting for the lock is
+queued, so that waiting exclusive lock is not starved by shared ones.
+"""
 
 import os
 import time
 import errno
+import threading
 try:
     import fcntl
     HAS_FCNTL = True
@@ -31,16 +36,70 @@ except ImportError:
     import msvcrt
     HAS_FCNTL = False
 
+from weblate.logger import LOGGER
+
 
 class FileLockException(Exception):
     """Exception raised when locking is not possible."""
     pass
 
 
+class FileLockStats(object):
+    """Process wide metrics of waiting for locks."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.acquired = 0
+        self.contended = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.wait_max = 0.0
+
+    def add_wait(self, wait, contended, timeout=False):
+        with self.lock:
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.acquired += 1
+            if contended:
+                self.contended += 1
+                self.wait_time += wait
+                self.wait_max = max(self.wait_max, wait)
+
+    @property
+    def wait_avg(self):
+        """Average wait time for contended lock."""
+        if not self.contended:
+            return 0.0
+        return self.wait_time / self.contended
+
+
+STATS = FileLockStats()
+
+
+class SharedFileLock(object):
+    """Context-manager acquiring the lock in shared mode."""
+    def __init__(self, lock):
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire(shared=True)
+        return self.lock
+
+    def __exit__(self, typ, value, traceback):
+        self.lock.release()
+
+
 class FileLockBase(object):
     """Base file locking class.
 
-    It can be also used as a context-manager using with statement.
+    It can be also used as a context-manager using with statement, the
+    shared mode is available as shared attribute:
+
+    with lock.shared:
+        pass
     """
 
     def __init__(self, file_name, timeout=10, delay=.05):
@@ -57,13 +116,21 @@ class FileLockBase(object):
 
         # Initial state
         self.is_locked = False
+        self.is_shared = False
         self.handle = None
+        self.shared = SharedFileLock(self)
 
-    def open_file(self):
+    @property
+    def is_exclusive(self):
+        return self.is_locked and not self.is_shared
+
+    def open_file(self, name=None):
         """Open lock file"""
-        return os.open(self.lockfile, os.O_CREAT | os.O_WRONLY)
+        if name is None:
+            name = self.lockfile
+        return os.open(name, os.O_CREAT | os.O_WRONLY)
 
-    def try_lock(self, handle):
+    def try_lock(self, handle, shared=False):
         """Try to lock the file"""
         raise NotImplementedError()
 
@@ -71,37 +138,68 @@ class FileLockBase(object):
         """Unlock lock"""
         raise NotImplementedError()
 
-    def acquire(self):
+    def try_acquire(self, shared):
+        """Try to acquire the lock without waiting."""
+        try:
+            self.try_lock(self.handle, shared)
+            return True
+        except IOError as error:
+            if error.errno not in [errno.EACCES, errno.EAGAIN]:
+                raise
+            return False
+
+    def wait_lock(self, shared):
+        """Wait for the lock until timeout.
+
+        The lock is checked again every `delay` seconds.
+        """
+        start_time = time.time()
+        while not self.try_acquire(shared):
+            if (time.time() - start_time) >= self.timeout:
+                raise FileLockException("Timeout occured.")
+            time.sleep(self.delay)
+
+    def acquire(self, shared=False):
         """Acquire the lock, if possible.
 
-        If the lock is in use, it check again every `wait` seconds. It does
-        this until it either gets the lock or exceeds `timeout` number of
-        seconds, in which case it throws an exception.
+        If the lock is in use, it waits until it either gets the lock or
+        exceeds `timeout` number of seconds, in which case it throws an
+        exception.
         """
         self.depth += 1
         if self.is_locked:
+            if self.is_shared and not shared:
+                self.depth -= 1
+                raise RuntimeError('Can not upgrade shared lock!')
             return
 
-        # Timer for timeout
+        # Timer for metrics
         start_time = time.time()
 
-        # Open file
-        self.handle = self.open_file()
-
         # Try to acquire lock
-        while True:
-            try:
-                self.try_lock(self.handle)
-                self.is_locked = True
-                return
-            except IOError as error:
-                if error.errno not in [errno.EACCES, errno.EAGAIN]:
-                    raise
-
-            if (time.time() - start_time) >= self.timeout:
-                raise FileLockException("Timeout occured.")
-
-            time.sleep(self.delay)
+        contended = False
+        try:
+            # Open file
+            self.handle = self.open_file()
+            if not self.try_acquire(shared):
+                contended = True
+                if self.timeout <= 0:
+                    raise FileLockException("Timeout occured.")
+                self.wait_lock(shared)
+        except Exception:
+            self.depth -= 1
+            if self.handle is not None:
+                os.close(self.handle)
+                self.handle = None
+            STATS.add_wait(time.time() - start_time, contended, True)
+            raise
+
+        wait = time.time() - start_time
+        STATS.add_wait(wait, contended)
+        if contended:
+            LOGGER.debug('waited %.3f s for lock %s', wait, self.lockfile)
+        self.is_locked = True
+        self.is_shared = shared
 
     def check_lock(self):
         """Check whether lock is locked."""
@@ -114,19 +212,22 @@ class FileLockBase(object):
             if error.errno not in [errno.EACCES, errno.EAGAIN]:
                 raise
             return True
+        finally:
+            os.close(handle)
 
     def release(self):
-        """Release the lock and delete underlaying file."""
+        """Release the lock.
+
+        The underlaying file is kept as removing it would break locking
+        for processes waiting for it.
+        """
         self.depth -= 1
         if self.is_locked and self.depth == 0:
             self.unlock(self.handle)
             os.close(self.handle)
             self.handle = None
-            try:
-                os.unlink(self.lockfile)
-            except OSError:
-                pass
             self.is_locked = False
+            self.is_shared = False
 
     def __enter__(self):
         """Context-manager support, executed when entering with statement.
@@ -144,8 +245,8 @@ class FileLockBase(object):
         self.release()
 
     def __del__(self):
-        """Make sure that the FileLock instance doesn't leave a lockfile
-        lying around.
+        """Make sure that the FileLock instance doesn't leave the lock
+        held.
         """
         self.release()
 
@@ -153,21 +254,94 @@ class FileLockBase(object):
 class FcntlFileLock(FileLockBase):
     """
     A file locking mechanism for Unix systems based on flock.
+
+    Lockers pass through additional queue file before locking, waiting
+    lockers hold it, what makes later lockers wait for them.
     """
-    def try_lock(self, handle):
+    def __init__(self, file_name, timeout=10, delay=.05):
+        super(FcntlFileLock, self).__init__(file_name, timeout, delay)
+        self.queuefile = file_name + '.queue'
+
+    @staticmethod
+    def get_mode(shared):
+        if shared:
+            return fcntl.LOCK_SH
+        return fcntl.LOCK_EX
+
+    def try_lock(self, handle, shared=False):
         """Try to lock the file"""
-        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        fcntl.flock(handle, self.get_mode(shared) | fcntl.LOCK_NB)
 
     def unlock(self, handle):
         """Unlock lock"""
         fcntl.flock(handle, fcntl.LOCK_UN)
 
+    def try_acquire(self, shared):
+        """Try to acquire the lock without waiting.
+
+        Fails if there is somebody waiting in the queue.
+        """
+        queue = self.open_file(self.queuefile)
+        try:
+            try:
+                fcntl.flock(queue, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except IOError as error:
+                if error.errno not in [errno.EACCES, errno.EAGAIN]:
+                    raise
+                return False
+            return super(FcntlFileLock, self).try_acquire(shared)
+        finally:
+            os.close(queue)
+
+    def wait_lock(self, shared):
+        """Wait for the lock in the queue until timeout.
+
+        The blocking wait is done in helper thread to be able to enforce
+        timeout. On timeout the helper thread takes ownership of the lock
+        file handle and releases the lock once it gets it.
+        """
+        handle = self.handle
+        mode = self.get_mode(shared)
+        guard = threading.Lock()
+        done = threading.Event()
+        state = {'cancelled': False, 'error': None}
+
+        def waiter():
+            queue = self.open_file(self.queuefile)
+            try:
+                fcntl.flock(queue, fcntl.LOCK_EX)
+                fcntl.flock(handle, mode)
+            except (IOError, OSError) as error:
+                state['error'] = error
+            finally:
+                os.close(queue)
+            with guard:
+                if state['cancelled']:
+                    if state['error'] is None:
+                        fcntl.flock(handle, fcntl.LOCK_UN)
+                    os.close(handle)
+                done.set()
+
+        thread = threading.Thread(target=waiter)
+        thread.daemon = True
+        thread.start()
+        done.wait(self.timeout)
+        with guard:
+            if not done.is_set():
+                state['cancelled'] = True
+                self.handle = None
+                raise FileLockException("Timeout occured.")
+        if state['error'] is not None:
+            raise state['error']
+
 
 class WindowsFileLock(FileLockBase):
     """
     A file locking mechanism for Windows systems.
+
+    Shared mode is not supported, the lock is always exclusive.
     """
-    def try_lock(self, handle):
+    def try_lock(self, handle, shared=False):
         """Try to lock the file"""
         msvcrt.locking(handle, msvcrt.LK_NBLCK, 1)
 
@@ -47,6 +47,7 @@ from translate.storage.poxliff import PoXliffFile
 from translate.storage.resx import RESXFile
 from translate.storage import factory
 
+from weblate.trans.storecache import STORE_CACHE
 from weblate.trans.util import get_string, join_plural, add_configuration_error
 
 from weblate.utils.hash import calculate_hash
@@ -461,6 +462,9 @@ class FileFormat(object):
     new_translation = None
     autoload = ()
     language_pack = None
+    # Whether parsed store can be kept pickled in the store cache, stores
+    # wrapping lxml trees do not survive unpickling
+    cacheable = False
 
     @staticmethod
     def serialize(store):
@@ -485,6 +489,10 @@ class FileFormat(object):
                 not hasattr(storefile, 'mode')):
             storefile.mode = 'r'
 
+        # Files on the disk go through the cache
+        if isinstance(storefile, six.string_types):
+            return STORE_CACHE.parse(cls, storefile)
+
         return cls.parse_store(storefile)
 
     @classmethod
@@ -525,6 +533,10 @@ class FileFormat(object):
             )
         # Remember template
         self.template_store = template_store
+        # Lazily built unit lookup indexes
+        self._id_index = None
+        self._source_index = None
+        self._value_index = None
         # Set language (needed for some which do not include this)
         if (language_code is not None and
                 self.store.gettargetlanguage() is None):
@@ -538,27 +550,76 @@ class FileFormat(object):
             self.template_store is not None
         )
 
-    def _find_unit_mono(self, context, store):
-        # We search by ID when using template
-        ttkit_unit = store.findid(context)
+    @staticmethod
+    def get_unit_id(ttkit_unit):
+        """Return ID used to lookup unit in monolingual store."""
+        return ttkit_unit.getid()
+
+    @staticmethod
+    def get_unit_context(ttkit_unit):
+        """Return context used to lookup unit in bilingual store."""
+        return ttkit_unit.getcontext()
+
+    @property
+    def id_index(self):
+        """Units indexed by ID.
+
+        We do not use findid as it does not work for empty translations.
+        """
+        if self._id_index is None:
+            self._id_index = {}
+            for ttkit_unit in self.store.units:
+                self._index_id(ttkit_unit)
+        return self._id_index
+
+    @property
+    def source_index(self):
+        """Units indexed by source strings."""
+        if self._source_index is None:
+            self._source_index = {}
+            for ttkit_unit in self.store.units:
+                self._index_source(ttkit_unit)
+        return self._source_index
+
+    @property
+    def value_index(self):
+        """Units indexed by source as parsed by unit_class.
+
+        This is needed for value based files where source index does
+        not work.
+        """
+        if self._value_index is None:
+            self._value_index = {}
+            for ttkit_unit in self.store.units:
+                self._index_value(ttkit_unit)
+        return self._value_index
+
+    def _index_id(self, ttkit_unit):
+        self._id_index.setdefault(self.get_unit_id(ttkit_unit), ttkit_unit)
+
+    def _index_source(self, ttkit_unit):
+        if ttkit_unit.isheader() or ttkit_unit.isblank():
+            return
+        if ttkit_unit.hasplural():
+            sources = ttkit_unit.source.strings
+        else:
+            sources = [ttkit_unit.source]
+        for source in sources:
+            self._source_index.setdefault(source, []).append(ttkit_unit)
 
-        if ttkit_unit is not None:
-            return ttkit_unit
+    def _index_value(self, ttkit_unit):
+        self._value_index.setdefault(
+            self.unit_class(ttkit_unit).get_source(), ttkit_unit
+        )
 
-        # Do not use findid as it does not work for empty translations
-        for search_unit in store.units:
-            if search_unit.getid() == context:
-                return search_unit
+    def _find_unit_mono(self, context):
+        return self.id_index.get(context)
 
     def _find_unit_template(self, context):
         # Need to create new unit based on template
-        template_ttkit_unit = self._find_unit_mono(
-            context, self.template_store.store
-        )
+        template_ttkit_unit = self.template_store._find_unit_mono(context)
         # We search by ID when using template
-        ttkit_unit = self._find_unit_mono(
-            context, self.store
-        )
+        ttkit_unit = self._find_unit_mono(context)
 
         # We always need new unit to translate
         if ttkit_unit is None:
@@ -573,19 +634,18 @@ class FileFormat(object):
 
     def _find_unit_bilingual(self, context, source):
         # Find all units with same source
-        found_units = self.store.findunits(source)
+        found_units = self.source_index.get(source)
         # Find is broken for propfile, ignore results
-        if len(found_units) > 0 and not isinstance(self.store, propfile):
+        if found_units and not isinstance(self.store, propfile):
             for ttkit_unit in found_units:
                 # Does context match?
-                if ttkit_unit.getcontext() == context:
+                if self.get_unit_context(ttkit_unit) == context:
                     return (self.unit_class(ttkit_unit), False)
         else:
-            # Fallback to manual find for value based files
-            for ttkit_unit in self.store.units:
-                ttkit_unit = self.unit_class(ttkit_unit)
-                if ttkit_unit.get_source() == source:
-                    return (ttkit_unit, False)
+            # Fallback to value lookup for value based files
+            ttkit_unit = self.value_index.get(source)
+            if ttkit_unit is not None:
+                return (self.unit_class(ttkit_unit), False)
         return (None, False)
 
     def find_unit(self, context, source):
@@ -606,6 +666,13 @@ class FileFormat(object):
             self.store.addunit(ttkit_unit.unit, new=True)
         else:
             self.store.addunit(ttkit_unit.unit)
+        # Update already built indexes
+        if self._id_index is not None:
+            self._index_id(ttkit_unit.unit)
+        if self._source_index is not None:
+            self._index_source(ttkit_unit.unit)
+        if self._value_index is not None:
+            self._index_value(ttkit_unit.unit)
 
     def update_header(self, **kwargs):
         """Update store header if available."""
@@ -630,7 +697,7 @@ class FileFormat(object):
 
     def find_matching(self, template_unit):
         """Find matching store unit for template"""
-        return self.store.findid(template_unit.getid())
+        return self._find_unit_mono(self.get_unit_id(template_unit))
 
     def all_units(self):
         """Generator of all units."""
@@ -809,6 +876,7 @@ class PoFormat(FileFormat):
     name = _('Gettext PO file')
     format_id = 'po'
     loader = pofile
+    cacheable = True
     monolingual = False
     autoload = ('.po', '.pot')
     language_pack = 'mo'
@@ -921,21 +989,18 @@ class XliffFormat(FileFormat):
     autoload = ('.xlf', '.xliff')
     unit_class = XliffUnit
 
-    def find_matching(self, template_unit):
-        """Find matching store unit for template"""
-        return self._find_unit_mono(
-            template_unit.source,
-            self.store
-        )
+    get_unit_context = staticmethod(XliffUnit.get_unit_context)
+
+    @staticmethod
+    def get_unit_id(ttkit_unit):
+        """Return ID used to lookup unit in monolingual store."""
+        return ttkit_unit.source
 
     def _find_unit_bilingual(self, context, source):
         # Find all units with same source
-        found_units = self.store.findunits(source)
-        # Find is broken for propfile, ignore results
-        for ttkit_unit in found_units:
+        for ttkit_unit in self.source_index.get(source, ()):
             # Does context match?
-            found_context = XliffUnit.get_unit_context(ttkit_unit)
-            if found_context == context:
+            if self.get_unit_context(ttkit_unit) == context:
                 return (self.unit_class(ttkit_unit), False)
         return (None, False)
 
@@ -960,13 +1025,6 @@ class XliffFormat(FileFormat):
         content.settargetlanguage(language.code)
         content.savefile(filename)
 
-    def _find_unit_mono(self, context, store):
-        # Do not use findid as it does not work for empty translations
-        for search_unit in store.units:
-            loc = search_unit.source
-            if loc == context:
-                return search_unit
-
 
 @register_fileformat
 class PoXliffFormat(XliffFormat):
@@ -981,6 +1039,7 @@ class StringsFormat(FileFormat):
     name = _('OS X Strings')
     format_id = 'strings'
     loader = ('properties', 'stringsfile')
+    cacheable = True
     new_translation = '\n'.encode('utf-16')
     autoload = ('.strings',)
 
@@ -990,6 +1049,7 @@ class StringsUtf8Format(FileFormat):
     name = _('OS X Strings (UTF-8)')
     format_id = 'strings-utf8'
     loader = ('properties', 'stringsutf8file')
+    cacheable = True
     new_translation = '\n'
 
 
@@ -998,6 +1058,7 @@ class PropertiesUtf8Format(FileFormat):
     name = _('Java Properties (UTF-8)')
     format_id = 'properties-utf8'
     loader = ('properties', 'javautf8file')
+    cacheable = True
     monolingual = True
     new_translation = '\n'
 
@@ -1036,6 +1097,7 @@ class JoomlaFormat(FileFormat):
     name = _('Joomla Language File')
     format_id = 'joomla'
     loader = ('properties', 'joomlafile')
+    cacheable = True
     monolingual = True
     new_translation = '\n'
     autoload = ('.ini',)
@@ -1046,6 +1108,7 @@ class PhpFormat(FileFormat):
     name = _('PHP strings')
     format_id = 'php'
     loader = phpfile
+    cacheable = True
     new_translation = '<?php\n'
     autoload = ('.php',)
     unit_class = PHPUnit
@@ -1074,11 +1137,14 @@ class PhpFormat(FileFormat):
         with open(self.store.filename, 'wb') as handle:
             handle.writelines(outputphplines)
 
-    def _find_unit_mono(self, context, store):
-        # Do not use findid as it does not work for empty translations
-        for search_unit in store.units:
-            if search_unit.source == context:
-                return search_unit
+    def find_matching(self, template_unit):
+        """Find matching store unit for template"""
+        return self.store.findid(template_unit.getid())
+
+    @staticmethod
+    def get_unit_id(ttkit_unit):
+        """Return ID used to lookup unit in monolingual store."""
+        return ttkit_unit.source
 
 
 @register_fileformat
@@ -1127,6 +1193,7 @@ class JSONFormat(FileFormat):
     name = _('JSON file')
     format_id = 'json'
     loader = ('jsonl10n', 'JsonFile')
+    cacheable = True
     unit_class = MonolingualSimpleUnit
     autoload = ('.json',)
 
@@ -1161,6 +1228,7 @@ class CSVFormat(FileFormat):
     name = _('CSV file')
     format_id = 'csv'
     loader = ('csvl10n', 'csvfile')
+    cacheable = True
     unit_class = MonolingualSimpleUnit
     autoload = ('.csv',)
 
@@ -47,9 +47,10 @@ from weblate.trans.models import SubProject, Unit, Project
 from weblate.trans.models.unit import SEARCH_FILTERS
 from weblate.trans.models.source import PRIORITY_CHOICES
 from weblate.trans.checks import CHECKS
+from weblate.trans.machine import MACHINE_TRANSLATION_SERVICES
 from weblate.permissions.helpers import (
     can_author_translation, can_overwrite_translation, can_translate,
-    can_suggest, can_add_translation, can_mass_add_translation,
+    can_suggest, can_add_translation, can_mass_add_translation, can_use_mt,
 )
 from weblate.trans.specialchars import get_special_chars
 from weblate.trans.validators import validate_check_flags
@@ -663,6 +664,15 @@ class AutoForm(forms.Form):
         required=False,
         initial=''
     )
+    machine = forms.ChoiceField(
+        label=_('Machine translation to use'),
+        required=False,
+        initial='',
+        help_text=_(
+            'Strings translated by machine translation are marked as '
+            'needing review.'
+        )
+    )
 
     def __init__(self, obj, user, *args, **kwargs):
         """Generate choices for other subproject in same project."""
@@ -687,6 +697,14 @@ class AutoForm(forms.Form):
         self.fields['subproject'].choices = \
             [('', _('All components in current project'))] + choices
 
+        machine_choices = [('', _('None, use other components'))]
+        if can_use_mt(user, obj):
+            for service_name in MACHINE_TRANSLATION_SERVICES:
+                service = MACHINE_TRANSLATION_SERVICES[service_name]
+                if service.remote:
+                    machine_choices.append((service_name, service.name))
+        self.fields['machine'].choices = machine_choices
+
 
 class WordForm(forms.Form):
     """Form for adding word to a glossary."""
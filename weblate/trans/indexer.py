@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Long running fulltext indexer processing offloaded index updates."""
+
+from __future__ import unicode_literals
+
+import functools
+from operator import or_
+import threading
+import time
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from weblate.trans.models import IndexUpdate, Unit
+from weblate.trans.search import (
+    get_source_index, get_target_index,
+    update_source_unit_index, update_target_unit_index,
+)
+
+# Timeout for acquiring index lock
+LOCK_TIMEOUT = 60
+
+# Number of processed updates removed from the queue in single query
+DELETE_BATCH = 500
+
+
+class IndexerStats(object):
+    """Metrics of the indexer."""
+    def __init__(self):
+        self.updates = 0
+        self.commits = 0
+        self.commit_time = 0.0
+        self.commit_max = 0.0
+        self.delay_max = 0.0
+
+    def add_commit(self, latency, delay):
+        self.commits += 1
+        self.commit_time += latency
+        self.commit_max = max(self.commit_max, latency)
+        self.delay_max = max(self.delay_max, delay)
+
+    @property
+    def commit_avg(self):
+        if not self.commits:
+            return 0.0
+        return self.commit_time / self.commits
+
+
+class Indexer(object):
+    """Fulltext indexer keeping single writer per index.
+
+    The updates are collected in the open writers and committed once
+    there is enough of them or after given time. Small segments created
+    by these commits are merged in background thread.
+    """
+    def __init__(self, batch_size=1000, commit_size=1000, commit_interval=10,
+                 merge_interval=300):
+        self.batch_size = batch_size
+        self.commit_size = commit_size
+        self.commit_interval = commit_interval
+        self.merge_interval = merge_interval
+        # Writers indexed by language code, None is source index
+        self.writers = {}
+        self.locks = {}
+        self.pending = 0
+        self.oldest = None
+        # Updates written to the open writers, removed from the queue once
+        # the writers are committed
+        self.processed = []
+        self.last_pk = 0
+        self.unmerged = set()
+        self.last_merge = time.time()
+        self.merge_thread = None
+        self.stats = IndexerStats()
+
+    @staticmethod
+    def get_index(lang):
+        if lang is None:
+            return get_source_index()
+        return get_target_index(lang)
+
+    def get_lock(self, lang):
+        if lang not in self.locks:
+            self.locks[lang] = threading.Lock()
+        return self.locks[lang]
+
+    def get_writer(self, lang):
+        """Return open writer for index, opening it if needed."""
+        if lang not in self.writers:
+            self.get_lock(lang).acquire()
+            try:
+                self.writers[lang] = self.get_index(lang).writer(
+                    timeout=LOCK_TIMEOUT
+                )
+            except Exception:
+                self.get_lock(lang).release()
+                raise
+        return self.writers[lang]
+
+    def fetch_updates(self):
+        """Fetch batch of updates not yet processed from the queue."""
+        updates = list(
+            IndexUpdate.objects.filter(
+                pk__gt=self.last_pk
+            ).order_by(
+                'pk'
+            )[:self.batch_size]
+        )
+        if updates:
+            self.last_pk = updates[-1].pk
+        return updates
+
+    def remove_processed(self):
+        """Remove committed updates from the queue.
+
+        Updates refreshed since they were fetched are kept, so that the
+        newer change is indexed as well.
+        """
+        with transaction.atomic():
+            for pos in range(0, len(self.processed), DELETE_BATCH):
+                IndexUpdate.objects.filter(
+                    functools.reduce(or_, [
+                        Q(pk=pk, timestamp=timestamp)
+                        for pk, timestamp in
+                        self.processed[pos:pos + DELETE_BATCH]
+                    ])
+                ).delete()
+        self.processed = []
+        # Start from beginning to catch updates committed out of order
+        self.last_pk = 0
+
+    def process_updates(self, updates):
+        """Write updates to the index writers."""
+        source_ids = set()
+        unit_ids = set()
+        for update in updates:
+            if update.to_delete:
+                self.get_writer(None).delete_by_term('pk', update.unitid)
+                if update.language_code:
+                    self.get_writer(update.language_code).delete_by_term(
+                        'pk', update.unitid
+                    )
+                continue
+            unit_ids.add(update.unitid)
+            if update.source:
+                source_ids.add(update.unitid)
+
+        units = Unit.objects.filter(
+            id__in=unit_ids
+        ).select_related(
+            'translation__language'
+        )
+        for unit in units.iterator():
+            if unit.pk in source_ids:
+                update_source_unit_index(self.get_writer(None), unit)
+            if unit.target:
+                update_target_unit_index(
+                    self.get_writer(unit.translation.language.code),
+                    unit
+                )
+
+    def process(self):
+        """Process single batch of updates.
+
+        Returns number of processed updates.
+        """
+        updates = self.fetch_updates()
+        if not updates:
+            return 0
+        self.process_updates(updates)
+        self.processed.extend(
+            (update.pk, update.timestamp) for update in updates
+        )
+        oldest = min(update.timestamp for update in updates)
+        if self.oldest is None or oldest < self.oldest:
+            self.oldest = oldest
+        self.pending += len(updates)
+        self.stats.updates += len(updates)
+        return len(updates)
+
+    def needs_commit(self):
+        if not self.writers:
+            return bool(self.processed)
+        if self.pending >= self.commit_size:
+            return True
+        delay = (timezone.now() - self.oldest).total_seconds()
+        return delay >= self.commit_interval
+
+    def commit(self):
+        """Commit all open writers without merging segments.
+
+        The processed updates are removed from the queue only after the
+        writers have been committed.
+        """
+        if not self.writers:
+            if self.processed:
+                self.remove_processed()
+            return
+        start = time.time()
+        for lang, writer in self.writers.items():
+            try:
+                writer.commit(merge=False)
+            finally:
+                self.get_lock(lang).release()
+            self.unmerged.add(lang)
+        self.writers = {}
+        self.remove_processed()
+        latency = time.time() - start
+        if self.oldest is None:
+            delay = 0.0
+        else:
+            delay = (timezone.now() - self.oldest).total_seconds()
+        self.stats.add_commit(latency, delay)
+        self.pending = 0
+        self.oldest = None
+
+    def merge(self, langs):
+        """Merge small segments of given indexes."""
+        for lang in langs:
+            with self.get_lock(lang):
+                self.get_index(lang).writer(timeout=LOCK_TIMEOUT).commit()
+
+    def start_merge(self):
+        """Start merging in background thread if there is need to."""
+        if self.merge_thread is not None:
+            if self.merge_thread.is_alive():
+                return
+            self.merge_thread = None
+        if time.time() - self.last_merge < self.merge_interval:
+            return
+        self.last_merge = time.time()
+        if not self.unmerged:
+            return
+        langs = list(self.unmerged)
+        self.unmerged = set()
+        # Prepare locks here to avoid races in creating them
+        for lang in langs:
+            self.get_lock(lang)
+        self.merge_thread = threading.Thread(target=self.merge, args=(langs,))
+        self.merge_thread.start()
+
+    def wait_merge(self):
+        if self.merge_thread is not None:
+            self.merge_thread.join()
+            self.merge_thread = None
+
+    @staticmethod
+    def get_queue_status():
+        """Return number of queued updates and age of the oldest one."""
+        queue = IndexUpdate.objects.order_by('timestamp')
+        count = queue.count()
+        if not count:
+            return 0, 0.0
+        lag = timezone.now() - queue[0].timestamp
+        return count, lag.total_seconds()
+
+    def run(self, poll_interval=1, report_interval=60, report=None,
+            once=False):
+        """Process updates until interrupted.
+
+        With once set, processing ends when the queue is empty.
+        """
+        last_report = time.time()
+        try:
+            while True:
+                processed = self.process()
+                if self.needs_commit():
+                    self.commit()
+                self.start_merge()
+                if (report is not None and
+                        time.time() - last_report >= report_interval):
+                    report(self)
+                    self.stats = IndexerStats()
+                    last_report = time.time()
+                if not processed:
+                    if once:
+                        break
+                    time.sleep(poll_interval)
+        finally:
+            self.commit()
+            self.wait_merge()
+        if report is not None:
+            report(self)
@@ -21,21 +21,28 @@
 
 from __future__ import unicode_literals
 
+import hashlib
+from multiprocessing.pool import ThreadPool
+import re
 import sys
 import json
 
-from six.moves.urllib.request import Request, urlopen
-from six.moves.urllib.parse import urlencode
-
-from django.core.cache import cache
+from django.core.cache import cache, caches, InvalidCacheBackendError
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
 
 from weblate import USER_AGENT
 from weblate.logger import LOGGER
 from weblate.utils.errors import report_error
+from weblate.trans.machine.client import (
+    CircuitBreaker, LatencyHistogram, http_request,
+)
 from weblate.trans.site import get_site_url
 
+EMPTY_ITEM = re.compile(r',(?=,)')
+EMPTY_FIRST = re.compile(r'\[,')
+
 
 class MachineTranslationError(Exception):
     """Generic Machine translation error."""
@@ -45,83 +52,89 @@ class MissingConfiguration(ImproperlyConfigured):
     """Exception raised when configuraiton is wrong."""
 
 
+def fix_json(text):
+    """Fill in empty items in JSON arrays."""
+    return EMPTY_FIRST.sub('[', EMPTY_ITEM.sub(',null', text))
+
+
+def get_translations_cache():
+    """Return cache for storing machine translations."""
+    # Try using machine translation specific cache if available
+    try:
+        return caches['machine-translation']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
 class MachineTranslation(object):
     """Generic object for machine translation services."""
     name = 'MT'
     default_languages = []
+    # Whether results depend only on languages and text, so can be cached
+    cache_translations = True
+    # Whether the service is queried over network
+    remote = True
+    # Maximal number of texts for download_translations_batch
+    batch_size = 100
 
     def __init__(self):
         """Create new machine translation object."""
         self.mtid = self.name.lower().replace(' ', '-')
-        self.request_url = None
-        self.request_params = None
+        self.circuit = CircuitBreaker()
+        self.latency = LatencyHistogram()
 
     def get_identifier(self):
         return self.mtid
 
-    def authenticate(self, request):
+    def authenticate(self, headers):
         """Hook for backends to allow add authentication headers to request."""
         return
 
     def json_req(self, url, http_post=False, skip_auth=False, raw=False,
-                 **kwargs):
+                 headers=None, **kwargs):
         """Perform JSON request."""
-        # Encode params
-        if len(kwargs) > 0:
-            params = urlencode(
-                {key: val.encode('utf-8') for key, val in kwargs.items()}
+        if not self.circuit.allow():
+            raise MachineTranslationError(
+                'Service is disabled after repeated failures'
             )
-        else:
-            params = ''
-
-        # Store for exception handling
-        self.request_url = url
-        self.request_params = params
-
-        # Append parameters
-        if len(params) > 0 and not http_post:
-            url = '?'.join((url, params))
-
-        # Create request object with custom headers
-        request = Request(url)
-        request.timeout = 0.5
-        request.add_header('User-Agent', USER_AGENT)
-        request.add_header('Referer', get_site_url())
+
+        # Custom headers
+        headers = dict(headers or {})
+        headers['User-Agent'] = USER_AGENT
+        headers['Referer'] = get_site_url()
         # Optional authentication
         if not skip_auth:
-            self.authenticate(request)
+            self.authenticate(headers)
 
         # Fire request
-        if http_post:
-            handle = urlopen(request, params.encode('utf-8'))
-        else:
-            handle = urlopen(request)
-
-        # Read and possibly convert response
-        text = handle.read()
-        # Needed for Microsoft
-        if text[:3] == b'\xef\xbb\xbf':
-            text = text.decode('UTF-8-sig')
-        else:
-            text = text.decode('utf-8')
-        # Replace literal \t
-        text = text.strip().replace(
-            '\t', '\\t'
-        ).replace(
-            '\r', '\\r'
-        )
-        # Needed for Google
-        while ',,' in text or '[,' in text:
-            text = text.replace(',,', ',null,').replace('[,', '[')
+        try:
+            text = http_request(
+                self.circuit,
+                self.latency,
+                'POST' if http_post else 'GET',
+                url,
+                kwargs,
+                headers,
+            )
 
-        if raw:
-            return text
+            # Needed for Microsoft
+            text = text.decode('utf-8-sig').strip()
 
-        # Parse JSON
-        response = json.loads(text)
+            if raw:
+                return text
 
-        # Return data
-        return response
+            # Parse JSON, allowing control chars in strings
+            try:
+                return json.loads(text, strict=False)
+            except ValueError:
+                # Needed for Google
+                return json.loads(fix_json(text), strict=False)
+        except Exception as exc:
+            # Keep request details for report_error, the service object
+            # is shared by concurrent requests
+            exc.mt_url = url
+            exc.mt_params = kwargs
+            raise
 
     def json_status_req(self, url, http_post=False, skip_auth=False, **kwargs):
         """Perform JSON request with checking response status."""
@@ -151,25 +164,78 @@ class MachineTranslation(object):
         """
         raise NotImplementedError()
 
+    def get_cache_key(self, source, language, text):
+        """Return cache key for translations of text."""
+        return '{0}-translation-{1}-{2}-{3}'.format(
+            self.mtid,
+            source,
+            language,
+            hashlib.sha1(text.encode('utf-8')).hexdigest(),
+        )
+
+    def increase_counter(self, name, delta=1):
+        """Increase cache statistics counter."""
+        if not delta:
+            return
+        mt_cache = get_translations_cache()
+        key = '{0}-cache-{1}'.format(self.mtid, name)
+        try:
+            mt_cache.incr(key, delta)
+        except ValueError:
+            mt_cache.set(key, delta, None)
+
+    def get_cache_stats(self):
+        """Return cache hits and misses of the service."""
+        keys = {
+            name: '{0}-cache-{1}'.format(self.mtid, name)
+            for name in ('hits', 'misses')
+        }
+        values = get_translations_cache().get_many(keys.values())
+        return {name: values.get(key, 0) for name, key in keys.items()}
+
+    def get_translations(self, source, language, text, unit, user):
+        """Return translations from cache or download them."""
+        if not self.cache_translations or not settings.MT_CACHE_TIMEOUT:
+            return self.download_translations(
+                source, language, text, unit, user
+            )
+
+        mt_cache = get_translations_cache()
+        cache_key = self.get_cache_key(source, language, text)
+        translations = mt_cache.get(cache_key)
+        if translations is not None:
+            self.increase_counter('hits')
+            return translations
+
+        self.increase_counter('misses')
+        translations = list(
+            self.download_translations(source, language, text, unit, user)
+        )
+        mt_cache.set(cache_key, translations, settings.MT_CACHE_TIMEOUT)
+        return translations
+
     def convert_language(self, language):
         """Convert language to service specific code."""
         return language
 
     def report_error(self, exc, message):
         """Wrapper for handling error situations"""
+        url = getattr(exc, 'mt_url', None)
+        params = getattr(exc, 'mt_params', None)
         report_error(
             exc, sys.exc_info(),
-            {'mt_url': self.request_url, 'mt_params': self.request_params}
+            {'mt_url': url, 'mt_params': params}
         )
         LOGGER.error(
             message,
             self.name,
         )
-        LOGGER.error(
-            'Last fetched URL: %s, params: %s',
-            self.request_url,
-            self.request_params,
-        )
+        if url is not None:
+            LOGGER.error(
+                'Failed URL: %s, params: %s',
+                url,
+                params,
+            )
 
     @property
     def supported_languages(self):
@@ -205,38 +271,125 @@ class MachineTranslation(object):
             source in self.supported_languages
         )
 
-    def translate(self, language, text, unit, user):
-        """Return list of machine translations."""
-        if text == '':
-            return []
-
+    def get_languages(self, source, language):
+        """Return service languages or None if they are not supported."""
         language = self.convert_language(language)
-        source = self.convert_language(
-            unit.translation.subproject.project.source_language.code
-        )
+        source = self.convert_language(source)
         if not self.is_supported(source, language):
             # Try without country code
             if '_' in language or '-' in language:
                 language = language.replace('-', '_').split('_')[0]
                 if not self.is_supported(source, language):
-                    return []
+                    return None
             else:
-                return []
+                return None
+        return source, language
+
+    def format_translations(self, translations):
+        """Convert translation tuples to dictionaries."""
+        return [
+            {
+                'text': trans[0],
+                'quality': trans[1],
+                'service': trans[2],
+                'source': trans[3]
+            }
+            for trans in translations
+        ]
+
+    def translate(self, language, text, unit, user):
+        """Return list of machine translations."""
+        if text == '':
+            return []
+
+        languages = self.get_languages(
+            unit.translation.subproject.project.source_language.code,
+            language
+        )
+        if languages is None:
+            return []
+        source, language = languages
 
         try:
-            translations = self.download_translations(
+            translations = self.get_translations(
                 source, language, text, unit, user
             )
 
-            return [
-                {
-                    'text': trans[0],
-                    'quality': trans[1],
-                    'service': trans[2],
-                    'source': trans[3]
-                }
-                for trans in translations
-            ]
+            return self.format_translations(translations)
+        except Exception as exc:
+            self.report_error(
+                exc,
+                'Failed to fetch translations from %s',
+            )
+            raise MachineTranslationError('{0}: {1}'.format(
+                exc.__class__.__name__,
+                str(exc)
+            ))
+
+    def download_translations_batch(self, source, language, texts):
+        """Download list of possible translations for several texts.
+
+        Should return list containing result of download_translations for
+        each text. This generic implementation downloads the texts in
+        parallel using MT_BATCH_THREADS threads, services accepting more
+        texts in single request should override it.
+        """
+        def download(text):
+            try:
+                return self.download_translations(
+                    source, language, text, None, None
+                )
+            finally:
+                # The thread has own database connection
+                connection.close()
+
+        pool = ThreadPool(settings.MT_BATCH_THREADS)
+        try:
+            return pool.map(download, texts)
+        finally:
+            pool.close()
+            pool.join()
+
+    def translate_batch(self, source, language, texts):
+        """Return list of machine translations for each text.
+
+        Cached translations are used and the rest is downloaded using
+        download_translations_batch in batches of batch_size texts. This
+        is available only for remote services.
+        """
+        languages = self.get_languages(source, language)
+        if languages is None:
+            return [[] for text in texts]
+        source, language = languages
+
+        mt_cache = get_translations_cache()
+        keys = {
+            self.get_cache_key(source, language, text): text
+            for text in texts if text != ''
+        }
+        result = {}
+        use_cache = self.cache_translations and settings.MT_CACHE_TIMEOUT
+        if use_cache:
+            for key, translations in mt_cache.get_many(keys).items():
+                result[keys[key]] = translations
+            self.increase_counter('hits', len(result))
+            self.increase_counter('misses', len(keys) - len(result))
+
+        missing = sorted(set(keys.values()) - set(result))
+        try:
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start:start + self.batch_size]
+                downloaded = {}
+                for text, translations in zip(
+                        batch,
+                        self.download_translations_batch(
+                            source, language, batch
+                        )):
+                    result[text] = list(translations)
+                    key = self.get_cache_key(source, language, text)
+                    downloaded[key] = result[text]
+                if use_cache:
+                    mt_cache.set_many(downloaded, settings.MT_CACHE_TIMEOUT)
         except Exception as exc:
             self.report_error(
                 exc,
@@ -246,3 +399,8 @@ class MachineTranslation(object):
                 exc.__class__.__name__,
                 str(exc)
             ))
+
+        return [
+            self.format_translations(result.get(text, []))
+            for text in texts
+        ]
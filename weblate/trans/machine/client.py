@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Shared HTTP client for machine translation services.
+
+The connections are kept alive in pool shared by all services, failed
+requests are retried and services failing repeatedly are not called
+for some time.
+"""
+
+from __future__ import unicode_literals
+
+import bisect
+import threading
+import time
+
+from django.conf import settings
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SESSION_LOCK = threading.Lock()
+SESSION = None
+
+
+def get_session():
+    """Return shared session with connection pool."""
+    global SESSION
+    with SESSION_LOCK:
+        if SESSION is None:
+            SESSION = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=20,
+                pool_maxsize=settings.MT_POOL_SIZE,
+            )
+            SESSION.mount('http://', adapter)
+            SESSION.mount('https://', adapter)
+        return SESSION
+
+
+class CircuitBreaker(object):
+    """Stops calling a service after repeated failures.
+
+    After MT_CIRCUIT_FAILURES consecutive failures the circuit is open
+    and no requests are allowed. Single request is allowed to probe the
+    service every MT_CIRCUIT_RESET seconds, its success closes the
+    circuit again.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened = None
+
+    @property
+    def is_open(self):
+        return self.opened is not None
+
+    def allow(self):
+        """Check whether request is allowed."""
+        with self.lock:
+            if self.opened is None:
+                return True
+            if time.time() - self.opened >= settings.MT_CIRCUIT_RESET:
+                self.opened = time.time()
+                return True
+            return False
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened = None
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= settings.MT_CIRCUIT_FAILURES:
+                self.opened = time.time()
+
+
+class LatencyHistogram(object):
+    """Histogram of request durations."""
+    BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.total = 0
+
+    def add(self, duration):
+        with self.lock:
+            self.counts[bisect.bisect_left(self.BUCKETS, duration)] += 1
+            self.total += 1
+
+    def percentile(self, percent):
+        """Return upper bound of duration for given percent of requests.
+
+        None is returned when there were no requests and infinity when
+        the requests took longer than largest bucket.
+        """
+        if self.total == 0:
+            return None
+        limit = self.total * percent / 100.0
+        current = 0
+        for pos, count in enumerate(self.counts):
+            current += count
+            if current >= limit:
+                break
+        if pos < len(self.BUCKETS):
+            return self.BUCKETS[pos]
+        return float('inf')
+
+
+def http_request(circuit, latency, method, url, params, headers):
+    """Perform HTTP request with retries.
+
+    Connection errors and server errors are retried with exponential
+    backoff. Returns response content, raises requests.RequestException
+    on failure.
+    """
+    attempt = 0
+    while True:
+        start = time.time()
+        try:
+            response = get_session().request(
+                method,
+                url,
+                params=params if method == 'GET' else None,
+                data=params if method == 'POST' else None,
+                headers=headers,
+                timeout=settings.MT_REQUEST_TIMEOUT,
+            )
+        except (requests.ConnectionError, requests.Timeout) as error:
+            response = None
+            failure = error
+        latency.add(time.time() - start)
+
+        if response is not None and response.status_code < 500:
+            circuit.success()
+            response.raise_for_status()
+            return response.content
+
+        if attempt >= settings.MT_RETRIES:
+            circuit.failure()
+            if response is None:
+                raise failure
+            response.raise_for_status()
+
+        time.sleep(settings.MT_RETRY_BACKOFF * 2 ** attempt)
+        attempt += 1
@@ -83,3 +83,26 @@ class GoogleTranslation(MachineTranslation):
         translation = response['data']['translations'][0]['translatedText']
 
         return [(translation, 100, self.name, text)]
+
+    def download_translations_batch(self, source, language, texts):
+        """Download translations for several texts in single request."""
+        # POST is used to avoid hitting URL length limit
+        response = self.json_req(
+            'https://www.googleapis.com/language/translate/v2/',
+            http_post=True,
+            headers={'X-HTTP-Method-Override': 'GET'},
+            key=settings.MT_GOOGLE_KEY,
+            q=texts,
+            source=source,
+            target=language,
+        )
+
+        if 'error' in response:
+            raise MachineTranslationError(response['error']['message'])
+
+        return [
+            [(translation['translatedText'], 100, self.name, text)]
+            for translation, text in zip(
+                response['data']['translations'], texts
+            )
+        ]
@@ -88,12 +88,9 @@ class MicrosoftTranslation(MachineTranslation):
 
         return self._access_token
 
-    def authenticate(self, request):
+    def authenticate(self, headers):
         """Hook for backends to allow add authentication headers to request."""
-        request.add_header(
-            'Authorization',
-            'Bearer {0}'.format(self.access_token)
-        )
+        headers['Authorization'] = 'Bearer {0}'.format(self.access_token)
 
     def convert_language(self, language):
         """Convert language to service specific code."""
@@ -20,26 +20,27 @@
 
 from __future__ import unicode_literals
 
-from django.utils.encoding import force_text
-
-from weblate.permissions.helpers import can_access_project
 from weblate.trans.machine.base import MachineTranslation
-from weblate.trans.models.unit import Unit
+from weblate.trans.memory import TRANSLATION_MEMORY
+from weblate.trans.models.project import Project
 
 
-def format_unit_match(unit, quality):
-    """Format unit to translation service result."""
+def format_entry(entry, quality):
+    """Format translation memory entry to translation service result."""
     return (
-        unit.get_target_plurals()[0],
+        entry.target,
         quality,
-        'Weblate ({0})'.format(force_text(unit.translation.subproject)),
-        unit.get_source_plurals()[0],
+        'Weblate ({0})'.format(entry.origin),
+        entry.source,
     )
 
 
 class WeblateBase(MachineTranslation):
     """Base class for Weblate based MT"""
     # pylint: disable=W0223
+    # Results depend on the database content and user permissions
+    cache_translations = False
+    remote = False
 
     def is_supported(self, source, language):
         """Any language is supported."""
@@ -52,12 +53,11 @@ class WeblateTranslation(WeblateBase):
 
     def download_translations(self, source, language, text, unit, user):
         """Download list of possible translations from a service."""
-        matching_units = Unit.objects.same_source(unit)
-
         return [
-            format_unit_match(munit, 100)
-            for munit in matching_units
-            if can_access_project(user, munit.translation.subproject.project)
+            format_entry(entry, 100)
+            for entry in TRANSLATION_MEMORY.lookup(
+                unit, set(Project.objects.get_acl_ids(user))
+            )
         ]
 
 
@@ -67,10 +67,9 @@ class WeblateSimilarTranslation(WeblateBase):
 
     def download_translations(self, source, language, text, unit, user):
         """Download list of possible translations from a service."""
-        matching_units = Unit.objects.more_like_this(unit)
-
         return [
-            format_unit_match(munit, 50)
-            for munit in matching_units
-            if can_access_project(user, munit.translation.subproject.project)
+            format_entry(entry, min(99, int(similarity * 100)))
+            for similarity, entry in TRANSLATION_MEMORY.lookup_similar(
+                unit, set(Project.objects.get_acl_ids(user))
+            )
         ]
@@ -30,6 +30,8 @@ from weblate.trans.machine.base import (
 class YandexTranslation(MachineTranslation):
     """Yandex machine translation support."""
     name = 'Yandex'
+    # The request size is limited to 10000 characters
+    batch_size = 20
 
     def __init__(self):
         """Check configuration."""
@@ -77,3 +79,20 @@ class YandexTranslation(MachineTranslation):
             (translation, 100, self.name, text)
             for translation in response['text']
         ]
+
+    def download_translations_batch(self, source, language, texts):
+        """Download translations for several texts in single request."""
+        response = self.json_req(
+            'https://translate.yandex.net/api/v1.5/tr.json/translate',
+            http_post=True,
+            key=settings.MT_YANDEX_KEY,
+            text=texts,
+            lang='{0}-{1}'.format(source, language),
+        )
+
+        self.check_failure(response)
+
+        return [
+            [(translation, 100, self.name, text)]
+            for translation, text in zip(response['text'], texts)
+        ]
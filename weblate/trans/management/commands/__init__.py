@@ -19,14 +19,44 @@
 #
 """Helper classes for management commands."""
 
+import multiprocessing
+
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
+from django.db import transaction, connections
+from django.utils.encoding import force_text
 
 from weblate.lang.models import Language
 from weblate.trans.models import Unit, SubProject, Translation
+from weblate.trans.vcs import close_repositories
+
+
+def run_component_job(args):
+    """Execute job on single component.
+
+    This is executed in worker processes, so it has to be module level
+    function. The errors are returned to be reported by the main process.
+    """
+    worker, pk, options = args
+    subproject = SubProject.objects.get(pk=pk)
+    try:
+        worker(subproject, **options)
+    except Exception as error:
+        return force_text(subproject), force_text(error)
+    finally:
+        close_repositories()
+    return force_text(subproject), None
+
+
+class WeblateBaseCommand(BaseCommand):
+    """Command releasing repository processes once finished."""
+    def execute(self, *args, **options):
+        try:
+            return super(WeblateBaseCommand, self).execute(*args, **options)
+        finally:
+            close_repositories()
 
 
-class WeblateCommand(BaseCommand):
+class WeblateCommand(WeblateBaseCommand):
     """Command which accepts project/component/--all params to process."""
     def add_arguments(self, parser):
         parser.add_argument(
@@ -42,6 +72,69 @@ class WeblateCommand(BaseCommand):
             help='Slug <project/component> of component to process'
         )
 
+    def add_jobs_argument(self, parser):
+        """Add argument to process components in parallel."""
+        parser.add_argument(
+            '--jobs',
+            action='store',
+            type=int,
+            dest='jobs',
+            default=None,
+            help='number of worker processes to use, work is split by '
+            'components'
+        )
+
+    def run_jobs(self, worker, options, **worker_options):
+        """Execute worker on all matching components.
+
+        The components are processed by pool of worker processes, each
+        with own database connection. The worker is module level function
+        called with component and the worker options.
+        """
+        tasks = [
+            (worker, pk, worker_options)
+            for pk in self.get_subprojects(**options).values_list(
+                'pk', flat=True
+            )
+        ]
+        total = len(tasks)
+
+        if options['jobs'] > 1:
+            # The workers have to open own database connections
+            connections.close_all()
+            pool = multiprocessing.Pool(options['jobs'])
+            results = pool.imap_unordered(run_component_job, tasks)
+        else:
+            pool = None
+            results = (run_component_job(task) for task in tasks)
+
+        failed = 0
+        try:
+            for current, result in enumerate(results):
+                name, error = result
+                if error is None:
+                    self.stdout.write(
+                        'Processed {0} ({1}/{2})'.format(
+                            name, current + 1, total
+                        )
+                    )
+                else:
+                    failed += 1
+                    self.stderr.write(
+                        'Failed to process {0}: {1}'.format(name, error)
+                    )
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        if failed:
+            raise CommandError(
+                'Failed to process {0} of {1} components!'.format(
+                    failed, total
+                )
+            )
+
     def get_units(self, **options):
         """Return list of units matching parameters."""
         if options['all']:
@@ -181,7 +274,7 @@ class WeblateLangCommand(WeblateCommand):
         raise NotImplementedError()
 
 
-class WeblateTranslationCommand(BaseCommand):
+class WeblateTranslationCommand(WeblateBaseCommand):
     """Command with target of one translation."""
 
     def add_arguments(self, parser):
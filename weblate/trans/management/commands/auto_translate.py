@@ -76,6 +76,9 @@ class Command(WeblateTranslationCommand):
             )
         )
 
+    def progress(self, done, total):
+        self.stdout.write('Processed {0} of {1} units'.format(done, total))
+
     def handle(self, *args, **options):
         # Get translation object
         translation = self.get_translation(**options)
@@ -105,6 +108,6 @@ class Command(WeblateTranslationCommand):
         result = auto_translate(
             user, translation, source,
             options['inconsistent'], options['overwrite'],
-            check_acl=False
+            check_acl=False, progress=self.progress
         )
         self.stdout.write('Updated {0} units'.format(result))
@@ -31,7 +31,9 @@ from weblate.trans.models import (
 )
 from weblate.lang.models import Language
 from weblate.screenshots.models import Screenshot
-from weblate.trans.search import get_target_index, clean_search_unit
+from weblate.trans.search import (
+    get_target_index, clean_search_unit, get_backend,
+)
 
 
 class Command(BaseCommand):
@@ -72,6 +74,8 @@ class Command(BaseCommand):
 
     def cleanup_fulltext(self):
         """Remove stale units from fulltext"""
+        if not get_backend().needs_update:
+            return
         languages = Language.objects.have_translation().values_list(
             'code', flat=True
         )
@@ -23,13 +23,14 @@ from __future__ import unicode_literals
 import argparse
 import json
 
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
 from django.utils.text import slugify
 
+from weblate.trans.management.commands import WeblateBaseCommand
 from weblate.trans.models import SubProject, Project
 
 
-class Command(BaseCommand):
+class Command(WeblateBaseCommand):
     """
     Command for mass importing of repositories into Weblate
     based on JSON data.
@@ -25,7 +25,7 @@ import re
 import shutil
 import fnmatch
 
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
 from django.utils.encoding import force_text
 from django.db.models import Q
 from django.utils.text import slugify
@@ -33,12 +33,13 @@ from django.utils.text import slugify
 from weblate.lang.models import Language
 from weblate.trans.models import SubProject, Project
 from weblate.trans.formats import FILE_FORMATS
+from weblate.trans.management.commands import WeblateBaseCommand
 from weblate.trans.util import is_repo_link, path_separator
 from weblate.trans.vcs import VCS_REGISTRY
 from weblate.logger import LOGGER
 
 
-class Command(BaseCommand):
+class Command(WeblateBaseCommand):
     """Command for mass importing of repositories into Weblate."""
     help = 'imports projects with more components'
 
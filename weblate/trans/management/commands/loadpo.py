@@ -18,9 +18,17 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import time
+
 from weblate.trans.management.commands import WeblateLangCommand
 
 
+def load_translations(subproject, force, langs, bulk):
+    """Load translations for single component."""
+    with subproject.repository.lock:
+        subproject.create_translations(force, langs, bulk=bulk)
+
+
 class Command(WeblateLangCommand):
     help = '(re)loads translations from disk'
 
@@ -33,10 +41,36 @@ class Command(WeblateLangCommand):
             default=False,
             help='Force rereading files even when they should be up to date'
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            dest='bulk',
+            default=False,
+            help='Update database in batches instead of unit by unit'
+        )
+        self.add_jobs_argument(parser)
 
     def handle(self, *args, **options):
         langs = None
         if options['lang'] is not None:
             langs = options['lang'].split(',')
+        if options['jobs'] is not None:
+            self.run_jobs(
+                load_translations,
+                options,
+                force=options['force'],
+                langs=langs,
+                bulk=options['bulk'],
+            )
+            return
         for subproject in self.get_subprojects(**options):
-            subproject.create_translations(options['force'], langs)
+            start = time.time()
+            subproject.create_translations(
+                options['force'], langs, bulk=options['bulk']
+            )
+            if options['verbosity'] >= 2:
+                self.stdout.write(
+                    'Loaded {0} in {1:.2f} seconds'.format(
+                        subproject, time.time() - start
+                    )
+                )
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import unicode_literals
+
+from django.core.management.base import CommandError
+from django.contrib.auth.models import User
+
+from weblate.accounts.models import Profile
+from weblate.trans.autotranslate import machine_translate
+from weblate.trans.machine import MACHINE_TRANSLATION_SERVICES
+from weblate.trans.machine.base import MachineTranslationError
+from weblate.trans.management.commands import WeblateTranslationCommand
+
+
+class Command(WeblateTranslationCommand):
+    """
+    Command for mass machine translation.
+    """
+    help = 'performs automatic translation using machine translation'
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--user',
+            default='anonymous',
+            help=(
+                'User performing the change'
+            )
+        )
+        parser.add_argument(
+            '--service',
+            required=True,
+            help=(
+                'Machine translation service to use'
+            )
+        )
+        parser.add_argument(
+            '--overwrite',
+            default=False,
+            action='store_true',
+            help=(
+                'Overwrite existing translations'
+            )
+        )
+
+    def progress(self, done, total):
+        self.stdout.write('Processed {0} of {1} units'.format(done, total))
+
+    def handle(self, *args, **options):
+        # Get translation object
+        translation = self.get_translation(**options)
+
+        # Get user
+        try:
+            user = User.objects.get(username=options['user'])
+            Profile.objects.get_or_create(user=user)
+        except User.DoesNotExist:
+            raise CommandError('User does not exist!')
+
+        if options['service'] not in MACHINE_TRANSLATION_SERVICES:
+            raise CommandError('Invalid service specified!')
+        service = MACHINE_TRANSLATION_SERVICES[options['service']]
+        if not service.remote:
+            raise CommandError('Service can not translate in bulk!')
+
+        try:
+            result = machine_translate(
+                user, translation, service, options['overwrite'],
+                progress=self.progress
+            )
+        except MachineTranslationError as error:
+            raise CommandError(
+                'Machine translation failed: {0}'.format(error)
+            )
+        self.stdout.write('Updated {0} units'.format(result))
@@ -18,15 +18,44 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import json
+import multiprocessing
+import os
+
+from django.db import connections
+
 from weblate.trans.management.commands import WeblateCommand
 from weblate.trans.search import (
     get_source_index, get_target_index,
     update_source_unit_index, update_target_unit_index,
-    clean_indexes,
+    clean_indexes, get_backend,
 )
 from weblate.lang.models import Language
 
 
+def rebuild_target_index(args):
+    """Rebuild target index for single language.
+
+    This is executed in worker processes, so it has to be module level
+    function.
+    """
+    options, lang = args
+    units = Command().get_units(**options).filter(
+        translation__language__code=lang
+    )
+    writer = get_target_index(lang).writer()
+    count = 0
+    try:
+        for unit in units.iterator():
+            update_target_unit_index(writer, unit)
+            count += 1
+    except Exception:
+        writer.cancel()
+        raise
+    writer.commit()
+    return lang, count
+
+
 class Command(WeblateCommand):
     help = 'rebuilds index for fulltext search'
 
@@ -46,6 +75,21 @@ class Command(WeblateCommand):
             default=False,
             help='optimize index without rebuilding it'
         )
+        parser.add_argument(
+            '--jobs',
+            action='store',
+            type=int,
+            dest='jobs',
+            default=1,
+            help='number of worker processes to use'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            action='store',
+            dest='checkpoint',
+            default=None,
+            help='file to store progress to allow resuming the rebuild'
+        )
 
     def optimize_index(self):
         """Optimize index structures"""
@@ -57,10 +101,17 @@ class Command(WeblateCommand):
             index.optimize()
 
     def handle(self, *args, **options):
+        # Database backend does not have separate index
+        if not get_backend().needs_update:
+            return
         # Optimize index
         if options['optimize']:
             self.optimize_index()
             return
+        # Rebuild in parallel
+        if options['jobs'] > 1 or options['checkpoint']:
+            self.parallel_rebuild(**options)
+            return
         # Optionally rebuild indices from scratch
         if options['clean']:
             clean_indexes()
@@ -87,3 +138,91 @@ class Command(WeblateCommand):
             source_writer.commit()
             for code in target_writers:
                 target_writers[code].commit()
+
+    @staticmethod
+    def load_checkpoint(filename):
+        """Return list of already completed parts of the rebuild."""
+        if not filename or not os.path.exists(filename):
+            return set()
+        with open(filename) as handle:
+            return set(json.load(handle))
+
+    @staticmethod
+    def save_checkpoint(filename, done):
+        if not filename:
+            return
+        with open(filename, 'w') as handle:
+            json.dump(sorted(done), handle)
+
+    def parallel_rebuild(self, **options):
+        """Rebuild indexes partitioned by language.
+
+        Target indexes are built by pool of worker processes, one language
+        at a time in each of them. The source index is then built using
+        Whoosh multiprocessing writer. Completed parts are stored in the
+        checkpoint file and skipped when resuming.
+        """
+        checkpoint = options['checkpoint']
+        done = self.load_checkpoint(checkpoint)
+
+        # Cleanup would discard already completed work
+        if options['clean'] and not done:
+            clean_indexes()
+
+        # Only picklable options can be passed to the workers
+        worker_options = {
+            'all': options['all'],
+            'component': options['component'],
+        }
+
+        languages = self.get_units(**options).values_list(
+            'translation__language__code', flat=True
+        ).order_by(
+            'translation__language__code'
+        ).distinct()
+        tasks = [
+            (worker_options, lang) for lang in languages if lang not in done
+        ]
+        total = len(tasks)
+
+        if options['jobs'] > 1:
+            # The workers have to open own database connections
+            connections.close_all()
+            pool = multiprocessing.Pool(options['jobs'])
+            results = pool.imap_unordered(rebuild_target_index, tasks)
+        else:
+            pool = None
+            results = (rebuild_target_index(task) for task in tasks)
+
+        try:
+            for current, result in enumerate(results):
+                lang, count = result
+                done.add(lang)
+                self.save_checkpoint(checkpoint, done)
+                self.stdout.write(
+                    'Indexed {0} units in {1} ({2}/{3})'.format(
+                        count, lang, current + 1, total
+                    )
+                )
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        if 'source' not in done:
+            writer = get_source_index().writer(
+                procs=options['jobs'], multisegment=True
+            )
+            try:
+                for unit in self.iterate_units(**options):
+                    update_source_unit_index(writer, unit)
+            except Exception:
+                writer.cancel()
+                raise
+            writer.commit()
+            done.add('source')
+            self.save_checkpoint(checkpoint, done)
+
+        # Whole rebuild is completed
+        if checkpoint and os.path.exists(checkpoint):
+            os.unlink(checkpoint)
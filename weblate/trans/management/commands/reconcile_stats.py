@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import unicode_literals
+
+from weblate.trans.management.commands import WeblateLangCommand
+from weblate.trans.models.translation import STATS_FIELDS
+
+
+class Command(WeblateLangCommand):
+    help = 'recalculates translation stats and reports differences'
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            dest='check',
+            default=False,
+            help='Only report differences, do not fix them'
+        )
+
+    def handle(self, *args, **options):
+        drift = 0
+
+        for translation in self.get_translations(**options):
+            stats = translation.calculate_stats()
+            fields = [
+                field for field in STATS_FIELDS
+                if getattr(translation, field) != stats[field]
+            ]
+            if not fields:
+                continue
+
+            drift += 1
+            for field in fields:
+                self.stdout.write(
+                    '{0}: {1} is {2}, should be {3}'.format(
+                        translation,
+                        field,
+                        getattr(translation, field),
+                        stats[field],
+                    )
+                )
+
+            if not options['check']:
+                translation.update_stats()
+
+        if int(options['verbosity']) >= 1:
+            self.stdout.write(
+                'Found {0} translations with outdated stats'.format(drift)
+            )
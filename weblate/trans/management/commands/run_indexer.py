@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import unicode_literals
+
+from django.core.management.base import BaseCommand
+
+from weblate.trans.indexer import Indexer
+
+
+class Command(BaseCommand):
+    help = 'continuously updates index for fulltext search'
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--batch-size',
+            action='store',
+            type=int,
+            dest='batch_size',
+            default=1000,
+            help='number of updates to fetch from the queue at once'
+        )
+        parser.add_argument(
+            '--commit-size',
+            action='store',
+            type=int,
+            dest='commit_size',
+            default=1000,
+            help='number of updates after which the index is committed'
+        )
+        parser.add_argument(
+            '--commit-interval',
+            action='store',
+            type=float,
+            dest='commit_interval',
+            default=10,
+            help='maximal age in seconds of uncommitted update'
+        )
+        parser.add_argument(
+            '--merge-interval',
+            action='store',
+            type=float,
+            dest='merge_interval',
+            default=300,
+            help='interval in seconds for merging index segments'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            action='store',
+            type=float,
+            dest='poll_interval',
+            default=1,
+            help='interval in seconds for polling empty queue'
+        )
+        parser.add_argument(
+            '--report-interval',
+            action='store',
+            type=float,
+            dest='report_interval',
+            default=60,
+            help='interval in seconds for reporting metrics'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            dest='once',
+            default=False,
+            help='exit once the queue is empty'
+        )
+
+    def report(self, indexer):
+        if self.verbosity < 1:
+            return
+        count, lag = indexer.get_queue_status()
+        stats = indexer.stats
+        self.stdout.write(
+            'Queue: {0} updates, lag {1:.1f} s; '
+            'processed {2} updates in {3} commits, '
+            'commit latency avg {4:.1f} ms, max {5:.1f} ms; '
+            'indexing delay max {6:.1f} s'.format(
+                count,
+                lag,
+                stats.updates,
+                stats.commits,
+                stats.commit_avg * 1000,
+                stats.commit_max * 1000,
+                stats.delay_max,
+            )
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = int(options['verbosity'])
+        indexer = Indexer(
+            batch_size=options['batch_size'],
+            commit_size=options['commit_size'],
+            commit_interval=options['commit_interval'],
+            merge_interval=options['merge_interval'],
+        )
+        try:
+            indexer.run(
+                poll_interval=options['poll_interval'],
+                report_interval=options['report_interval'],
+                report=self.report,
+                once=options['once'],
+            )
+        except KeyboardInterrupt:
+            return
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import unicode_literals
+
+from weblate.trans.management.commands import WeblateBaseCommand
+from weblate.trans.updater import Updater
+
+
+class Command(WeblateBaseCommand):
+    help = 'processes queued repository updates'
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--threads',
+            action='store',
+            type=int,
+            dest='threads',
+            default=1,
+            help='number of repositories to update in parallel'
+        )
+        parser.add_argument(
+            '--stale-timeout',
+            action='store',
+            type=float,
+            dest='stale_timeout',
+            default=3600,
+            help='time in seconds after which running job is restarted'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            action='store',
+            type=float,
+            dest='poll_interval',
+            default=1,
+            help='interval in seconds for polling empty queue'
+        )
+        parser.add_argument(
+            '--report-interval',
+            action='store',
+            type=float,
+            dest='report_interval',
+            default=60,
+            help='interval in seconds for reporting metrics'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            dest='once',
+            default=False,
+            help='exit once the queue is empty'
+        )
+
+    def report(self, updater):
+        if self.verbosity < 1:
+            return
+        count, lag = updater.get_queue_status()
+        stats = updater.stats
+        self.stdout.write(
+            'Queue: {0} jobs, lag {1:.1f} s; '
+            'processed {2} jobs ({3} failed) for {4} requests, '
+            'latency avg {5:.1f} s, max {6:.1f} s; '
+            'queue wait max {7:.1f} s'.format(
+                count,
+                lag,
+                stats.jobs,
+                stats.failed,
+                stats.requests,
+                stats.latency_avg,
+                stats.latency_max,
+                stats.wait_max,
+            )
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = int(options['verbosity'])
+        updater = Updater(
+            threads=options['threads'],
+            stale_timeout=options['stale_timeout'],
+        )
+        try:
+            updater.run(
+                poll_interval=options['poll_interval'],
+                report_interval=options['report_interval'],
+                report=self.report,
+                once=options['once'],
+            )
+        except KeyboardInterrupt:
+            return
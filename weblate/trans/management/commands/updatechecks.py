@@ -18,12 +18,54 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from django.db import transaction
+
+from weblate.trans.bulk import BulkChecks, BATCH_SIZE, chunks
 from weblate.trans.management.commands import WeblateLangCommand
+from weblate.trans.models import Unit
+
+
+def update_checks(subproject, lang):
+    """Update checks for single component.
+
+    The shared repository lock avoids concurrent check_sync of the
+    component while batch of checks is updated in single transaction.
+    The lock is taken for every batch, so that exclusive updates do not
+    have to wait for the whole component.
+    """
+    units = Unit.objects.filter(
+        translation__subproject=subproject
+    ).prefetch_related(
+        'translation__language',
+        'translation__subproject',
+        'translation__subproject__project',
+    )
+    if lang is not None:
+        units = units.filter(translation__language__code=lang)
+    pks = units.order_by('pk').values_list('pk', flat=True)
+    for batch in chunks(pks):
+        with subproject.repository.lock.shared, transaction.atomic():
+            checks = BulkChecks()
+            for unit in units.filter(pk__in=batch):
+                checks.add(unit)
+            checks.run()
 
 
 class Command(WeblateLangCommand):
     help = 'updates checks for units'
 
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        self.add_jobs_argument(parser)
+
     def handle(self, *args, **options):
+        if options['jobs'] is not None:
+            self.run_jobs(update_checks, options, lang=options['lang'])
+            return
+        checks = BulkChecks()
         for unit in self.iterate_units(*args, **options):
-            unit.run_checks()
+            checks.add(unit)
+            if len(checks.units) >= BATCH_SIZE:
+                checks.run()
+                checks = BulkChecks()
+        checks.run()
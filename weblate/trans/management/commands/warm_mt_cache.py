@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import unicode_literals
+
+from django.core.management.base import CommandError
+
+from weblate.trans.machine import MACHINE_TRANSLATION_SERVICES
+from weblate.trans.machine.base import MachineTranslationError
+from weblate.trans.management.commands import WeblateLangCommand
+
+
+class Command(WeblateLangCommand):
+    help = 'fetches machine translations for untranslated strings into cache'
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--service',
+            action='append',
+            dest='service',
+            default=None,
+            help='Machine translation service to use (can be repeated)'
+        )
+
+    def get_services(self, names):
+        """Return cacheable services to use."""
+        if names is None:
+            names = MACHINE_TRANSLATION_SERVICES.keys()
+        services = []
+        for name in names:
+            if name not in MACHINE_TRANSLATION_SERVICES:
+                raise CommandError(
+                    'Invalid service specified: {0}'.format(name)
+                )
+            service = MACHINE_TRANSLATION_SERVICES[name]
+            if service.cache_translations:
+                services.append(service)
+        if not services:
+            raise CommandError('No cacheable service enabled!')
+        return services
+
+    def get_units(self, **options):
+        return super(Command, self).get_units(**options).filter(
+            translated=False
+        )
+
+    def handle(self, *args, **options):
+        services = self.get_services(options['service'])
+        failed = 0
+        seen = set()
+        for unit in self.iterate_units(**options):
+            language = unit.translation.language.code
+            text = unit.get_source_plurals()[0]
+            key = (
+                unit.translation.subproject.project.source_language_id,
+                language,
+                text,
+            )
+            # Same string is often present in several components
+            if key in seen:
+                continue
+            seen.add(key)
+            for service in services:
+                try:
+                    service.translate(language, text, unit, None)
+                except MachineTranslationError:
+                    failed += 1
+
+        for service in services:
+            stats = service.get_cache_stats()
+            self.stdout.write(
+                '{0}: {1} hits, {2} misses'.format(
+                    service.name, stats['hits'], stats['misses']
+                )
+            )
+        if failed:
+            self.stderr.write(
+                'Failed to fetch {0} translations'.format(failed)
+            )
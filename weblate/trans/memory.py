@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""In-process translation memory.
+
+Translated strings are kept in memory for every language, indexed by the
+source string and by character trigrams of the source string. The index is
+loaded from the database on first lookup, updated when units are saved and
+reloaded after MT_WEBLATE_REFRESH seconds to include changes done by other
+processes.
+
+Every language memory has own lock, so that lookups in one language do not
+block other languages. While a stale memory is being reloaded, lookups are
+served from the stale one.
+"""
+
+from __future__ import division, unicode_literals
+
+from collections import defaultdict, namedtuple
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.utils.encoding import force_text
+
+from weblate.trans.util import split_plural
+
+Entry = namedtuple(
+    'Entry', ('source', 'target', 'project', 'origin', 'size')
+)
+
+EMPTY = frozenset()
+
+
+def get_ngrams(text):
+    """Return set of character trigrams of normalized string."""
+    text = ' {0} '.format(' '.join(text.lower().split()))
+    return {text[pos:pos + 3] for pos in range(len(text) - 2)}
+
+
+def discard(index, key, pk):
+    """Remove primary key from the index, dropping empty keys."""
+    pks = index.get(key)
+    if pks is None:
+        return
+    pks.discard(pk)
+    if not pks:
+        del index[key]
+
+
+class LanguageMemory(object):
+    """Translation memory for single language."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timestamp = time.time()
+        self.entries = {}
+        self.exact = defaultdict(set)
+        self.ngrams = defaultdict(set)
+
+    def add(self, pk, source, target, project, origin):
+        """Add or replace translation of unit with given primary key."""
+        self.remove(pk)
+        source = split_plural(source)[0]
+        grams = get_ngrams(source)
+        self.entries[pk] = Entry(
+            source, split_plural(target)[0], project, origin, len(grams)
+        )
+        self.exact[source].add(pk)
+        for gram in grams:
+            self.ngrams[gram].add(pk)
+
+    def remove(self, pk):
+        """Remove translation of unit with given primary key."""
+        entry = self.entries.pop(pk, None)
+        if entry is None:
+            return
+        discard(self.exact, entry.source, pk)
+        for gram in get_ngrams(entry.source):
+            discard(self.ngrams, gram, pk)
+
+    def lookup(self, text, projects, exclude):
+        """Return entries with same source string."""
+        return [
+            self.entries[pk] for pk in self.exact.get(text, EMPTY)
+            if pk != exclude and self.entries[pk].project in projects
+        ]
+
+    def lookup_similar(self, text, projects, exclude, threshold, top):
+        """Return list of similarity and entry pairs for similar strings.
+
+        The similarity is Dice coefficient of the trigram sets, entries with
+        same source string are not included.
+        """
+        grams = get_ngrams(text)
+        size = len(grams)
+        if not size:
+            return []
+        # Candidate sizes and number of common trigrams to reach threshold
+        min_size = size * threshold / (2 - threshold)
+        max_size = size * (2 - threshold) / threshold
+        min_common = max(1, int(math.ceil(min_size)))
+        # Any match has to share at least one of the rarest trigrams
+        postings = sorted(
+            (self.ngrams.get(gram, EMPTY) for gram in grams), key=len
+        )
+        candidates = set()
+        for pks in postings[:size - min_common + 1]:
+            candidates.update(pks)
+
+        result = []
+        for pk in candidates:
+            entry = self.entries[pk]
+            if (pk == exclude or
+                    entry.source == text or
+                    entry.project not in projects or
+                    not min_size <= entry.size <= max_size):
+                continue
+            common = sum(1 for pks in postings if pk in pks)
+            similarity = 2 * common / (size + entry.size)
+            if similarity >= threshold:
+                result.append((similarity, entry))
+        result.sort(key=lambda item: (-item[0], item[1].source))
+        return result[:top]
+
+
+class PendingLoad(object):
+    """Load of language memory in progress."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        # Updates done while loading, applied to the loaded memory
+        self.updates = []
+
+
+class TranslationMemory(object):
+    """Translation memory of all languages.
+
+    The lock protects only the dictionaries of languages and loads in
+    progress, language memories are protected by own locks.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.languages = {}
+        self.loading = {}
+
+    def clear(self):
+        """Remove all languages from memory."""
+        with self.lock:
+            self.languages.clear()
+
+    @staticmethod
+    def load(language):
+        """Load translation memory for language from the database."""
+        from weblate.trans.models.unit import Unit
+        memory = LanguageMemory()
+        units = Unit.objects.filter(
+            translated=True,
+            translation__language_id=language,
+        ).values_list(
+            'pk',
+            'source',
+            'target',
+            'translation__subproject__project_id',
+            'translation__subproject__project__name',
+            'translation__subproject__name',
+        )
+        for pk, source, target, project, project_name, name in units:
+            memory.add(
+                pk, source, target, project, '/'.join((project_name, name))
+            )
+        return memory
+
+    def get(self, language):
+        """Return memory for language, loading it if needed.
+
+        The database is queried without the lock held by single thread,
+        others get the stale memory meanwhile or wait for the load if there
+        is none. Updates done meanwhile are recorded and applied to the
+        loaded memory before it replaces the current one.
+        """
+        while True:
+            with self.lock:
+                memory = self.languages.get(language)
+                if (memory is not None and
+                        memory.timestamp + settings.MT_WEBLATE_REFRESH >=
+                        time.time()):
+                    return memory
+                pending = self.loading.get(language)
+                if pending is None:
+                    pending = self.loading[language] = PendingLoad()
+                    break
+                if memory is not None:
+                    return memory
+            # Wait for the load, it is retried if it has failed
+            pending.done.wait()
+
+        memory = None
+        try:
+            memory = self.load(language)
+        finally:
+            with self.lock:
+                del self.loading[language]
+                if memory is not None:
+                    for method, args in pending.updates:
+                        getattr(memory, method)(*args)
+                    self.languages[language] = memory
+            pending.done.set()
+        return memory
+
+    def apply(self, language, updates):
+        """Apply list of method and arguments pairs to language memory.
+
+        The updates are recorded for load in progress.
+        """
+        with self.lock:
+            memory = self.languages.get(language)
+            if language in self.loading:
+                self.loading[language].updates.extend(updates)
+        if memory is not None:
+            with memory.lock:
+                for method, args in updates:
+                    getattr(memory, method)(*args)
+
+    def update_units(self, units):
+        """Update memory with saved units.
+
+        Only languages already loaded are updated, others will be loaded
+        with current content on first lookup.
+        """
+        updates = defaultdict(list)
+        for unit in units:
+            language = unit.translation.language_id
+            if not unit.translated:
+                updates[language].append(('remove', (unit.pk,)))
+                continue
+            subproject = unit.translation.subproject
+            updates[language].append((
+                'add',
+                (
+                    unit.pk,
+                    unit.source,
+                    unit.target,
+                    subproject.project_id,
+                    force_text(subproject),
+                )
+            ))
+        for language, items in updates.items():
+            self.apply(language, items)
+
+    def delete_units(self, language, pks):
+        """Remove deleted units from memory."""
+        self.apply(language, [('remove', (pk,)) for pk in pks])
+
+    def lookup(self, unit, projects):
+        """Return translations of same string in given projects."""
+        memory = self.get(unit.translation.language_id)
+        with memory.lock:
+            return memory.lookup(
+                unit.get_source_plurals()[0], projects, unit.pk
+            )
+
+    def lookup_similar(self, unit, projects, top=5):
+        """Return similarity and translation pairs for similar strings."""
+        memory = self.get(unit.translation.language_id)
+        with memory.lock:
+            return memory.lookup_similar(
+                unit.get_source_plurals()[0],
+                projects,
+                unit.pk,
+                settings.MT_WEBLATE_THRESHOLD,
+                top
+            )
+
+
+TRANSLATION_MEMORY = TranslationMemory()
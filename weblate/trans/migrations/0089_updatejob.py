@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11 on 2017-04-24 10:21
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trans', '0087_indexupdate_timestamp'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UpdateJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('started', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('requests', models.IntegerField(default=1)),
+                ('subproject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='trans.SubProject')),
+            ],
+        ),
+    ]
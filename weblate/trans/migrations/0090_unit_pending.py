@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11 on 2017-04-25 09:12
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trans', '0089_updatejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='pending',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+# Fields searched by weblate.trans.search.DatabaseSearch
+FIELDS = ('source', 'target', 'context', 'comment', 'location')
+
+INDEX = 'trans_unit_{0}_fts'
+
+# This has to match SQL generated for SearchVector(field, config='simple'),
+# otherwise the planner will not use the index
+EXPRESSION = "to_tsvector('simple'::regconfig, COALESCE({0}, ''))"
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for field in FIELDS:
+        schema_editor.execute(
+            'CREATE INDEX {0} ON trans_unit USING GIN ({1})'.format(
+                INDEX.format(field),
+                EXPRESSION.format(schema_editor.quote_name(field))
+            )
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for field in FIELDS:
+        schema_editor.execute(
+            'DROP INDEX IF EXISTS {0}'.format(INDEX.format(field))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trans', '0091_replacejob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -29,6 +29,7 @@ from django.dispatch import receiver
 from weblate.accounts.models import Profile
 from weblate.permissions.data import ADMIN_PERMS, ADMIN_ONLY_PERMS
 from weblate.permissions.models import GroupACL
+from weblate.trans.memory import TRANSLATION_MEMORY
 from weblate.trans.models.conf import WeblateConf
 from weblate.trans.models.project import Project
 from weblate.trans.models.subproject import SubProject
@@ -38,6 +39,8 @@ from weblate.trans.models.comment import Comment
 from weblate.trans.models.suggestion import Suggestion, Vote
 from weblate.trans.models.check import Check
 from weblate.trans.models.search import IndexUpdate
+from weblate.trans.models.updatejob import UpdateJob
+from weblate.trans.models.replacejob import ReplaceJob
 from weblate.trans.models.change import Change
 from weblate.trans.models.dictionary import Dictionary
 from weblate.trans.models.source import Source
@@ -58,9 +61,9 @@ from weblate.utils.decorators import disable_for_loaddata
 
 __all__ = [
     'Project', 'SubProject', 'Translation', 'Unit', 'Check', 'Suggestion',
-    'Comment', 'Vote', 'IndexUpdate', 'Change', 'Dictionary', 'Source',
-    'Advertisement', 'WhiteboardMessage', 'ComponentList',
-    'WeblateConf',
+    'Comment', 'Vote', 'IndexUpdate', 'UpdateJob', 'ReplaceJob', 'Change',
+    'Dictionary', 'Source', 'Advertisement', 'WhiteboardMessage',
+    'ComponentList', 'WeblateConf',
 ]
 
 
@@ -79,6 +82,14 @@ def delete_object_dir(sender, instance, **kwargs):
         shutil.rmtree(project_path)
 
 
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=SubProject)
+@receiver(post_delete, sender=Translation)
+def clear_translation_memory(sender, instance, **kwargs):
+    """Handler to drop deleted translations from translation memory."""
+    TRANSLATION_MEMORY.clear()
+
+
 @receiver(post_save, sender=Source)
 @disable_for_loaddata
 def update_source(sender, instance, **kwargs):
@@ -66,8 +66,37 @@ class WeblateConf(AppConf):
     # tmserver URL
     MT_TMSERVER = None
 
-    # Limit (in seconds) for Weblate machine translation
-    MT_WEBLATE_LIMIT = 15
+    # Time in seconds after which Weblate translation memory is reloaded
+    MT_WEBLATE_REFRESH = 3600
+
+    # Minimal similarity of strings suggested by Weblate similarity
+    MT_WEBLATE_THRESHOLD = 0.5
+
+    # Time in seconds to cache machine translations
+    MT_CACHE_TIMEOUT = 86400
+
+    # Time limit in seconds for querying all machine translation services
+    MT_SERVICES_TIMEOUT = 5
+
+    # Number of threads querying machine translation services for editor
+    MT_SERVICES_THREADS = 10
+
+    # Timeout in seconds for single machine translation request
+    MT_REQUEST_TIMEOUT = 1.5
+
+    # Retries of failed machine translation requests
+    MT_RETRIES = 2
+    MT_RETRY_BACKOFF = 0.1
+
+    # Failures after which machine translation service is not used
+    MT_CIRCUIT_FAILURES = 5
+    MT_CIRCUIT_RESET = 60
+
+    # Number of kept alive connections to each machine translation service
+    MT_POOL_SIZE = 10
+
+    # Number of parallel requests for machine translating several strings
+    MT_BATCH_THREADS = 4
 
     # Title of site to use
     SITE_TITLE = 'Weblate'
@@ -84,8 +113,14 @@ class WeblateConf(AppConf):
     # Enable sharing
     ENABLE_SHARING = True
 
-    # Whether to run hooks in background
-    BACKGROUND_HOOKS = True
+    # Whether to queue repository updates triggered by hooks
+    BACKGROUND_HOOKS = False
+
+    # Whether to run search and replace in background
+    BACKGROUND_REPLACE = False
+
+    # Whether to propagate translations in background
+    BACKGROUND_PROPAGATION = False
 
     # Number of nearby messages to show in each direction
     NEARBY_MESSAGES = 5
@@ -97,9 +132,21 @@ class WeblateConf(AppConf):
     LAZY_COMMITS = True
     COMMIT_PENDING_HOURS = 24
 
+    # Delay writing translation files
+    LAZY_WRITES = False
+    LAZY_WRITES_COUNT = 100
+    LAZY_WRITES_INTERVAL = 60
+
+    # Cache of parsed translation files, size in megabytes
+    STORE_CACHE_SIZE = 64
+    STORE_CACHE_DIR = None
+
     # Offload indexing
     OFFLOAD_INDEXING = False
 
+    # Fulltext search backend
+    SEARCH_BACKEND = 'weblate.trans.search.WhooshSearch'
+
     # Translation locking
     AUTO_LOCK = True
     AUTO_LOCK_TIME = 60
@@ -389,6 +389,11 @@ class Project(models.Model, PercentMixin, URLMixin, PathMixin):
             ret &= component.do_update(request, method=method)
         return ret
 
+    def queue_update(self):
+        """Queue update of all git repos."""
+        for component in self.all_repo_components():
+            component.queue_update()
+
     def do_push(self, request=None):
         """Pushe all git repos."""
         return self.commit_pending(request, on_commit=False)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import unicode_literals
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import models
+from django.utils import timezone
+from django.utils.encoding import python_2_unicode_compatible
+
+
+class ReplaceJobManager(models.Manager):
+    # pylint: disable=W0232
+
+    def start(self, user, keep=86400):
+        """Create job for user, removing jobs older than keep seconds."""
+        self.filter(
+            timestamp__lt=timezone.now() - timedelta(seconds=keep)
+        ).delete()
+        return self.create(user=user)
+
+
+@python_2_unicode_compatible
+class ReplaceJob(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
+    done = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    updated = models.IntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+
+    objects = ReplaceJobManager()
+
+    class Meta(object):
+        app_label = 'trans'
+
+    def __str__(self):
+        return '{0}:{1}'.format(self.user_id, self.timestamp)
+
+    def get_progress(self):
+        """Return progress of the job as dictionary."""
+        return {
+            'done': self.done,
+            'total': self.total,
+            'updated': self.updated,
+            'finished': self.finished,
+            'error': self.error or None,
+        }
@@ -21,6 +21,7 @@
 from __future__ import unicode_literals
 
 from django.db import models
+from django.utils import timezone
 from django.utils.encoding import python_2_unicode_compatible
 
 
@@ -30,6 +31,7 @@ class IndexUpdate(models.Model):
     source = models.BooleanField(default=True)
     to_delete = models.BooleanField(default=False)
     language_code = models.SlugField()
+    timestamp = models.DateTimeField(default=timezone.now)
 
     class Meta(object):
         app_label = 'trans'
@@ -53,6 +53,7 @@ from weblate.trans.signals import (
 )
 from weblate.trans.vcs import RepositoryException, VCS_REGISTRY, VCS_CHOICES
 from weblate.trans.models.translation import Translation
+from weblate.trans.models.unit import Unit
 from weblate.trans.validators import (
     validate_filemask, validate_extra_file,
     validate_autoaccept, validate_check_flags, validate_commit_message,
@@ -63,6 +64,7 @@ from weblate.accounts.notifications import (
 )
 from weblate.accounts.models import get_author_name
 from weblate.trans.models.change import Change
+from weblate.trans.models.updatejob import UpdateJob
 from weblate.utils.scripts import get_script_choices
 from weblate.utils.validators import validate_repoweb
 
@@ -711,12 +713,21 @@ class SubProject(models.Model, PercentMixin, URLMixin, PathMixin):
             # commit possible pending changes
             self.commit_pending(request, skip_push=True)
 
+            try:
+                previous_head = self.repository.last_revision
+            except RepositoryException:
+                previous_head = None
+
             # update local branch
             ret = self.update_branch(request, method=method)
 
-        # create translation objects for all files
+            changed = None
+            if ret:
+                changed = self.get_changed_files(previous_head)
+
+        # create translation objects for changed files
         try:
-            self.create_translations(request=request)
+            self.create_translations(request=request, changed=changed)
         except ParseError:
             ret = False
 
@@ -726,6 +737,10 @@ class SubProject(models.Model, PercentMixin, URLMixin, PathMixin):
 
         return ret
 
+    def queue_update(self):
+        """Queue repository update to be processed in background."""
+        UpdateJob.objects.enqueue(self)
+
     def push_if_needed(self, request, do_update=True, on_commit=True):
         """Wrapper to push if needed
 
@@ -834,6 +849,14 @@ class SubProject(models.Model, PercentMixin, URLMixin, PathMixin):
             )
             return False
 
+        # Drop changes not yet written to the files
+        translations = Translation.objects.filter(
+            subproject__in=[self] + list(self.get_linked_childs()),
+            unit__pending=True
+        ).distinct()
+        for translation in translations:
+            translation.discard_pending()
+
         # create translation objects for all files
         self.create_translations(request=request)
 
@@ -998,19 +1021,78 @@ class SubProject(models.Model, PercentMixin, URLMixin, PathMixin):
 
         return sorted(matches)
 
+    def get_changed_files(self, previous_head):
+        """Return set of files changed in the repository since given revision.
+
+        Returns None if it is not possible to figure out changes.
+        """
+        if previous_head is None:
+            return None
+        try:
+            changed = self.repository.get_changed_files(previous_head)
+        except RepositoryException as error:
+            self.log_error('failed to list changed files: %s', error)
+            return None
+        if changed is None:
+            return None
+        self.log_info('%d files changed in repository', len(changed))
+        return set(changed)
+
+    def get_unchanged_translations(self, changed):
+        """Return translations not affected by changed files.
+
+        Translations with stored revision not matching the file are
+        excluded as well, so that failed or reset ones get checked.
+        """
+        # Template change affects all translations
+        if self.has_template():
+            template = self.repository.resolve_symlinks(self.template)
+            if template in changed:
+                return {}
+        result = {}
+        for translation in self.translation_set.select_related('language'):
+            filename = translation.filename
+            if filename in changed:
+                continue
+            if self.repository.resolve_symlinks(filename) in changed:
+                continue
+            # Share repository object with cached file hashes
+            translation.subproject = self
+            try:
+                if translation.get_git_blob_hash() != translation.revision:
+                    continue
+            except (IOError, OSError):
+                continue
+            result[filename] = translation
+        return result
+
     def create_translations(self, force=False, langs=None, request=None,
-                            changed_template=False):
-        """Load translations from VCS."""
+                            changed_template=False, bulk=False, changed=None):
+        """Load translations from VCS.
+
+        With set of changed files, only these are checked, remaining
+        existing translations are considered to be up to date.
+        """
         translations = set()
         languages = set()
         matches = self.get_mask_matches()
+        if changed is None or force or changed_template:
+            unchanged = {}
+        else:
+            unchanged = self.get_unchanged_translations(changed)
         for pos, path in enumerate(matches):
-            with transaction.atomic():
-                code = self.get_lang_code(path)
-                if langs is not None and code not in langs:
-                    self.log_info('skipping %s', path)
-                    continue
+            code = self.get_lang_code(path)
+            if langs is not None and code not in langs:
+                self.log_info('skipping %s', path)
+                continue
+
+            if path in unchanged:
+                self.log_debug('skipping unchanged %s', path)
+                translations.add(unchanged[path].id)
+                languages.add(unchanged[path].language.code)
+                continue
 
+            with transaction.atomic():
                 self.log_info(
                     'checking %s (%s) [%d/%d]',
                     path,
@@ -1023,13 +1105,14 @@ class SubProject(models.Model, PercentMixin, URLMixin, PathMixin):
                     self.log_error('duplicate language found: %s', lang.code)
                     continue
                 translation = Translation.objects.check_sync(
-                    self, lang, code, path, force, request=request
+                    self, lang, code, path, force, request=request, bulk=bulk
                 )
                 translations.add(translation.id)
                 languages.add(lang.code)
                 # Remove fuzzy flag on template name change
                 if changed_template:
                     translation.unit_set.update(fuzzy=False)
+                    translation.update_stats()
 
         # Delete possibly no longer existing translations
         if langs is None:
@@ -1048,7 +1131,9 @@ class SubProject(models.Model, PercentMixin, URLMixin, PathMixin):
                 'updating linked project %s',
                 subproject
             )
-            subproject.create_translations(force, langs, request=request)
+            subproject.create_translations(
+                force, langs, request=request, bulk=bulk, changed=changed
+            )
 
         self.log_info('updating completed')
 
@@ -1360,6 +1445,11 @@ class SubProject(models.Model, PercentMixin, URLMixin, PathMixin):
         """
         self.set_default_branch()
 
+        # Drop cached values as the configuration might have changed, the
+        # component is shared with translations during update
+        self._all_flags = None
+        self._template_store = None
+
         # Detect if VCS config has changed (so that we have to pull the repo)
         changed_git = True
         changed_setup = False
@@ -1421,7 +1511,11 @@ class SubProject(models.Model, PercentMixin, URLMixin, PathMixin):
 
     def repo_needs_commit(self):
         """Check whether there are some not committed changes"""
-        return self.repository.needs_commit()
+        pending = Unit.objects.filter(
+            translation__subproject=self,
+            pending=True
+        )
+        return pending.exists() or self.repository.needs_commit()
 
     def repo_needs_merge(self):
         """Check whether there is something to merge from remote repository"""
@@ -20,14 +20,17 @@
 
 from __future__ import unicode_literals
 
+from collections import OrderedDict
 import os
 import codecs
 from datetime import timedelta
+import threading
+import time
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.db.models import Sum, Count
+from django.db.models import Sum, Count, F
 from django.utils.translation import ugettext as _
 from django.utils.safestring import mark_safe
 from django.utils.encoding import python_2_unicode_compatible, force_text
@@ -39,6 +42,7 @@ from django.core.urlresolvers import reverse
 from weblate.lang.models import Language
 from weblate.trans.formats import ParseError, try_load
 from weblate.trans.checks import CHECKS
+from weblate.trans.memory import TRANSLATION_MEMORY
 from weblate.trans.models.unit import Unit
 from weblate.trans.models.suggestion import Suggestion
 from weblate.trans.signals import vcs_pre_commit, vcs_post_commit
@@ -50,8 +54,23 @@ from weblate.trans.boolean_sum import do_boolean_sum
 from weblate.accounts.notifications import notify_new_string
 from weblate.accounts.models import get_author_name
 from weblate.trans.models.change import Change
+from weblate.trans.bulk import UnitSync
 from weblate.trans.checklists import TranslationChecklist
 
+# Fields maintained by update_stats and update_stats_delta
+STATS_FIELDS = (
+    'total', 'total_words',
+    'translated', 'translated_words',
+    'fuzzy', 'fuzzy_words',
+    'failing_checks', 'failing_checks_words',
+    'have_suggestion', 'have_comment',
+)
+
+# Parsed stores kept in memory with LAZY_WRITES, see Translation.store
+LAZY_STORES = OrderedDict()
+LAZY_STORES_LOCK = threading.Lock()
+LAZY_STORES_SIZE = 16
+
 
 class TranslationManager(models.Manager):
     # pylint: disable=W0232
@@ -62,7 +81,7 @@ class TranslationManager(models.Manager):
         )
 
     def check_sync(self, subproject, lang, code, path, force=False,
-                   request=None):
+                   request=None, bulk=False):
         """Parse translation meta info and updates translation object"""
         translation, dummy = self.get_or_create(
             language=lang,
@@ -76,7 +95,9 @@ class TranslationManager(models.Manager):
             force = True
             translation.filename = path
             translation.language_code = code
-        translation.check_sync(force, request=request)
+        # Share the component, so that template is parsed only once
+        translation.subproject = subproject
+        translation.check_sync(force, request=request, bulk=bulk)
 
         return translation
 
@@ -186,6 +207,20 @@ class Translation(models.Model, URLMixin, PercentMixin, LoggerMixin):
         self._last_change_obj_valid = False
         self._skip_commit = False
 
+    def save(self, *args, **kwargs):
+        """Save translation without overwriting statistics.
+
+        The statistics are updated incrementally in the database, so
+        the stored values can be newer than those in this instance.
+        """
+        # pylint: disable=W0212
+        if not self._state.adding and 'update_fields' not in kwargs:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in STATS_FIELDS
+            ]
+        super(Translation, self).save(*args, **kwargs)
+
     @property
     def log_prefix(self):
         return '/'.join((
@@ -401,20 +436,65 @@ class Translation(models.Model, URLMixin, PercentMixin, LoggerMixin):
         """Check whether we support language pack download."""
         return self.subproject.file_format_cls.language_pack is not None
 
+    def get_store_signature(self):
+        """Return modification time and size of files the store uses."""
+        filenames = [self.get_filename()]
+        if self.subproject.has_template():
+            filenames.append(self.subproject.get_template_filename())
+        result = []
+        for filename in filenames:
+            stat = os.stat(filename)
+            result.append((stat.st_mtime, stat.st_size))
+        return tuple(result)
+
+    def load_cached_store(self):
+        """Load translate-toolkit storage kept in memory.
+
+        The store is reused between requests as long as the files on the
+        disk are not changed. It contains changes which are not yet
+        written to the file, see write_pending.
+        """
+        signature = self.get_store_signature()
+        with LAZY_STORES_LOCK:
+            cached = LAZY_STORES.pop(self.pk, None)
+            if cached is not None and cached[0] == signature:
+                LAZY_STORES[self.pk] = cached
+                return cached[1]
+        store = self.load_store()
+        self.cache_store(store, signature)
+        return store
+
+    def cache_store(self, store, signature=None):
+        """Keep parsed store in memory for later use."""
+        if signature is None:
+            signature = self.get_store_signature()
+        with LAZY_STORES_LOCK:
+            LAZY_STORES.pop(self.pk, None)
+            LAZY_STORES[self.pk] = (signature, store)
+            while len(LAZY_STORES) > LAZY_STORES_SIZE:
+                LAZY_STORES.popitem(last=False)
+
     @property
     def store(self):
         """Return translate-toolkit storage object for a translation."""
         if self._store is None:
             try:
-                self._store = self.load_store()
+                if settings.LAZY_WRITES:
+                    self._store = self.load_cached_store()
+                else:
+                    self._store = self.load_store()
             except ParseError:
                 raise
             except Exception as exc:
                 self.subproject.handle_parse_error(exc, self)
         return self._store
 
-    def check_sync(self, force=False, request=None, change=None):
-        """Check whether database is in sync with git and possibly updates"""
+    def check_sync(self, force=False, request=None, change=None, bulk=False):
+        """Check whether database is in sync with git and possibly updates
+
+        With bulk enabled, the units are updated in batches instead of
+        one by one.
+        """
 
         if change is None:
             change = Change.ACTION_UPDATE
@@ -426,17 +506,78 @@ class Translation(models.Model, URLMixin, PercentMixin, LoggerMixin):
         # Check if we're not already up to date
         if self.revision != self.get_git_blob_hash():
             reason = 'revision has changed'
+            # Parsed store does not match the file anymore
+            self._store = None
         elif force:
             reason = 'check forced'
         else:
             return
 
+        # Do not lose changes not yet written to the file
+        self.write_pending()
+
         self.log_info(
             'processing %s, %s',
             self.filename,
             reason,
         )
 
+        if bulk:
+            sync = UnitSync(self, user)
+            created_units = sync.sync()
+            was_new = sync.was_new
+        else:
+            created_units, was_new = self.sync_units(user)
+
+        # Following query can get huge, so we should find better way
+        # to delete stale units, probably sort of garbage collection
+
+        # We should also do cleanup on source strings tracking objects
+
+        # Get lists of stale units to delete
+        units_to_delete = self.unit_set.exclude(
+            id__in=created_units
+        )
+        # We need to resolve this now as otherwise list will become empty after
+        # delete
+        deleted_units = units_to_delete.count()
+
+        # Actually delete units
+        TRANSLATION_MEMORY.delete_units(
+            self.language_id,
+            units_to_delete.values_list('pk', flat=True)
+        )
+        units_to_delete.delete()
+
+        # The units now match the file
+        self.unit_set.filter(pending=True).update(pending=False)
+
+        # Update revision and stats
+        self.save()
+        self.update_stats()
+        self.store_hash()
+
+        # Cleanup checks cache if there were some deleted units
+        if deleted_units:
+            self.invalidate_cache()
+
+        # Store change entry
+        Change.objects.create(
+            translation=self,
+            action=change,
+            user=user,
+            author=user
+        )
+
+        # Notify subscribed users
+        if was_new:
+            notify_new_string(self)
+
+    def sync_units(self, user):
+        """Update database units from the file one by one.
+
+        Returns set of unit ids and whether there were new strings.
+        """
         # List of created units (used for cleanup and duplicates detection)
         created_units = set()
 
@@ -485,41 +626,7 @@ class Translation(models.Model, URLMixin, PercentMixin, LoggerMixin):
             # Store current unit ID
             created_units.add(newunit.id)
 
-        # Following query can get huge, so we should find better way
-        # to delete stale units, probably sort of garbage collection
-
-        # We should also do cleanup on source strings tracking objects
-
-        # Get lists of stale units to delete
-        units_to_delete = self.unit_set.exclude(
-            id__in=created_units
-        )
-        # We need to resolve this now as otherwise list will become empty after
-        # delete
-        deleted_units = units_to_delete.count()
-
-        # Actually delete units
-        units_to_delete.delete()
-
-        # Update revision and stats
-        self.update_stats()
-        self.store_hash()
-
-        # Cleanup checks cache if there were some deleted units
-        if deleted_units:
-            self.invalidate_cache()
-
-        # Store change entry
-        Change.objects.create(
-            translation=self,
-            action=change,
-            user=user,
-            author=user
-        )
-
-        # Notify subscribed users
-        if was_new:
-            notify_new_string(self)
+        return created_units, was_new
 
     def get_last_remote_commit(self):
         return self.subproject.get_last_remote_commit()
@@ -550,68 +657,53 @@ class Translation(models.Model, URLMixin, PercentMixin, LoggerMixin):
             )
         ])
 
-    def update_stats(self):
-        """Update translation statistics."""
-        # Grab stats
+    def calculate_stats(self):
+        """Calculate translation statistics from units."""
+        # The aggregates can not be named same as unit fields
         stats = self.unit_set.aggregate(
-            Sum('num_words'),
-            Count('id'),
-            fuzzy__sum=do_boolean_sum('fuzzy'),
+            total__sum=Count('id'),
+            total_words__sum=Sum('num_words'),
             translated__sum=do_boolean_sum('translated'),
-            has_failing_check__sum=do_boolean_sum('has_failing_check'),
-            has_suggestion__sum=do_boolean_sum('has_suggestion'),
-            has_comment__sum=do_boolean_sum('has_comment'),
+            translated_words__sum=do_boolean_sum('translated', 'num_words'),
+            fuzzy__sum=do_boolean_sum('fuzzy'),
+            fuzzy_words__sum=do_boolean_sum('fuzzy', 'num_words'),
+            failing_checks__sum=do_boolean_sum('has_failing_check'),
+            failing_checks_words__sum=do_boolean_sum(
+                'has_failing_check', 'num_words'
+            ),
+            have_suggestion__sum=do_boolean_sum('has_suggestion'),
+            have_comment__sum=do_boolean_sum('has_comment'),
         )
+        # Sums are None if there are no units
+        return {
+            key: int(stats['{0}__sum'.format(key)] or 0)
+            for key in STATS_FIELDS
+        }
 
-        # Check if we have any units
-        if stats['num_words__sum'] is None:
-            self.total_words = 0
-            self.total = 0
-            self.fuzzy = 0
-            self.translated = 0
-            self.failing_checks = 0
-            self.have_suggestion = 0
-            self.have_comment = 0
-        else:
-            self.total_words = stats['num_words__sum']
-            self.total = stats['id__count']
-            self.fuzzy = int(stats['fuzzy__sum'])
-            self.translated = int(stats['translated__sum'])
-            self.failing_checks = int(stats['has_failing_check__sum'])
-            self.have_suggestion = int(stats['has_suggestion__sum'])
-            self.have_comment = int(stats['has_comment__sum'])
-
-        # Count translated words
-        self.translated_words = self.unit_set.filter(
-            translated=True
-        ).aggregate(
-            Sum('num_words')
-        )['num_words__sum']
-        # Nothing matches filter
-        if self.translated_words is None:
-            self.translated_words = 0
-
-        # Count fuzzy words
-        self.fuzzy_words = self.unit_set.filter(
-            fuzzy=True
-        ).aggregate(
-            Sum('num_words')
-        )['num_words__sum']
-        # Nothing matches filter
-        if self.fuzzy_words is None:
-            self.fuzzy_words = 0
-
-        # Count words with failing checks
-        self.failing_checks_words = self.unit_set.filter(
-            has_failing_check=True
-        ).aggregate(
-            Sum('num_words')
-        )['num_words__sum']
-        # Nothing matches filter
-        if self.failing_checks_words is None:
-            self.failing_checks_words = 0
+    def update_stats(self):
+        """Update translation statistics."""
+        for key, value in self.calculate_stats().items():
+            setattr(self, key, value)
+        self.save(update_fields=STATS_FIELDS)
 
-        self.save()
+    def update_stats_delta(self, old, new):
+        """Apply change in unit statistics counters.
+
+        This avoids recalculating statistics of whole translation when
+        single unit is changed.
+        """
+        delta = {}
+        for key in STATS_FIELDS:
+            value = new.get(key, 0) - old.get(key, 0)
+            if value:
+                delta[key] = value
+        if not delta:
+            return
+        Translation.objects.filter(pk=self.pk).update(
+            **{key: F(key) + value for key, value in delta.items()}
+        )
+        for key, value in delta.items():
+            setattr(self, key, getattr(self, key) + value)
 
     def store_hash(self):
         """Store current hash in database."""
@@ -734,9 +826,16 @@ class Translation(models.Model, URLMixin, PercentMixin, LoggerMixin):
         if sync:
             self.store_hash()
 
+    def has_pending_writes(self):
+        """Check whether there are changes not written to the file."""
+        return self.unit_set.filter(pending=True).exists()
+
     def repo_needs_commit(self):
         """Check whether there are some not committed changes."""
-        return self.subproject.repository.needs_commit(self.filename)
+        return (
+            self.has_pending_writes() or
+            self.subproject.repository.needs_commit(self.filename)
+        )
 
     def repo_needs_merge(self):
         return self.subproject.repo_needs_merge()
@@ -755,7 +854,16 @@ class Translation(models.Model, URLMixin, PercentMixin, LoggerMixin):
         """
         if self._skip_commit:
             return False
-        with self.subproject.repository.lock:
+        # Changes kept in the database have to be in the file
+        self.write_pending()
+        lock = self.subproject.repository.lock
+        # Check for changes in shared mode first, not to block others
+        # when there is nothing to commit
+        if not force_new and not lock.is_locked:
+            with lock.shared:
+                if not self.repo_needs_commit():
+                    return False
+        with lock:
             # Is there something for commit?
             if not force_new and not self.repo_needs_commit():
                 return False
@@ -789,8 +897,125 @@ class Translation(models.Model, URLMixin, PercentMixin, LoggerMixin):
 
         return True
 
+    def store_unit(self, pounit, add, unit):
+        """Store unit content into translate-toolkit unit."""
+        # Store translations
+        if unit.is_plural():
+            pounit.set_target(unit.get_target_plurals())
+        else:
+            pounit.set_target(unit.target)
+
+        # Update fuzzy flag
+        pounit.mark_fuzzy(unit.fuzzy)
+
+        # Optionally add unit to translation file
+        if add:
+            self.store.add_unit(pounit)
+
+    def update_store_header(self, author, timestamp):
+        """Update translation file header."""
+        if not timezone.is_aware(timestamp):
+            timestamp = timezone.make_aware(timestamp, timezone.utc)
+
+        # Prepare headers to update
+        headers = {
+            'add': True,
+            'plural_forms': self.language.get_plural_form(),
+            'language': self.language_code,
+            'PO_Revision_Date': timestamp.strftime('%Y-%m-%d %H:%M%z'),
+        }
+        if author is not None:
+            headers['last_translator'] = author
+
+        # Optionally store language team with link to website
+        if self.subproject.project.set_translation_team:
+            headers['language_team'] = '{0} <{1}>'.format(
+                self.language.name,
+                get_site_url(self.get_absolute_url())
+            )
+
+        # Optionally store email for reporting bugs in source
+        report_source_bugs = self.subproject.report_source_bugs
+        if report_source_bugs != '':
+            headers['report_msgid_bugs_to'] = report_source_bugs
+
+        # Update genric headers
+        self.store.update_header(
+            **headers
+        )
+
+    def needs_write(self):
+        """Check whether pending changes should be written now."""
+        if not settings.LAZY_WRITES or not settings.LAZY_COMMITS:
+            return True
+        pending = self.unit_set.filter(pending=True).count()
+        if pending + 1 >= settings.LAZY_WRITES_COUNT:
+            return True
+        age = time.time() - os.path.getmtime(self.get_filename())
+        return age >= settings.LAZY_WRITES_INTERVAL
+
+    def write_pending(self, author=None, timestamp=None, unit=None):
+        """Write changes kept in the database to the translation file.
+
+        The unit is the one already updated in the store by update_unit,
+        it is written even if there are no other pending changes.
+        """
+        pending = self.unit_set.filter(pending=True)
+        if unit is not None:
+            pending = pending.exclude(pk=unit.pk)
+        elif not pending.exists():
+            return False
+
+        with self.subproject.repository.lock, transaction.atomic():
+            units = list(pending.select_for_update())
+            for pending_unit in units:
+                pounit, add = self.store.find_unit(
+                    pending_unit.context,
+                    pending_unit.get_source_plurals()[0]
+                )
+                if pounit is None or pounit.is_obsolete():
+                    self.log_error(
+                        'message %s disappeared!', pending_unit
+                    )
+                    continue
+                self.store_unit(pounit, add, pending_unit)
+
+            if unit is None:
+                author = self.get_last_author(True)
+                timestamp = self.last_change
+            if timestamp is None:
+                timestamp = timezone.now()
+            self.log_info('writing %d pending changes', len(units))
+            self.update_store_header(author, timestamp)
+            self.store.save()
+            written = [pending_unit.pk for pending_unit in units]
+            if unit is not None:
+                written.append(unit.pk)
+            self.unit_set.filter(pk__in=written).update(pending=False)
+            self.store_hash()
+            if settings.LAZY_WRITES:
+                self.cache_store(self.store)
+
+        return True
+
+    def discard_pending(self):
+        """Throw away changes not yet written to the file.
+
+        The units are loaded again from the file on next check_sync.
+        """
+        with LAZY_STORES_LOCK:
+            LAZY_STORES.pop(self.pk, None)
+        self._store = None
+        self.unit_set.filter(pending=True).update(pending=False)
+        self.revision = ''
+        Translation.objects.filter(pk=self.pk).update(revision='')
+
     def update_unit(self, unit, request, user=None):
-        """Update backend file and unit."""
+        """Update backend file and unit.
+
+        With LAZY_WRITES the change is only stored in the database and
+        the parsed store until write_pending is called.
+        """
         if user is None:
             user = request.user
         # Save with lock acquired
@@ -811,57 +1036,23 @@ class Translation(models.Model, URLMixin, PercentMixin, LoggerMixin):
                     unit.fuzzy == pounit.is_fuzzy()):
                 return False, pounit
 
-            # Store translations
-            if unit.is_plural():
-                pounit.set_target(unit.get_target_plurals())
-            else:
-                pounit.set_target(unit.target)
-
-            # Update fuzzy flag
-            pounit.mark_fuzzy(unit.fuzzy)
-
-            # Optionally add unit to translation file
-            if add:
-                self.store.add_unit(pounit)
-
             # We need to update backend now
             author = get_author_name(user)
 
-            # Update po file header
-            now = timezone.now()
-            if not timezone.is_aware(now):
-                now = timezone.make_aware(now, timezone.utc)
-
-            # Prepare headers to update
-            headers = {
-                'add': True,
-                'last_translator': author,
-                'plural_forms': self.language.get_plural_form(),
-                'language': self.language_code,
-                'PO_Revision_Date': now.strftime('%Y-%m-%d %H:%M%z'),
-            }
-
-            # Optionally store language team with link to website
-            if self.subproject.project.set_translation_team:
-                headers['language_team'] = '{0} <{1}>'.format(
-                    self.language.name,
-                    get_site_url(self.get_absolute_url())
-                )
+            # commit possible previous changes (by other author)
+            self.commit_pending(request, author)
 
-            # Optionally store email for reporting bugs in source
-            report_source_bugs = self.subproject.report_source_bugs
-            if report_source_bugs != '':
-                headers['report_msgid_bugs_to'] = report_source_bugs
+            # Store translations
+            self.store_unit(pounit, add, unit)
 
-            # Update genric headers
-            self.store.update_header(
-                **headers
-            )
+            # Delay writing the file
+            if not self.needs_write():
+                unit.pending = True
+                return True, pounit
 
-            # commit possible previous changes (by other author)
-            self.commit_pending(request, author)
             # save translation changes
-            self.store.save()
+            unit.pending = False
+            self.write_pending(author, timezone.now(), unit)
             # commit VCS repo if needed
             self.git_commit(request, author, timezone.now(), sync=True)
 
@@ -1009,9 +1200,11 @@ class Translation(models.Model, URLMixin, PercentMixin, LoggerMixin):
 
         Needed for template based translations to add new strings.
         """
+        from weblate.trans.bulk import propagate_changes
         not_found = 0
         skipped = 0
         accepted = 0
+        translated = []
 
         # Are there any translations to propagate?
         # This is just an optimalization to avoid doing that for every unit.
@@ -1044,19 +1237,23 @@ class Translation(models.Model, URLMixin, PercentMixin, LoggerMixin):
 
             accepted += 1
 
-            unit.translate(
+            saved = unit.translate(
                 request,
                 split_plural(unit2.get_target()),
                 add_fuzzy or set_fuzzy,
                 change_action=Change.ACTION_UPLOAD,
-                propagate=propagate
+                propagate=False
             )
+            if saved and propagate:
+                translated.append(unit)
 
         self._skip_commit = False
 
-        if accepted > 0:
-            self.update_stats()
+        # Propagate all uploaded translations at once
+        if translated:
+            propagate_changes(request, translated, Change.ACTION_UPLOAD)
 
+        if accepted > 0:
             if merge_header:
                 self.store.merge_header(store2)
                 self.store.save()
@@ -1087,10 +1284,6 @@ class Translation(models.Model, URLMixin, PercentMixin, LoggerMixin):
             else:
                 skipped += 1
 
-        # Update suggestion count
-        if accepted > 0:
-            self.update_stats()
-
         return (not_found, skipped, accepted, store.count_units())
 
     def merge_upload(self, request, fileobj, overwrite, author=None,
@@ -23,7 +23,6 @@ from __future__ import unicode_literals
 from copy import copy
 import functools
 import traceback
-import multiprocessing
 
 from django.conf import settings
 from django.db import models
@@ -39,7 +38,8 @@ from weblate.trans.models.check import Check
 from weblate.trans.models.comment import Comment
 from weblate.trans.models.suggestion import Suggestion
 from weblate.trans.models.change import Change
-from weblate.trans.search import update_index_unit, fulltext_search, more_like
+from weblate.trans.memory import TRANSLATION_MEMORY
+from weblate.trans.search import update_index_unit, fulltext_search
 from weblate.accounts.notifications import (
     notify_new_contributor, notify_new_translation
 )
@@ -64,14 +64,6 @@ SIMPLE_FILTERS = {
 SEARCH_FILTERS = ('source', 'target', 'context', 'location', 'comment')
 
 
-def more_like_queue(pk, source, top, queue):
-    """
-    Multiprocess wrapper around more_like.
-    """
-    result = more_like(pk, source, top)
-    queue.put(result)
-
-
 class UnitManager(models.Manager):
     # pylint: disable=W0232
 
@@ -284,40 +276,6 @@ class UnitManager(models.Manager):
             pk=unit.id
         )
 
-    def more_like_this(self, unit, top=5):
-        """Find closely similar units."""
-        if settings.MT_WEBLATE_LIMIT >= 0:
-            queue = multiprocessing.Queue()
-            proc = multiprocessing.Process(
-                target=more_like_queue,
-                args=(unit.pk, unit.source, top, queue)
-            )
-            proc.start()
-            proc.join(settings.MT_WEBLATE_LIMIT)
-            if proc.is_alive():
-                proc.terminate()
-
-            if queue.empty():
-                raise Exception('Request timed out.')
-
-            more_results = queue.get()
-        else:
-            more_results = more_like(unit.pk, unit.source, top)
-
-        same_results = fulltext_search(
-            unit.get_source_plurals()[0],
-            unit.translation.language.code,
-            {'source': True}
-        )
-
-        return self.filter(
-            pk__in=more_results - same_results,
-            translation__language=unit.translation.language,
-            translated=True
-        ).exclude(
-            pk=unit.id
-        )
-
     def same(self, unit, exclude=True):
         """Unit with same source within same project."""
         project = unit.translation.subproject.project
@@ -377,6 +335,9 @@ class Unit(models.Model, LoggerMixin):
 
     priority = models.IntegerField(default=100, db_index=True)
 
+    # Change not yet written to the translation file, see LAZY_WRITES
+    pending = models.BooleanField(default=False, db_index=True)
+
     objects = UnitManager()
 
     class Meta(object):
@@ -395,6 +356,11 @@ class Unit(models.Model, LoggerMixin):
         self._source_info = None
         self._suggestions = None
         self.old_unit = copy(self)
+        # Contribution to translation stats as stored in the database
+        if self.pk is None:
+            self.old_stats = {}
+        else:
+            self.old_stats = self.get_stats_counters()
 
     def __str__(self):
         return '{0} on {1}'.format(
@@ -434,6 +400,44 @@ class Unit(models.Model, LoggerMixin):
 
     def update_from_unit(self, unit, pos, created):
         """Update Unit from ttkit unit."""
+        result = self.prepare_update_from_unit(unit, pos, created)
+        if result is None:
+            return
+        same_content, same_state, contentsum_changed = result
+
+        # Ensure we track source string
+        source_info, source_created = Source.objects.get_or_create(
+            id_hash=self.id_hash,
+            subproject=self.translation.subproject
+        )
+
+        self.priority = source_info.priority
+        self.save(
+            force_insert=created,
+            backend=True,
+            same_content=same_content,
+            same_state=same_state,
+            update_stats=False
+        )
+
+        # Create change object for new source string
+        if source_created:
+            Change.objects.create(
+                translation=self.translation,
+                action=Change.ACTION_NEW_SOURCE,
+                unit=self,
+            )
+        if contentsum_changed:
+            self.update_has_failing_check(recurse=False, update_stats=False)
+            self.update_has_comment(update_stats=False)
+            self.update_has_suggestion(update_stats=False)
+
+    def prepare_update_from_unit(self, unit, pos, created):
+        """Update attributes from ttkit unit without saving.
+
+        Returns None if nothing has changed, otherwise tuple of
+        same_content, same_state and contentsum_changed flags.
+        """
         # Get unit attributes
         location = unit.get_locations()
         flags = unit.get_flags()
@@ -486,13 +490,8 @@ class Unit(models.Model, LoggerMixin):
                 pos == self.position and
                 content_hash == self.content_hash and
                 previous_source == self.previous_source):
-            return
+            return None
 
-        # Ensure we track source string
-        source_info, source_created = Source.objects.get_or_create(
-            id_hash=self.id_hash,
-            subproject=self.translation.subproject
-        )
         contentsum_changed = self.content_hash != content_hash
 
         # Store updated values
@@ -506,25 +505,8 @@ class Unit(models.Model, LoggerMixin):
         self.comment = comment
         self.content_hash = content_hash
         self.previous_source = previous_source
-        self.priority = source_info.priority
-        self.save(
-            force_insert=created,
-            backend=True,
-            same_content=same_content,
-            same_state=same_state
-        )
 
-        # Create change object for new source string
-        if source_created:
-            Change.objects.create(
-                translation=self.translation,
-                action=Change.ACTION_NEW_SOURCE,
-                unit=self,
-            )
-        if contentsum_changed:
-            self.update_has_failing_check(recurse=False, update_stats=False)
-            self.update_has_comment(update_stats=False)
-            self.update_has_suggestion(update_stats=False)
+        return same_content, same_state, contentsum_changed
 
     def is_plural(self):
         """Check whether message is plural."""
@@ -559,14 +541,12 @@ class Unit(models.Model, LoggerMixin):
         return ret
 
     def propagate(self, request, change_action=None):
-        """Propagate current translation to all others."""
-        allunits = Unit.objects.same(self).filter(
-            translation__subproject__allow_translation_propagation=True
-        )
-        for unit in allunits:
-            unit.target = self.target
-            unit.fuzzy = self.fuzzy
-            unit.save_backend(request, False, change_action=change_action)
+        """Propagate current translation to all others.
+
+        The matching units are stored at once for each translation.
+        """
+        from weblate.trans.bulk import propagate_changes
+        propagate_changes(request, [self], change_action)
 
     def update_lock(self, request, user, change_action):
         """Lock updating wrapper"""
@@ -640,13 +620,9 @@ class Unit(models.Model, LoggerMixin):
             self.source = self.target
             self.content_hash = calculate_hash(self.source, self.context)
 
-        # Save updated unit to database
-        self.save(backend=True)
-
-        # Update translation stats
+        # Save updated unit to database, this updates translation stats
         old_translated = self.translation.translated
-        if change_action != Change.ACTION_UPLOAD:
-            self.translation.update_stats()
+        self.save(backend=True)
 
         # Notify subscribed users about new translation
         notify_new_translation(self, self.old_unit, user)
@@ -720,10 +696,14 @@ class Unit(models.Model, LoggerMixin):
             fuzzy=True,
             previous_source=previous_source,
         )
-        # Update source index and stats
-        for unit in same_source.iterator():
+        # Update source index
+        translations = {}
+        for unit in same_source.select_related('translation').iterator():
             update_index_unit(unit, True)
-            unit.translation.update_stats()
+            translations[unit.translation_id] = unit.translation
+        # Update stats of affected translations
+        for translation in translations.values():
+            translation.update_stats()
 
     def generate_change(self, request, author, oldunit, change_action):
         """Create Change entry for saving unit."""
@@ -760,6 +740,22 @@ class Unit(models.Model, LoggerMixin):
             **kwargs
         )
 
+    def get_stats_counters(self):
+        """Return contribution of unit to translation stats."""
+        words = self.num_words
+        return {
+            'total': 1,
+            'total_words': words,
+            'translated': int(self.translated),
+            'translated_words': words if self.translated else 0,
+            'fuzzy': int(self.fuzzy),
+            'fuzzy_words': words if self.fuzzy else 0,
+            'failing_checks': int(self.has_failing_check),
+            'failing_checks_words': words if self.has_failing_check else 0,
+            'have_suggestion': int(self.has_suggestion),
+            'have_comment': int(self.has_comment),
+        }
+
     def save(self, *args, **kwargs):
         """
         Wrapper around save to warn when save did not come from
@@ -777,6 +773,7 @@ class Unit(models.Model, LoggerMixin):
         # Pop parameter indicating that we don't have to process content
         same_content = kwargs.pop('same_content', False)
         same_state = kwargs.pop('same_state', False)
+        update_stats = kwargs.pop('update_stats', True)
         # Keep the force_insert for parent save
         force_insert = kwargs.get('force_insert', False)
 
@@ -787,6 +784,12 @@ class Unit(models.Model, LoggerMixin):
         # Actually save the unit
         super(Unit, self).save(*args, **kwargs)
 
+        # Update translation stats
+        old_stats = self.old_stats
+        self.old_stats = self.get_stats_counters()
+        if update_stats:
+            self.translation.update_stats_delta(old_stats, self.old_stats)
+
         # Update checks if content or fuzzy flag has changed
         if not same_content or not same_state:
             self.run_checks(same_state, same_content, force_insert)
@@ -795,6 +798,10 @@ class Unit(models.Model, LoggerMixin):
         if force_insert or not same_content:
             update_index_unit(self, force_insert)
 
+        # Update translation memory if translation has changed
+        if not same_content or not same_state:
+            TRANSLATION_MEMORY.update_units([self])
+
     def suggestions(self):
         """Return all suggestions for this unit."""
         if self._suggestions is None:
@@ -872,40 +879,44 @@ class Unit(models.Model, LoggerMixin):
             language=None,
         )
 
-    def get_checks_to_run(self, same_state, is_new):
+    def has_same_source(self):
+        """Check whether there is translated message with same source."""
+        project = self.translation.subproject.project
+        return Unit.objects.filter(
+            translation__language=self.translation.language,
+            translation__subproject__project=project,
+            content_hash=self.content_hash,
+            translated=True,
+        ).exclude(
+            id=self.id,
+            translation__subproject__allow_translation_propagation=False,
+        ).exists()
+
+    def get_checks_to_run(self, same_state, is_new, same_source=None):
         """
         Returns list of checks to run on state change.
 
-        Returns tuple of checks to run and whether to do cleanup.
+        Returns tuple of checks to run, whether to do cleanup and whether
+        to delete all existing checks. The same_source can be passed
+        when the result of has_same_source is already known.
         """
         if self.translation.is_template():
-            return {}, True
+            return {}, True, False
 
         checks_to_run = CHECKS.data
         cleanup_checks = True
+        delete_checks = False
 
         if (not same_state or is_new) and not self.translated:
-            # Check whether there is any message with same source
-            project = self.translation.subproject.project
-            same_source = Unit.objects.filter(
-                translation__language=self.translation.language,
-                translation__subproject__project=project,
-                content_hash=self.content_hash,
-                translated=True,
-            ).exclude(
-                id=self.id,
-                translation__subproject__allow_translation_propagation=False,
-            )
+            if same_source is None:
+                same_source = self.has_same_source()
 
             # We run only checks which span across more units
             checks_to_run = {}
 
             # Delete all checks if only message with this source is fuzzy
-            if not same_source.exists():
-                checks = self.checks()
-                if checks.exists():
-                    checks.delete()
-                    self.update_has_failing_check(True)
+            if not same_source:
+                delete_checks = True
             elif 'inconsistent' in CHECKS:
                 # Consistency check checks across more translations
                 checks_to_run['inconsistent'] = CHECKS['inconsistent']
@@ -917,16 +928,22 @@ class Unit(models.Model, LoggerMixin):
 
             cleanup_checks = False
 
-        return checks_to_run, cleanup_checks
+        return checks_to_run, cleanup_checks, delete_checks
 
     def run_checks(self, same_state=True, same_content=True, is_new=False):
         """Update checks for this unit."""
         was_change = False
 
-        checks_to_run, cleanup_checks = self.get_checks_to_run(
+        checks_to_run, cleanup_checks, delete_checks = self.get_checks_to_run(
             same_state, is_new
         )
 
+        if delete_checks:
+            checks = self.checks()
+            if checks.exists():
+                checks.delete()
+                self.update_has_failing_check(True)
+
         src = self.get_source_plurals()
         tgt = self.get_target_plurals()
         old_target_checks = set(
@@ -987,11 +1004,12 @@ class Unit(models.Model, LoggerMixin):
         # Change attribute if it has changed
         if has_failing_check != self.has_failing_check:
             self.has_failing_check = has_failing_check
-            self.save(backend=True, same_content=True, same_state=True)
-
-            # Update translation stats
-            if update_stats:
-                self.translation.update_stats()
+            self.save(
+                backend=True,
+                same_content=True,
+                same_state=True,
+                update_stats=update_stats
+            )
 
         # Invalidate checks cache if there was any change
         # (above code cares only about whether there is failing check
@@ -1007,22 +1025,24 @@ class Unit(models.Model, LoggerMixin):
         has_suggestion = len(self.suggestions()) > 0
         if has_suggestion != self.has_suggestion:
             self.has_suggestion = has_suggestion
-            self.save(backend=True, same_content=True, same_state=True)
-
-            # Update translation stats
-            if update_stats:
-                self.translation.update_stats()
+            self.save(
+                backend=True,
+                same_content=True,
+                same_state=True,
+                update_stats=update_stats
+            )
 
     def update_has_comment(self, update_stats=True):
         """Update flag counting comments."""
         has_comment = len(self.get_comments()) > 0
         if has_comment != self.has_comment:
             self.has_comment = has_comment
-            self.save(backend=True, same_content=True, same_state=True)
-
-            # Update translation stats
-            if update_stats:
-                self.translation.update_stats()
+            self.save(
+                backend=True,
+                same_content=True,
+                same_state=True,
+                update_stats=update_stats
+            )
 
     def nearby(self):
         """Return list of nearby messages based on location."""
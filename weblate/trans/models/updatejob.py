@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import unicode_literals
+
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.encoding import python_2_unicode_compatible
+
+
+class UpdateJobManager(models.Manager):
+    # pylint: disable=W0232
+
+    def enqueue(self, subproject):
+        """Queue repository update for component.
+
+        Components linking to another repository are updated through
+        the linked one, repeated requests are merged into pending job.
+        """
+        if subproject.is_repo_link:
+            subproject = subproject.linked_subproject
+        with transaction.atomic():
+            updated = self.filter(
+                subproject=subproject, started=None
+            ).update(
+                requests=F('requests') + 1
+            )
+            if not updated:
+                self.create(subproject=subproject)
+
+    def pending(self):
+        """Filter jobs waiting for processing."""
+        return self.filter(started=None)
+
+    def fetch(self, stale_timeout=3600):
+        """Take oldest job which is not blocked by running one.
+
+        Only one job is running for a repository, jobs started longer than
+        stale_timeout ago are considered to be abandoned by crashed worker.
+        """
+        cutoff = timezone.now() - timedelta(seconds=stale_timeout)
+        with transaction.atomic():
+            running = self.filter(
+                started__gte=cutoff
+            ).values_list(
+                'subproject_id', flat=True
+            )
+            job = self.select_for_update().filter(
+                Q(started=None) | Q(started__lt=cutoff)
+            ).exclude(
+                subproject_id__in=list(running)
+            ).order_by(
+                'timestamp'
+            ).first()
+            if job is None:
+                return None
+            # Merge duplicate jobs created by concurrent requests
+            duplicates = self.filter(
+                subproject_id=job.subproject_id, started=None
+            ).exclude(
+                pk=job.pk
+            )
+            for duplicate in duplicates:
+                job.requests += duplicate.requests
+            duplicates.delete()
+            job.started = timezone.now()
+            job.save()
+        return job
+
+
+@python_2_unicode_compatible
+class UpdateJob(models.Model):
+    subproject = models.ForeignKey('SubProject', on_delete=models.CASCADE)
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
+    started = models.DateTimeField(null=True, blank=True, db_index=True)
+    requests = models.IntegerField(default=1)
+
+    objects = UpdateJobManager()
+
+    class Meta(object):
+        app_label = 'trans'
+
+    def __str__(self):
+        return '{0}:{1}'.format(self.subproject_id, self.timestamp)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Search and replace in translations."""
+
+from __future__ import unicode_literals
+
+import threading
+
+from django.db import connection, transaction
+from django.utils.encoding import force_text
+
+from weblate.trans.bulk import (
+    group_units, store_grouped, propagate_units, get_user_request,
+)
+from weblate.trans.models import Change, ReplaceJob
+
+
+def search_replace(request, units, search, replacement, progress=None):
+    """Replace string in targets of the units.
+
+    The matching units are grouped by translation, each translation file
+    is written once and the changes are then propagated to other
+    components. The optional progress is called with number of processed
+    and total translations.
+
+    Returns number of updated units.
+    """
+    matching = units.filter(
+        target__contains=search
+    ).select_related(
+        'translation__subproject__project',
+        'translation__language',
+    )
+    changed = []
+    for unit in matching.iterator():
+        unit.target = unit.target.replace(search, replacement)
+        changed.append(unit)
+
+    grouped = group_units(changed)
+    total = len(grouped)
+    updated = 0
+    for done, result in enumerate(
+            store_grouped(request, grouped, Change.ACTION_REPLACE)):
+        updated += result
+        if progress is not None:
+            progress(done + 1, total)
+
+    propagate_units(request, changed, Change.ACTION_REPLACE)
+
+    return updated
+
+
+def run_search_replace(job_id, user, units, search, replacement):
+    """Execute search and replace storing progress in the job."""
+    job = ReplaceJob.objects.filter(pk=job_id)
+
+    def progress(done, total):
+        job.update(done=done, total=total)
+
+    try:
+        updated = search_replace(
+            get_user_request(user), units, search, replacement, progress
+        )
+        job.update(updated=updated)
+    except Exception as error:
+        job.update(error=force_text(error))
+        raise
+    finally:
+        job.update(finished=True)
+
+
+def start_search_replace(user, units, search, replacement):
+    """Start search and replace in background thread.
+
+    The progress is stored in the database, so that it can be watched
+    from any process. The thread is started once current transaction is
+    committed as it would not see the job otherwise. Returns identifier
+    of the ReplaceJob.
+    """
+    job_id = ReplaceJob.objects.start(user).pk
+
+    def run():
+        try:
+            run_search_replace(job_id, user, units, search, replacement)
+        finally:
+            # The thread has own database connection
+            connection.close()
+
+    def start():
+        thread = threading.Thread(target=run, name='replace')
+        thread.daemon = True
+        thread.start()
+
+    transaction.on_commit(start)
+    return job_id
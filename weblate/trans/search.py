@@ -18,9 +18,10 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-"""Whoosh based full text search."""
+"""Full text search backends."""
 
 import functools
+from operator import or_
 import shutil
 
 from whoosh.fields import SchemaClass, TEXT, NUMERIC
@@ -32,14 +33,20 @@ from django.conf import settings
 from django.dispatch import receiver
 from django.db.models.signals import post_migrate
 from django.db.utils import IntegrityError
+from django.utils import timezone
 from django.utils.encoding import force_text
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import Q
 
 from weblate.lang.models import Language
 from weblate.trans.data import data_dir
+from weblate.utils.classloader import load_class
 
 STORAGE = FileStorage(data_dir('whoosh'))
 
+# Instances of search backends indexed by class name
+BACKENDS = {}
+
 
 class TargetSchema(SchemaClass):
     """Fultext index schema for target strings."""
@@ -138,43 +145,6 @@ def get_target_index(lang):
     return index
 
 
-def update_index(units, source_units=None):
-    """Update fulltext index for given set of units."""
-    languages = Language.objects.have_translation()
-
-    # Default to same set for both updates
-    if source_units is None:
-        source_units = units
-
-    # Update source index
-    if source_units.exists():
-        index = get_source_index()
-        writer = BufferedWriter(index)
-        try:
-            for unit in source_units.iterator():
-                update_source_unit_index(writer, unit)
-        finally:
-            writer.close()
-
-    # Update per language indices
-    for lang in languages:
-        language_units = units.filter(
-            translation__language=lang
-        ).exclude(
-            target=''
-        )
-
-        if language_units.exists():
-            index = get_target_index(lang.code)
-            writer = BufferedWriter(index)
-            try:
-
-                for unit in language_units.iterator():
-                    update_target_unit_index(writer, unit)
-            finally:
-                writer.close()
-
-
 def add_index_update(unit_id, source, to_delete, language_code=''):
     from weblate.trans.models.search import IndexUpdate
     try:
@@ -187,38 +157,27 @@ def add_index_update(unit_id, source, to_delete, language_code=''):
             )
     # pylint: disable=E0712
     except IntegrityError:
-        try:
-            update = IndexUpdate.objects.get(unitid=unit_id)
-            if to_delete or source:
-                if source:
-                    update.source = True
-                if to_delete:
-                    update.to_delete = True
-                    update.language_code = language_code
-                update.save()
-        except IndexUpdate.DoesNotExist:
-            # It did exist, but was deleted meanwhile
-            return
-
-
-def update_index_unit(unit, source=True):
-    """Add single unit to index."""
-    # Should this happen in background?
-    if settings.OFFLOAD_INDEXING:
-        add_index_update(unit.id, source, False)
-        return
-
-    # Update source
-    if source:
-        index = get_source_index()
-        with AsyncWriter(index) as writer:
-            update_source_unit_index(writer, unit)
-
-    # Update target
-    if unit.target:
-        index = get_target_index(unit.translation.language.code)
-        with AsyncWriter(index) as writer:
-            update_target_unit_index(writer, unit)
+        # The timestamp tells the indexer that the update has changed
+        # since it was fetched, so that it is not removed from the queue
+        values = {'timestamp': timezone.now()}
+        if source:
+            values['source'] = True
+        if to_delete:
+            values['to_delete'] = True
+            values['language_code'] = language_code
+        if not IndexUpdate.objects.filter(unitid=unit_id).update(**values):
+            # It did exist, but was removed by the indexer meanwhile
+            add_index_update(unit_id, source, to_delete, language_code)
+
+
+def write_index(index, units, update):
+    """Write given units to index using update function."""
+    writer = BufferedWriter(index)
+    try:
+        for unit in units:
+            update(writer, unit)
+    finally:
+        writer.close()
 
 
 def base_search(index, query, params, search, schema):
@@ -235,10 +194,8 @@ def base_search(index, query, params, search, schema):
         return [result['pk'] for result in searcher.search(terms)]
 
 
-def fulltext_search(query, lang, params):
-    """Perform fulltext search in given areas, returns set of primary keys."""
-    pks = set()
-
+def get_search_params(params):
+    """Return dictionary of all search fields with given ones enabled."""
     search = {
         'source': False,
         'context': False,
@@ -247,78 +204,329 @@ def fulltext_search(query, lang, params):
         'location': False,
     }
     search.update(params)
+    return search
 
-    if search['source'] or search['context'] or search['location']:
-        pks.update(
-            base_search(
-                get_source_index(),
-                query,
-                ('source', 'context', 'location'),
-                search,
-                SourceSchema()
+
+class BaseSearch(object):
+    """Fulltext search backend interface."""
+    # Whether the index needs to be updated on unit changes
+    needs_update = True
+
+    def update_index(self, units, source_units):
+        """Update index for given querysets of units."""
+        raise NotImplementedError()
+
+    def update_index_units(self, units, source_units):
+        """Update index for given lists of unit objects."""
+        raise NotImplementedError()
+
+    def update_index_unit(self, unit, source):
+        """Update index for single unit."""
+        raise NotImplementedError()
+
+    def delete_search_unit(self, pk, lang):
+        """Remove single unit from index."""
+        raise NotImplementedError()
+
+    def delete_search_units(self, source_units, languages):
+        """Remove units from index."""
+        raise NotImplementedError()
+
+    def fulltext_search(self, query, lang, params):
+        """Perform fulltext search, returns set of primary keys."""
+        raise NotImplementedError()
+
+
+class WhooshSearch(BaseSearch):
+    """Whoosh based fulltext search.
+
+    Indexes are stored in the data directory, with single index for
+    source strings and one index for every language for target strings.
+    """
+
+    def update_index(self, units, source_units):
+        languages = Language.objects.have_translation()
+
+        # Update source index
+        if source_units.exists():
+            index = get_source_index()
+            writer = BufferedWriter(index)
+            try:
+                for unit in source_units.iterator():
+                    update_source_unit_index(writer, unit)
+            finally:
+                writer.close()
+
+        # Update per language indices
+        for lang in languages:
+            language_units = units.filter(
+                translation__language=lang
+            ).exclude(
+                target=''
+            )
+
+            if language_units.exists():
+                index = get_target_index(lang.code)
+                writer = BufferedWriter(index)
+                try:
+
+                    for unit in language_units.iterator():
+                        update_target_unit_index(writer, unit)
+                finally:
+                    writer.close()
+
+    def update_index_units(self, units, source_units):
+        # Update source index
+        if source_units:
+            write_index(
+                get_source_index(), source_units, update_source_unit_index
+            )
+
+        # Update per language indices
+        languages = {}
+        for unit in units:
+            if unit.target:
+                code = unit.translation.language.code
+                languages.setdefault(code, []).append(unit)
+
+        for code, language_units in languages.items():
+            write_index(
+                get_target_index(code),
+                language_units,
+                update_target_unit_index
+            )
+
+    def update_index_unit(self, unit, source):
+        # Update source
+        if source:
+            index = get_source_index()
+            with AsyncWriter(index) as writer:
+                update_source_unit_index(writer, unit)
+
+        # Update target
+        if unit.target:
+            index = get_target_index(unit.translation.language.code)
+            with AsyncWriter(index) as writer:
+                update_target_unit_index(writer, unit)
+
+    def delete_search_unit(self, pk, lang):
+        try:
+            for index in (get_source_index(), get_target_index(lang)):
+                with AsyncWriter(index) as writer:
+                    writer.delete_by_term('pk', pk)
+        except IOError:
+            return
+
+    def delete_search_units(self, source_units, languages):
+        # Update source index
+        index = get_source_index()
+        writer = index.writer()
+        try:
+            for pk in source_units:
+                writer.delete_by_term('pk', pk)
+        finally:
+            writer.commit()
+
+        for lang, units in languages.items():
+            index = get_target_index(lang)
+            writer = index.writer()
+            try:
+                for pk in units:
+                    writer.delete_by_term('pk', pk)
+            finally:
+                writer.commit()
+
+    def fulltext_search(self, query, lang, params):
+        pks = set()
+
+        search = get_search_params(params)
+
+        if search['source'] or search['context'] or search['location']:
+            pks.update(
+                base_search(
+                    get_source_index(),
+                    query,
+                    ('source', 'context', 'location'),
+                    search,
+                    SourceSchema()
+                )
             )
-        )
 
-    if search['target'] or search['comment']:
-        pks.update(
-            base_search(
-                get_target_index(lang),
-                query,
-                ('target', 'comment'),
-                search,
-                TargetSchema()
+        if search['target'] or search['comment']:
+            pks.update(
+                base_search(
+                    get_target_index(lang),
+                    query,
+                    ('target', 'comment'),
+                    search,
+                    TargetSchema()
+                )
             )
+
+        return pks
+
+
+class DatabaseSearch(BaseSearch):
+    """Database based fulltext search.
+
+    The units are searched directly in the database, so there is no
+    separate index to maintain. On PostgreSQL this uses fulltext search
+    backed by GIN indexes created by migration, other databases fall back
+    to substring matching.
+
+    Unlike Whoosh, source strings are searched only within given
+    language as that is all the callers are interested in.
+    """
+    needs_update = False
+
+    # Text search configuration used for the fulltext indexes
+    config = 'simple'
+
+    def update_index(self, units, source_units):
+        return
+
+    def update_index_units(self, units, source_units):
+        return
+
+    def update_index_unit(self, unit, source):
+        return
+
+    def delete_search_unit(self, pk, lang):
+        return
+
+    def delete_search_units(self, source_units, languages):
+        return
+
+    @staticmethod
+    def is_postgresql():
+        return connection.vendor == 'postgresql'
+
+    def get_vector(self, field):
+        """Return search vector for given field.
+
+        The expression has to match the indexes created by
+        0092_unit_fulltext_index migration.
+        """
+        from django.contrib.postgres.search import SearchVector
+        return SearchVector(field, config=self.config)
+
+    def get_field_query(self, field, query):
+        """Return condition for searching query in given field."""
+        if self.is_postgresql():
+            from django.contrib.postgres.search import SearchQuery
+            return Q(**{
+                'fts_{0}'.format(field): SearchQuery(query, config=self.config)
+            })
+        words = query.split()
+        if not words:
+            return Q(pk=None)
+        return functools.reduce(
+            lambda x, y: x & y,
+            [Q(**{'{0}__icontains'.format(field): word}) for word in words]
         )
 
-    return pks
+    def get_queryset(self, query, lang, fields):
+        """Return queryset of units matching the query."""
+        from weblate.trans.models.unit import Unit
 
+        units = Unit.objects.filter(translation__language__code=lang)
 
-def more_like(pk, source, top=5):
-    """Find similar units."""
-    index = get_source_index()
-    with index.searcher() as searcher:
-        docnum = searcher.document_number(pk=pk)
-        if docnum is None:
+        if self.is_postgresql():
+            units = units.annotate(**{
+                'fts_{0}'.format(field): self.get_vector(field)
+                for field in fields
+            })
+
+        return units.filter(
+            functools.reduce(
+                or_, [self.get_field_query(field, query) for field in fields]
+            )
+        )
+
+    def fulltext_search(self, query, lang, params):
+        search = get_search_params(params)
+        fields = [field for field in sorted(search) if search[field]]
+        if not fields:
             return set()
 
-        results = searcher.more_like(docnum, 'source', source, top)
+        return set(
+            self.get_queryset(query, lang, fields).values_list(
+                'pk', flat=True
+            )
+        )
+
+
+def get_backend():
+    """Return configured fulltext search backend."""
+    name = settings.SEARCH_BACKEND
+    if name not in BACKENDS:
+        BACKENDS[name] = load_class(name, 'SEARCH_BACKEND')()
+    return BACKENDS[name]
+
+
+def update_index(units, source_units=None):
+    """Update fulltext index for given set of units."""
+    # Default to same set for both updates
+    if source_units is None:
+        source_units = units
+
+    get_backend().update_index(units, source_units)
+
+
+def update_index_units(units, source_units=()):
+    """Update fulltext index for given lists of unit objects.
+
+    The source index is updated only for units in source_units.
+    """
+    backend = get_backend()
+    if not backend.needs_update:
+        return
+
+    # Should this happen in background?
+    if settings.OFFLOAD_INDEXING:
+        source_ids = {unit.pk for unit in source_units}
+        for unit in units:
+            add_index_update(unit.id, unit.id in source_ids, False)
+        return
+
+    backend.update_index_units(units, source_units)
+
+
+def update_index_unit(unit, source=True):
+    """Add single unit to index."""
+    backend = get_backend()
+    if not backend.needs_update:
+        return
 
-        return {result['pk'] for result in results}
+    # Should this happen in background?
+    if settings.OFFLOAD_INDEXING:
+        add_index_update(unit.id, source, False)
+        return
+
+    backend.update_index_unit(unit, source)
+
+
+def fulltext_search(query, lang, params):
+    """Perform fulltext search in given areas, returns set of primary keys."""
+    return get_backend().fulltext_search(query, lang, params)
 
 
 def clean_search_unit(pk, lang):
     """Cleanup search index on unit deletion."""
+    backend = get_backend()
+    if not backend.needs_update:
+        return
+
     if settings.OFFLOAD_INDEXING:
         add_index_update(pk, False, True, lang)
     else:
-        delete_search_unit(pk, lang)
+        backend.delete_search_unit(pk, lang)
 
 
 def delete_search_unit(pk, lang):
-    try:
-        for index in (get_source_index(), get_target_index(lang)):
-            with AsyncWriter(index) as writer:
-                writer.delete_by_term('pk', pk)
-    except IOError:
-        return
+    get_backend().delete_search_unit(pk, lang)
 
 
 def delete_search_units(source_units, languages):
     """Delete fulltext index for given set of units."""
-    # Update source index
-    index = get_source_index()
-    writer = index.writer()
-    try:
-        for pk in source_units:
-            writer.delete_by_term('pk', pk)
-    finally:
-        writer.commit()
-
-    for lang, units in languages.items():
-        index = get_target_index(lang)
-        writer = index.writer()
-        try:
-            for pk in units:
-                writer.delete_by_term('pk', pk)
-        finally:
-            writer.commit()
+    get_backend().delete_search_units(source_units, languages)
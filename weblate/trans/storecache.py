@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Cache of parsed translation files.
+
+The translate-toolkit stores are kept pickled, keyed by hash of the file
+content and the file format. Every lookup returns a new copy of the store,
+so it can be freely modified by the caller. Only formats marked as
+cacheable are cached, stores built on lxml can be pickled, but the
+unpickled copy is not usable.
+"""
+
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import hashlib
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+
+from six.moves import cPickle as pickle
+
+from translate.__version__ import sver as ttkit_version
+
+import weblate
+from weblate.logger import LOGGER
+
+
+class StoreCache(object):
+    """Size bounded LRU cache of parsed stores with optional disk tier."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # Cacheable formats which failed to be pickled
+        self.unsupported = set()
+
+    @property
+    def enabled(self):
+        return settings.STORE_CACHE_SIZE > 0 or settings.STORE_CACHE_DIR
+
+    @staticmethod
+    def get_key(format_id, filename):
+        """Return cache key for a file."""
+        objhash = hashlib.sha1()
+        # Pickled stores are not compatible across versions
+        objhash.update(
+            '{0}\0{1}\0{2}\0'.format(
+                weblate.VERSION, ttkit_version, format_id
+            ).encode('utf-8')
+        )
+        with open(filename, 'rb') as handle:
+            objhash.update(handle.read())
+        return objhash.hexdigest()
+
+    @staticmethod
+    def get_filename(key):
+        return os.path.join(settings.STORE_CACHE_DIR, key + '.pickle')
+
+    def clear(self):
+        """Remove all entries from memory."""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def add(self, key, data):
+        """Add pickled store to memory, evicting least recently used."""
+        limit = settings.STORE_CACHE_SIZE * 1024 * 1024
+        if len(data) > limit:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key))
+            self.entries[key] = data
+            self.size += len(data)
+            while self.size > limit:
+                self.size -= len(self.entries.popitem(last=False)[1])
+
+    def get_data(self, key):
+        """Return pickled store from memory or disk."""
+        with self.lock:
+            data = self.entries.pop(key, None)
+            if data is not None:
+                self.entries[key] = data
+                return data
+        if not settings.STORE_CACHE_DIR:
+            return None
+        try:
+            with open(self.get_filename(key), 'rb') as handle:
+                data = handle.read()
+        except (IOError, OSError):
+            return None
+        self.add(key, data)
+        return data
+
+    def get(self, key):
+        """Return copy of cached store or None."""
+        data = self.get_data(key)
+        if data is None:
+            self.misses += 1
+            return None
+        try:
+            store = pickle.loads(data)
+        except Exception as error:
+            LOGGER.warning('failed to load cached store %s: %s', key, error)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return store
+
+    def set(self, key, store):
+        """Store parsed store in the cache.
+
+        Returns False if the store can not be pickled.
+        """
+        try:
+            data = pickle.dumps(store, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        self.add(key, data)
+        if settings.STORE_CACHE_DIR:
+            self.write(key, data)
+        return True
+
+    def write(self, key, data):
+        """Write pickled store to the disk tier."""
+        try:
+            if not os.path.exists(settings.STORE_CACHE_DIR):
+                os.makedirs(settings.STORE_CACHE_DIR)
+            handle, tempname = tempfile.mkstemp(
+                dir=settings.STORE_CACHE_DIR
+            )
+            with os.fdopen(handle, 'wb') as tempfile_handle:
+                tempfile_handle.write(data)
+            os.rename(tempname, self.get_filename(key))
+        except (IOError, OSError) as error:
+            LOGGER.warning('failed to write cached store %s: %s', key, error)
+
+    def parse(self, fileformat, filename):
+        """Parse file using the cache."""
+        if (not self.enabled or
+                not fileformat.cacheable or
+                fileformat.format_id in self.unsupported):
+            return fileformat.parse_store(filename)
+
+        key = self.get_key(fileformat.format_id, filename)
+        store = self.get(key)
+        if store is not None:
+            # The same content can be stored in different files
+            store.filename = filename
+            return store
+
+        store = fileformat.parse_store(filename)
+        if not self.set(key, store):
+            self.unsupported.add(fileformat.format_id)
+        return store
+
+
+STORE_CACHE = StoreCache()
@@ -87,6 +87,7 @@ class AdminTest(ViewTestCase):
     def test_performace(self):
         response = self.client.get(reverse('admin-performance'))
         self.assertContains(response, 'Django caching')
+        self.assertContains(response, 'Repository locking')
 
     def test_error(self):
         add_configuration_error('Test error', 'FOOOOOOOOOOOOOO')
@@ -20,11 +20,21 @@
 
 """Test for automatic translation"""
 
+from __future__ import unicode_literals
+
+from django.core import mail
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.core.management import call_command
 from django.core.management.base import CommandError
+from django.test.utils import override_settings
+
+from six import StringIO
 
-from weblate.trans.models import SubProject
+from weblate.trans.machine import MACHINE_TRANSLATION_SERVICES
+from weblate.trans.machine.dummy import DummyTranslation
+from weblate.trans.machine.weblatetm import WeblateTranslation
+from weblate.trans.models import SubProject, Change
 from weblate.trans.tests.test_views import ViewTestCase
 
 
@@ -141,6 +151,70 @@ class AutoTranslationTest(ViewTestCase):
             source='test/test',
         )
 
+    def test_command_bulk(self):
+        self.make_different()
+        output = StringIO()
+        call_command(
+            'auto_translate',
+            'test',
+            'test-2',
+            'cs',
+            source='test/test',
+            stdout=output,
+        )
+        self.assertIn('Processed 1 of 1 units', output.getvalue())
+        self.assertIn('Updated 1 units', output.getvalue())
+        translation = self.subproject2.translation_set.get(language_code='cs')
+        self.assertEqual(translation.translated, 1)
+        unit = translation.unit_set.get(source='Hello, world!\n')
+        self.assertEqual(unit.target, 'Nazdar svete!\n')
+        self.assertTrue(unit.translated)
+        self.assertFalse(unit.pending)
+        self.assertEqual(
+            Change.objects.filter(
+                action=Change.ACTION_AUTO, translation=translation
+            ).count(),
+            1
+        )
+        # The file was written
+        with open(translation.get_filename()) as handle:
+            self.assertIn('Nazdar svete!', handle.read())
+
+    def test_command_complete(self):
+        self.user.email = 'noreply@weblate.org'
+        self.user.save()
+        profile = self.user.profile
+        profile.subscribe_any_translation = True
+        profile.subscriptions.add(self.project)
+        profile.languages.add(self.get_translation().language)
+        profile.save()
+        # Translate all strings in the source component
+        for unit in self.get_translation().unit_set.all():
+            unit.target = unit.source
+            unit.translated = True
+            unit.save()
+        call_command(
+            'auto_translate',
+            'test',
+            'test-2',
+            'cs',
+            source='test/test',
+        )
+        translation = self.subproject2.translation_set.get(language_code='cs')
+        self.assertEqual(translation.translated, translation.total)
+        self.assertEqual(
+            Change.objects.filter(
+                action=Change.ACTION_COMPLETE, translation=translation
+            ).count(),
+            1
+        )
+        # One notification for every translated string
+        self.assertEqual(len(mail.outbox), translation.total)
+        self.assertEqual(
+            mail.outbox[0].subject,
+            '[Weblate] New translation in Test/Test 2 - Czech'
+        )
+
     def test_command_errors(self):
         self.assertRaises(
             CommandError,
@@ -177,3 +251,80 @@ class AutoTranslationTest(ViewTestCase):
             'test',
             'xxx',
         )
+
+
+class MachineTranslationTest(ViewTestCase):
+    def setUp(self):
+        super(MachineTranslationTest, self).setUp()
+        # Need extra power
+        self.user.is_superuser = True
+        self.user.save()
+        cache.clear()
+        if 'dummy' not in MACHINE_TRANSLATION_SERVICES:
+            service = DummyTranslation()
+            MACHINE_TRANSLATION_SERVICES[service.mtid] = service
+            self.addCleanup(
+                MACHINE_TRANSLATION_SERVICES.data.pop, service.mtid
+            )
+
+    def assert_translated(self):
+        unit = self.get_unit()
+        self.assertEqual(unit.target, 'Nazdar světe!')
+        self.assertTrue(unit.fuzzy)
+        self.assertFalse(unit.translated)
+        self.assertEqual(
+            Change.objects.filter(action=Change.ACTION_AUTO).count(),
+            1
+        )
+
+    def test_command(self):
+        output = StringIO()
+        call_command(
+            'machine_translate',
+            'test',
+            'test',
+            'cs',
+            '--service', 'dummy',
+            stdout=output,
+        )
+        self.assertIn('Updated 1 units', output.getvalue())
+        self.assert_translated()
+
+    def test_command_errors(self):
+        service = WeblateTranslation()
+        if service.mtid not in MACHINE_TRANSLATION_SERVICES:
+            MACHINE_TRANSLATION_SERVICES[service.mtid] = service
+            self.addCleanup(
+                MACHINE_TRANSLATION_SERVICES.data.pop, service.mtid
+            )
+        self.assertRaises(
+            CommandError,
+            call_command,
+            'machine_translate',
+            'test',
+            'test',
+            'cs',
+            '--service', 'invalid',
+        )
+        self.assertRaises(
+            CommandError,
+            call_command,
+            'machine_translate',
+            'test',
+            'test',
+            'cs',
+            '--service', 'weblate',
+        )
+
+    @override_settings(MACHINE_TRANSLATION_ENABLED=True)
+    def test_view(self):
+        response = self.client.post(
+            reverse('auto_translation', kwargs=self.kw_translation),
+            {'machine': 'dummy'},
+            follow=True
+        )
+        self.assertContains(
+            response,
+            'Automatic translation completed, 1 string was updated.',
+        )
+        self.assert_translated()
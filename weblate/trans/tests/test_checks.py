@@ -22,9 +22,13 @@
 from __future__ import unicode_literals
 
 import random
+import re
 
 from django.test import TestCase
 
+from weblate.trans.checks.memo import SourceMemo, SOURCE_MEMO
+from weblate.trans.checks.same import SameCheck
+
 
 class MockLanguage(object):
     """Mock language object."""
@@ -204,3 +208,51 @@ class CheckTestCase(TestCase):
             self.check.check_highlight(self.test_highlight[1], unit),
             self.test_highlight[2]
         )
+
+
+class SourceMemoTest(TestCase):
+    """Test of memoization of source strings processing."""
+    def setUp(self):
+        self.memo = SourceMemo(size=2)
+
+    def test_get(self):
+        self.assertEqual(self.memo.get('a', len, 'abc'), 3)
+        self.assertEqual(self.memo.get('a', len, 'other'), 3)
+        self.assertEqual(self.memo.hits, 1)
+        self.assertEqual(self.memo.misses, 1)
+
+    def test_evict(self):
+        self.memo.get('a', len, 'a')
+        self.memo.get('b', len, 'bb')
+        # Access makes the entry recently used
+        self.memo.get('a', len, 'a')
+        self.memo.get('c', len, 'ccc')
+        self.assertEqual(list(self.memo.entries), ['a', 'c'])
+
+    def test_findall(self):
+        regex = re.compile('[0-9]')
+        self.assertEqual(self.memo.findall(regex, 'a1b2'), ('1', '2'))
+        self.assertEqual(self.memo.findall(regex, 'a1b2'), ('1', '2'))
+        self.assertEqual(self.memo.hits, 1)
+
+    def test_languages(self):
+        """Source is processed once for all languages."""
+        check = SameCheck()
+        sources = [
+            'Visit http://example.com/path/{0} or mail info@example.com '
+            'about %(count)d items in #channel {0}'.format(i)
+            for i in range(100)
+        ]
+        units = [
+            MockUnit(None, 'python-format', code)
+            for code in ('cs', 'de', 'fr', 'it', 'pl', 'ru', 'sk', 'uk')
+        ]
+
+        SOURCE_MEMO.clear()
+        for source in sources:
+            for unit in units:
+                check.check_single(source, source, unit)
+        self.assertEqual(SOURCE_MEMO.misses, len(sources))
+        self.assertEqual(
+            SOURCE_MEMO.hits, len(sources) * (len(units) - 1)
+        )
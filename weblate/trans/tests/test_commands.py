@@ -20,22 +20,28 @@
 
 """Test for management commands."""
 
-from unittest import SkipTest
+import json
+import os
+import tempfile
+from unittest import SkipTest, skipUnless
 
 from six import StringIO
 
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.core.management import call_command
 from django.core.management.base import CommandError
 from django.contrib.auth.models import User
 
 from weblate.trans.tests.test_models import RepoTestCase
 from weblate.trans.models import (
-    Translation, SubProject, Suggestion, IndexUpdate
+    Translation, SubProject, Suggestion, IndexUpdate, Check,
 )
 from weblate.runner import main
-from weblate.trans.tests.utils import get_test_file
+from weblate.trans.tests.utils import (
+    get_test_file, is_test_db_shared, RepoTestMixin,
+)
 from weblate.trans.vcs import HgRepository
+from weblate.trans.search import fulltext_search
 from weblate.accounts.models import Profile
 
 TEST_PO = get_test_file('cs.po')
@@ -405,6 +411,27 @@ class PeriodicCommandTest(RepoTestCase):
         )
         self.assertEqual('', output.getvalue())
 
+    def test_run_indexer(self):
+        IndexUpdate.objects.create(
+            unitid=666,
+            language_code='fo',
+            to_delete=False,
+            source=True,
+        )
+        IndexUpdate.objects.create(
+            unitid=777,
+            language_code='fo',
+            to_delete=True,
+        )
+        output = StringIO()
+        call_command(
+            'run_indexer',
+            once=True,
+            stdout=output
+        )
+        self.assertIn('Queue: 0 updates', output.getvalue())
+        self.assertEqual(IndexUpdate.objects.count(), 0)
+
     def test_list_checks(self):
         output = StringIO()
         call_command(
@@ -511,11 +538,85 @@ class LoadTest(CheckGitTest):
     command_name = 'loadpo'
     expected_string = ''
 
+    def test_bulk(self):
+        self.do_test(
+            all=True,
+            force=True,
+            bulk=True,
+        )
+
+    def test_jobs(self):
+        self.expected_string = 'Processed Test/Test (1/1)'
+        self.do_test(
+            all=True,
+            force=True,
+            jobs=1,
+        )
+
 
 class UpdateChecksTest(CheckGitTest):
     command_name = 'updatechecks'
     expected_string = 'Processing'
 
+    @staticmethod
+    def get_checks():
+        return list(
+            Check.objects.order_by(
+                'content_hash', 'language', 'check'
+            ).values_list(
+                'content_hash', 'language', 'check'
+            )
+        )
+
+    def test_jobs(self):
+        expected = self.get_checks()
+        Check.objects.all().delete()
+        self.expected_string = 'Processed Test/Test (1/1)'
+        self.do_test(
+            all=True,
+            jobs=1,
+        )
+        self.assertEqual(expected, self.get_checks())
+
+
+@skipUnless(
+    is_test_db_shared(), 'Database is not shared with worker processes'
+)
+class UpdateChecksJobsTest(TransactionTestCase, RepoTestMixin):
+    """Test updating checks in several worker processes."""
+    serialized_rollback = True
+
+    def setUp(self):
+        self.clone_test_repos()
+        self.create_link()
+
+    def test_jobs(self):
+        expected = UpdateChecksTest.get_checks()
+        self.assertNotEqual(expected, [])
+        Check.objects.all().delete()
+        output = StringIO()
+        call_command(
+            'updatechecks',
+            all=True,
+            jobs=2,
+            stdout=output,
+        )
+        self.assertIn('(2/2)', output.getvalue())
+        self.assertEqual(expected, UpdateChecksTest.get_checks())
+
+
+class ReconcileStatsTest(CheckGitTest):
+    command_name = 'reconcile_stats'
+    expected_string = 'Found 0 translations with outdated stats'
+
+    def test_drift(self):
+        Translation.objects.filter(language_code='cs').update(translated=100)
+        self.expected_string = 'translated is 100, should be'
+        self.do_test(all=True, check=True)
+        self.do_test(all=True)
+        self.expected_string = 'Found 0 translations with outdated stats'
+        self.do_test(all=True)
+
 
 class UpdateGitTest(CheckGitTest):
     command_name = 'updategit'
@@ -532,6 +633,27 @@ class RebuildIndexTest(CheckGitTest):
             clean=True,
         )
 
+    def test_checkpoint(self):
+        handle, checkpoint = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.addCleanup(
+            lambda: os.path.exists(checkpoint) and os.unlink(checkpoint)
+        )
+        with open(checkpoint, 'w') as handle:
+            json.dump(['cs'], handle)
+        self.expected_string = 'Indexed'
+        output = StringIO()
+        call_command(
+            self.command_name,
+            all=True,
+            checkpoint=checkpoint,
+            stdout=output,
+        )
+        self.assertIn('Indexed 4 units in de', output.getvalue())
+        self.assertNotIn(' in cs ', output.getvalue())
+        self.assertFalse(os.path.exists(checkpoint))
+        self.assertTrue(fulltext_search('Hello', 'de', {'source': True}))
+
 
 class LockTranslationTest(CheckGitTest):
     command_name = 'lock_translation'
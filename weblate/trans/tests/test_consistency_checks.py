@@ -24,8 +24,9 @@ Tests for quality checks.
 
 from django.test import TestCase
 from weblate.trans.checks.consistency import (
-    PluralsCheck, SamePluralsCheck, TranslatedCheck,
+    PluralsCheck, SamePluralsCheck, TranslatedCheck, ConsistencyCheck,
 )
+from weblate.trans.models import Unit
 from weblate.trans.tests.test_checks import MockUnit
 from weblate.trans.tests.test_views import ViewTestCase
 
@@ -108,3 +109,59 @@ class TranslatedCheckTest(ViewTestCase):
             ''
         )
         self.assertTrue(self.run_check())
+
+
+class ConsistencyCheckTest(ViewTestCase):
+    def setUp(self):
+        super(ConsistencyCheckTest, self).setUp()
+        self.check = ConsistencyCheck()
+        self.create_linked(self.subproject)
+
+    def run_check(self, unit):
+        return self.check.check_target(
+            unit.get_source_plurals(),
+            unit.get_target_plurals(),
+            unit
+        )
+
+    def assert_bulk(self, expected):
+        units = list(
+            Unit.objects.filter(translation__subproject__project=self.project)
+        )
+        self.assertEqual(
+            {unit.pk for unit in units if self.run_check(unit)},
+            self.check.check_target_bulk(units)
+        )
+        self.assertEqual(
+            [unit.pk in self.check.check_target_bulk(units) for unit in
+             self.get_linked_units()],
+            expected
+        )
+
+    def test_none(self):
+        self.assert_bulk([False, False])
+
+    def translate_second(self, target):
+        self.edit_unit(
+            'Hello, world!\n',
+            'Nazdar svete!\n'
+        )
+        unit = self.get_linked_units()[1]
+        unit.translate(
+            self.get_request('/'), [target], False, propagate=False
+        )
+
+    def test_propagated(self):
+        self.edit_unit(
+            'Hello, world!\n',
+            'Nazdar svete!\n'
+        )
+        self.assert_bulk([False, False])
+
+    def test_untranslated(self):
+        self.translate_second('')
+        self.assert_bulk([True, True])
+
+    def test_inconsistent(self):
+        self.translate_second('Ahoj svete!\n')
+        self.assert_bulk([True, True])
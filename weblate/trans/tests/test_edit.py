@@ -21,12 +21,22 @@
 """Test for translation views."""
 
 from __future__ import unicode_literals
+import json
+import threading
 import time
+from unittest import skipUnless
 
+from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import override_settings
 
+from weblate.trans.bulk import get_user_request
 from weblate.trans.tests.test_views import ViewTestCase
-from weblate.trans.models import Change
+from weblate.trans.tests.utils import is_test_db_shared, RepoTestMixin
+from weblate.trans.models import Change, ReplaceJob
+from weblate.trans.replace import run_search_replace
 
 
 class EditTest(ViewTestCase):
@@ -431,6 +441,163 @@ class EditTest(ViewTestCase):
         self.assertEqual(unit.target, 'Ahoj svete!\n')
 
 
+class SearchReplaceTest(ViewTestCase):
+    def setUp(self):
+        super(SearchReplaceTest, self).setUp()
+        self.change_unit('Nazdar svete!\n')
+
+    def test_propagate(self):
+        self.create_linked(self.subproject)
+        response = self.client.post(
+            reverse('replace', kwargs=self.kw_translation),
+            {
+                'search': 'Nazdar',
+                'replacement': 'Ahoj',
+            },
+            follow=True
+        )
+        self.assertContains(
+            response,
+            'Search and replace completed, 1 string was updated.'
+        )
+        self.assertEqual(
+            [unit.target for unit in self.get_linked_units()],
+            ['Ahoj svete!\n', 'Ahoj svete!\n']
+        )
+        self.assertEqual(
+            Change.objects.filter(action=Change.ACTION_REPLACE).count(),
+            2
+        )
+
+    def test_progress(self):
+        job = ReplaceJob.objects.start(self.user)
+        self.assertFalse(job.finished)
+        run_search_replace(
+            job.pk, self.user, self.get_translation().unit_set,
+            'Nazdar', 'Ahoj'
+        )
+        self.assertEqual(self.get_unit().target, 'Ahoj svete!\n')
+
+        response = self.client.get(
+            reverse('replace-progress', kwargs={'job_id': job.pk})
+        )
+        progress = json.loads(response.content.decode('utf-8'))
+        self.assertTrue(progress['finished'])
+        self.assertEqual(progress['updated'], 1)
+        self.assertEqual(progress['done'], progress['total'])
+        self.assertIsNone(progress['error'])
+
+    @override_settings(BACKGROUND_REPLACE=True)
+    def test_background(self):
+        response = self.client.post(
+            reverse('replace', kwargs=self.kw_translation),
+            {
+                'search': 'Nazdar',
+                'replacement': 'Ahoj',
+            },
+            follow=True
+        )
+        self.assertContains(response, 'running in background')
+        # The job is started only once the transaction is committed
+        self.assertEqual(len(connection.run_on_commit), 1)
+        job = ReplaceJob.objects.get()
+        self.assertFalse(job.finished)
+        self.assertEqual(job.done, 0)
+        self.assertEqual(self.get_unit().target, 'Nazdar svete!\n')
+
+    def test_progress_missing(self):
+        response = self.client.get(
+            reverse('replace-progress', kwargs={'job_id': 1})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_progress_other_user(self):
+        job = ReplaceJob.objects.start(
+            User.objects.create_user('other', 'other@example.org', 'x')
+        )
+        response = self.client.get(
+            reverse('replace-progress', kwargs={'job_id': job.pk})
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class PropagateTest(ViewTestCase):
+    def setUp(self):
+        super(PropagateTest, self).setUp()
+        self.subproject2 = self.create_linked(self.subproject)
+
+    def test_propagate(self):
+        self.edit_unit('Hello, world!\n', 'Nazdar svete!\n')
+        self.assertEqual(
+            [unit.target for unit in self.get_linked_units()],
+            ['Nazdar svete!\n', 'Nazdar svete!\n']
+        )
+        self.assertEqual(
+            [unit.translated for unit in self.get_linked_units()],
+            [True, True]
+        )
+        self.assertEqual(
+            Change.objects.filter(action=Change.ACTION_NEW).count(),
+            2
+        )
+        self.assertEqual(
+            self.subproject2.translation_set.get(
+                language_code='cs'
+            ).translated,
+            1
+        )
+
+    def test_disabled(self):
+        self.subproject2.allow_translation_propagation = False
+        self.subproject2.save()
+        self.edit_unit('Hello, world!\n', 'Nazdar svete!\n')
+        self.assertEqual(
+            [unit.translated for unit in self.get_linked_units()],
+            [True, False]
+        )
+
+    @override_settings(BACKGROUND_PROPAGATION=True)
+    def test_background_deferred(self):
+        # The propagation waits for the transaction to be committed
+        self.edit_unit('Hello, world!\n', 'Nazdar svete!\n')
+        self.assertEqual(
+            [unit.translated for unit in self.get_linked_units()],
+            [True, False]
+        )
+
+
+@skipUnless(is_test_db_shared(), 'Database is not shared with other threads')
+class BackgroundPropagateTest(TransactionTestCase, RepoTestMixin):
+    """Test propagation in background thread."""
+    serialized_rollback = True
+
+    def setUp(self):
+        self.clone_test_repos()
+        self.subproject = self.create_subproject()
+        self.create_linked(self.subproject)
+        self.user = User.objects.create_user('testuser')
+
+    @override_settings(BACKGROUND_PROPAGATION=True)
+    def test_propagate(self):
+        unit = self.get_linked_units()[0]
+        unit.translate(
+            get_user_request(self.user), ['Nazdar svete!\n'], False
+        )
+        for thread in threading.enumerate():
+            if thread.name == 'propagate':
+                thread.join()
+        self.assertEqual(
+            [item.target for item in self.get_linked_units()],
+            ['Nazdar svete!\n', 'Nazdar svete!\n']
+        )
+        self.assertEqual(
+            Change.objects.filter(
+                action=Change.ACTION_NEW, user=self.user
+            ).count(),
+            2
+        )
+
+
 class EditResourceTest(EditTest):
     has_plurals = False
     monolingual = True
@@ -621,6 +788,86 @@ class EditTSMonoTest(EditTest):
         return self.create_ts_mono()
 
 
+@override_settings(LAZY_WRITES=True, LAZY_WRITES_INTERVAL=3600)
+class EditLazyWritesTest(EditTest):
+    def assert_backend(self, expected_translated):
+        self.get_translation().write_pending()
+        super(EditLazyWritesTest, self).assert_backend(expected_translated)
+
+    def test_lazy_write(self):
+        filename = self.get_translation().get_filename()
+        with open(filename, 'rb') as handle:
+            content = handle.read()
+        self.edit_unit(
+            'Hello, world!\n',
+            'Nazdar svete!\n'
+        )
+        self.assertTrue(self.get_unit().pending)
+        # File is not touched
+        with open(filename, 'rb') as handle:
+            self.assertEqual(content, handle.read())
+
+        # Commit writes the file
+        translation = self.get_translation()
+        self.assertTrue(translation.repo_needs_commit())
+        self.assertTrue(translation.commit_pending(None))
+        self.assertFalse(self.get_unit().pending)
+        self.assertFalse(self.get_translation().repo_needs_commit())
+        with open(filename, 'rb') as handle:
+            self.assertNotEqual(content, handle.read())
+        self.assert_backend(1)
+
+    def test_lazy_write_changed(self):
+        self.edit_unit(
+            'Hello, world!\n',
+            'Nazdar svete!\n'
+        )
+        # File changed outside Weblate
+        translation = self.get_translation()
+        filename = translation.get_filename()
+        with open(filename, 'ab') as handle:
+            handle.write(b'\n# Changed\n')
+        repository = translation.subproject.repository
+        with repository.lock:
+            repository.commit('Changed', files=[filename])
+        translation.check_sync()
+        self.assertFalse(self.get_unit().pending)
+        self.assertEqual(self.get_unit().target, 'Nazdar svete!\n')
+        super(EditLazyWritesTest, self).assert_backend(1)
+
+    def test_lazy_write_reset(self):
+        self.edit_unit(
+            'Hello, world!\n',
+            'Nazdar svete!\n'
+        )
+        self.assertTrue(self.subproject.do_reset(None))
+        self.assertFalse(self.get_unit().pending)
+        self.assertEqual(self.get_unit().target, '')
+        self.assertFalse(self.get_translation().repo_needs_commit())
+        super(EditLazyWritesTest, self).assert_backend(0)
+
+    @override_settings(LAZY_WRITES_COUNT=2)
+    def test_lazy_write_count(self):
+        self.edit_unit(
+            'Hello, world!\n',
+            'Nazdar svete!\n'
+        )
+        self.assertTrue(self.get_translation().has_pending_writes())
+        self.edit_unit(
+            'Thank you for using Weblate.',
+            'Děkujeme, že používáte Weblate.'
+        )
+        self.assertFalse(self.get_translation().has_pending_writes())
+        self.assert_backend(2)
+
+
+class EditLazyWritesMonoTest(EditLazyWritesTest):
+    monolingual = True
+
+    def create_subproject(self):
+        return self.create_po_mono()
+
+
 class ZenViewTest(ViewTestCase):
     def test_zen(self):
         response = self.client.get(
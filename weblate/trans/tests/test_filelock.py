@@ -18,13 +18,17 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-from unittest import TestCase
+from unittest import TestCase, SkipTest
 import shutil
 import sys
 import tempfile
+import threading
+import time
 import os.path
 from multiprocessing import Process
-from weblate.trans.filelock import FileLock, FileLockException
+from weblate.trans.filelock import (
+    FileLock, FileLockException, HAS_FCNTL, STATS,
+)
 
 
 class LockTest(TestCase):
@@ -113,3 +117,71 @@ class LockTest(TestCase):
         process.start()
         process.join()
         self.assertEqual(process.exitcode, 0)
+
+    def test_shared(self):
+        """Test of shared locking."""
+        lock1 = FileLock(self.testfile)
+        lock2 = FileLock(self.testfile, timeout=0)
+        lock3 = FileLock(self.testfile, timeout=0)
+        with lock1.shared:
+            self.assertTrue(lock1.is_locked)
+            self.assertFalse(lock1.is_exclusive)
+            # Other shared lock is possible, exclusive is not
+            with lock2.shared:
+                self.assertTrue(lock2.is_locked)
+            self.assertRaises(FileLockException, lock3.acquire)
+            # Shared lock can not be upgraded
+            self.assertRaises(RuntimeError, lock1.acquire)
+        self.assertFalse(lock1.is_locked)
+        with lock1:
+            self.assertTrue(lock1.is_exclusive)
+            # Nested shared lock keeps the exclusive one
+            with lock1.shared:
+                self.assertTrue(lock1.is_exclusive)
+            self.assertRaises(FileLockException, lock2.acquire, True)
+
+    def test_wait(self):
+        """Test of waiting for the lock."""
+        lock1 = FileLock(self.testfile)
+        lock2 = FileLock(self.testfile, timeout=10)
+        lock1.acquire()
+        timer = threading.Timer(0.2, lock1.release)
+        timer.start()
+        STATS.reset()
+        with lock2:
+            self.assertTrue(lock2.is_locked)
+        timer.join()
+        self.assertEqual(STATS.contended, 1)
+        self.assertGreater(STATS.wait_max, 0.1)
+
+    def test_wait_timeout(self):
+        """Test of timeout while waiting for the lock."""
+        lock1 = FileLock(self.testfile)
+        lock2 = FileLock(self.testfile, timeout=0.1)
+        lock3 = FileLock(self.testfile, timeout=10)
+        STATS.reset()
+        with lock1:
+            self.assertRaises(FileLockException, lock2.acquire)
+        self.assertEqual(STATS.timeouts, 1)
+        self.assertFalse(lock2.is_locked)
+        # The abandoned wait does not keep the lock
+        with lock3:
+            self.assertTrue(lock3.is_locked)
+
+    def test_queue(self):
+        """Test that waiting exclusive lock blocks new shared ones."""
+        if not HAS_FCNTL:
+            raise SkipTest('Shared locking not supported')
+        reader = FileLock(self.testfile)
+        writer = FileLock(self.testfile, timeout=10)
+        reader2 = FileLock(self.testfile, timeout=0.1)
+        reader.acquire(shared=True)
+        thread = threading.Thread(target=writer.acquire)
+        thread.start()
+        # Give writer time to get queued
+        time.sleep(0.2)
+        self.assertRaises(FileLockException, reader2.acquire, True)
+        reader.release()
+        thread.join()
+        self.assertTrue(writer.is_exclusive)
+        writer.release()
@@ -192,6 +192,14 @@ class AutoFormatTest(SimpleTestCase):
         else:
             self.assertEqual(unit.get_target(), self.FIND_MATCH)
 
+    def test_find_repeated(self):
+        storage = self.FORMAT(self.FILE)
+        unit = storage.find_unit('', self.FIND)[0]
+        if self.COUNT == 0:
+            return
+        # Second lookup uses built index
+        self.assertIs(storage.find_unit('', self.FIND)[0].unit, unit.unit)
+
     def test_add(self):
         if self.FORMAT.supports_new_language():
             self.assertTrue(self.FORMAT.is_valid_base_for_new(self.BASE))
@@ -236,6 +244,15 @@ class PoFormatTest(AutoFormatTest):
         self.assertTrue('Michal Čihař' in data)
         out.close()
 
+    def test_add_unit(self):
+        storage = self.FORMAT(self.FILE)
+        self.assertEqual(storage.find_unit('', 'New string'), (None, False))
+        ttkit_unit = storage.store.UnitClass('New string')
+        storage.add_unit(storage.unit_class(ttkit_unit))
+        unit, add = storage.find_unit('', 'New string')
+        self.assertFalse(add)
+        self.assertIs(unit.unit, ttkit_unit)
+
 
 class PropertiesFormatTest(AutoFormatTest):
     FORMAT = PropertiesFormat
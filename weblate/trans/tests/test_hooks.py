@@ -20,9 +20,13 @@
 
 """Test for notification hooks."""
 
+from django.core.management import call_command
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
 
+from six import StringIO
+
+from weblate.trans.models import UpdateJob
 from weblate.trans.tests.test_views import ViewTestCase
 
 GITHUB_PAYLOAD = '''
@@ -356,6 +360,39 @@ BITBUCKET_PAYLOAD_WEBHOOK_CLOSED = r'''
 
 
 class HooksViewTest(ViewTestCase):
+    @override_settings(ENABLE_HOOKS=True)
+    @override_settings(BACKGROUND_HOOKS=True)
+    def test_view_hook_queue(self):
+        for dummy in range(3):
+            response = self.client.get(
+                reverse('hook-subproject', kwargs=self.kw_subproject)
+            )
+            self.assertContains(response, 'Update triggered')
+        response = self.client.get(
+            reverse('hook-project', kwargs=self.kw_project)
+        )
+        self.assertContains(response, 'Update triggered')
+        # Repeated requests are merged
+        self.assertEqual(UpdateJob.objects.pending().count(), 1)
+        self.assertEqual(UpdateJob.objects.get().requests, 4)
+
+        output = StringIO()
+        call_command('run_updates', once=True, stdout=output)
+        self.assertEqual(UpdateJob.objects.count(), 0)
+        self.assertIn('processed 1 jobs (0 failed) for 4 requests',
+                      output.getvalue())
+
+    def test_queue_running(self):
+        self.subproject.queue_update()
+        job = UpdateJob.objects.fetch()
+        self.assertIsNotNone(job)
+        # Update queued while running is not started in parallel
+        self.subproject.queue_update()
+        self.assertEqual(UpdateJob.objects.pending().count(), 1)
+        self.assertIsNone(UpdateJob.objects.fetch())
+        # Unless the running job is stale
+        self.assertIsNotNone(UpdateJob.objects.fetch(stale_timeout=0))
+
     @override_settings(ENABLE_HOOKS=True)
     @override_settings(BACKGROUND_HOOKS=False)
     def test_view_hook_project(self):
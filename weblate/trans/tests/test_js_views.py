@@ -23,13 +23,53 @@
 from __future__ import unicode_literals
 
 import json
+import threading
+import time
 
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
 
 from weblate.trans.tests.test_views import ViewTestCase
 from weblate.utils.classloader import load_class
 from weblate.trans.machine import MACHINE_TRANSLATION_SERVICES
+from weblate.trans.machine.dummy import DummyTranslation
+
+
+class DuplicateTranslation(DummyTranslation):
+    """Dummy translation returning same results from other service."""
+    name = 'Duplicate'
+
+
+class SlowTranslation(DummyTranslation):
+    """Dummy translation which does not respond in time."""
+    name = 'Slow'
+
+    def __init__(self):
+        super(SlowTranslation, self).__init__()
+        self.started = threading.Event()
+
+    def download_translations(self, source, language, text, unit, user):
+        self.started.set()
+        time.sleep(1)
+        return super(SlowTranslation, self).download_translations(
+            source, language, text, unit, user
+        )
+
+
+class LocalTranslation(DummyTranslation):
+    """Dummy translation not using the network."""
+    name = 'Local'
+    cache_translations = False
+    remote = False
+    network_running = None
+    network = None
+
+    def download_translations(self, source, language, text, unit, user):
+        self.network_running = self.network.started.wait(0.5)
+        return super(LocalTranslation, self).download_translations(
+            source, language, text, unit, user
+        )
 
 
 class JSViewsTest(ViewTestCase):
@@ -89,6 +129,72 @@ class JSViewsTest(ViewTestCase):
         )
         self.assertEqual(response.status_code, 400)
 
+    def add_mt(self, service):
+        MACHINE_TRANSLATION_SERVICES[service.mtid] = service
+        self.addCleanup(MACHINE_TRANSLATION_SERVICES.data.pop, service.mtid)
+
+    def get_translate_all(self):
+        unit = self.get_unit()
+        response = self.client.get(
+            reverse('js-translate-all', kwargs={'unit_id': unit.id}),
+        )
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode('utf-8')
+        return {
+            data['service']: data
+            for data in [json.loads(line) for line in lines.splitlines()]
+        }
+
+    @override_settings(MACHINE_TRANSLATION_ENABLED=True)
+    def test_translate_all(self):
+        cache.clear()
+        self.ensure_dummy_mt()
+        self.add_mt(DuplicateTranslation())
+        data = self.get_translate_all()
+        self.assertIn('Weblate similarity', data)
+        self.assertEqual(
+            len(data['Dummy']['translations']) +
+            len(data['Duplicate']['translations']),
+            2
+        )
+        self.assertEqual(data['Dummy']['responseStatus'], 200)
+        self.assertEqual(data['Duplicate']['responseStatus'], 200)
+
+    @override_settings(
+        MACHINE_TRANSLATION_ENABLED=True, MT_SERVICES_TIMEOUT=0.5
+    )
+    def test_translate_all_timeout(self):
+        cache.clear()
+        self.add_mt(SlowTranslation())
+        data = self.get_translate_all()
+        self.assertEqual(data['Slow']['responseStatus'], 504)
+        self.assertEqual(data['Slow']['translations'], [])
+
+    @override_settings(
+        MACHINE_TRANSLATION_ENABLED=True, MT_SERVICES_TIMEOUT=0.5
+    )
+    def test_translate_all_local(self):
+        cache.clear()
+        local = LocalTranslation()
+        local.network = SlowTranslation()
+        self.add_mt(local.network)
+        self.add_mt(local)
+        data = self.get_translate_all()
+        # Local services are queried once network requests are running
+        self.assertTrue(local.network_running)
+        self.assertEqual(data['Local']['responseStatus'], 200)
+        self.assertEqual(data['Slow']['responseStatus'], 504)
+
+    @override_settings(MACHINE_TRANSLATION_ENABLED=True, MT_SERVICES_TIMEOUT=0)
+    def test_translate_all_local_timeout(self):
+        cache.clear()
+        local = LocalTranslation()
+        self.add_mt(local)
+        data = self.get_translate_all()
+        # Local services are not queried after the time limit
+        self.assertIsNone(local.network_running)
+        self.assertEqual(data['Local']['responseStatus'], 504)
+
     def test_get_unit_changes(self):
         unit = self.get_unit()
         response = self.client.get(
@@ -20,15 +20,27 @@
 
 from __future__ import unicode_literals
 import json
+import threading
+import time
 
 from django.test import TestCase
 from django.test.utils import override_settings
 from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from six import StringIO
+from six.moves.BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from six.moves.socketserver import ThreadingMixIn
 
 import httpretty
+import requests
 
 from weblate.trans.tests.test_views import ViewTestCase
 from weblate.trans.models.unit import Unit
+from weblate.trans.machine.base import (
+    MachineTranslation, MachineTranslationError, fix_json,
+)
 from weblate.trans.machine.dummy import DummyTranslation
 from weblate.trans.machine.glosbe import GlosbeTranslation
 from weblate.trans.machine.mymemory import MyMemoryTranslation
@@ -45,6 +57,7 @@ from weblate.trans.machine.weblatetm import (
     WeblateSimilarTranslation, WeblateTranslation
 )
 from weblate.trans.tests.test_checks import MockUnit
+from weblate.trans.machine import MACHINE_TRANSLATION_SERVICES
 
 GLOSBE_JSON = '''
 {
@@ -100,6 +113,9 @@ AMAGAMA_JSON = '''
 
 class MachineTranslationTest(TestCase):
     """Testing of machine translation core."""
+    def setUp(self):
+        cache.clear()
+
     def test_support(self):
         machine_translation = DummyTranslation()
         self.assertTrue(machine_translation.is_supported('en', 'cs'))
@@ -120,6 +136,57 @@ class MachineTranslationTest(TestCase):
             2
         )
 
+    def test_translate_cache(self):
+        machine_translation = DummyTranslation()
+        first = machine_translation.translate(
+            'cs', 'Hello, world!', MockUnit(), None
+        )
+        second = machine_translation.translate(
+            'cs', 'Hello, world!', MockUnit(), None
+        )
+        self.assertEqual(first, second)
+        self.assertEqual(
+            machine_translation.get_cache_stats(),
+            {'hits': 1, 'misses': 1}
+        )
+
+    @override_settings(MT_CACHE_TIMEOUT=0)
+    def test_translate_cache_disabled(self):
+        machine_translation = DummyTranslation()
+        machine_translation.translate('cs', 'Hello, world!', MockUnit(), None)
+        machine_translation.translate('cs', 'Hello, world!', MockUnit(), None)
+        self.assertEqual(
+            machine_translation.get_cache_stats(),
+            {'hits': 0, 'misses': 0}
+        )
+
+    def test_translate_batch(self):
+        machine_translation = DummyTranslation()
+        translations = machine_translation.translate_batch(
+            'en', 'cs', ['Hello, world!', 'Hello', 'Hello, world!']
+        )
+        self.assertEqual(len(translations[0]), 2)
+        self.assertEqual(translations[1], [])
+        self.assertEqual(translations[0], translations[2])
+        # Second round uses cache
+        self.assertEqual(
+            machine_translation.translate_batch(
+                'en', 'cs', ['Hello, world!', 'Hello']
+            ),
+            translations[:2]
+        )
+        self.assertEqual(
+            machine_translation.get_cache_stats(),
+            {'hits': 2, 'misses': 2}
+        )
+
+    def test_translate_batch_unsupported(self):
+        machine_translation = DummyTranslation()
+        self.assertEqual(
+            machine_translation.translate_batch('en', 'de', ['Hello']),
+            [[]]
+        )
+
     def test_translate_fallback(self):
         machine_translation = DummyTranslation()
         self.assertEqual(
@@ -277,6 +344,44 @@ class MachineTranslationTest(TestCase):
         self.assert_translate(machine)
         self.assert_translate(machine, lang='he')
 
+    @override_settings(MT_GOOGLE_KEY='KEY')
+    @httpretty.activate
+    def test_google_batch(self):
+        cache.delete('{0}-languages'.format(GoogleTranslation().mtid))
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://www.googleapis.com/language/translate/v2/languages',
+            body=json.dumps(
+                {
+                    'data': {
+                        'languages': [{'language': 'en'}, {'language': 'cs'}]
+                    }
+                }
+            )
+        )
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://www.googleapis.com/language/translate/v2/',
+            body=json.dumps(
+                {
+                    'data': {
+                        'translations': [
+                            {'translatedText': 'ahoj'},
+                            {'translatedText': 'svet'},
+                        ]
+                    }
+                }
+            )
+        )
+        machine = GoogleTranslation()
+        translations = machine.translate_batch('en', 'cs', ['world', 'hello'])
+        self.assertEqual(translations[0][0]['text'], 'svet')
+        self.assertEqual(translations[1][0]['text'], 'ahoj')
+        self.assertEqual(
+            httpretty.last_request().parsed_body['q'],
+            ['hello', 'world']
+        )
+
     @override_settings(MT_GOOGLE_KEY='KEY')
     @httpretty.activate
     def test_google_invalid(self):
@@ -346,6 +451,25 @@ class MachineTranslationTest(TestCase):
         machine = YandexTranslation()
         self.assert_translate(machine)
 
+    @override_settings(MT_YANDEX_KEY='KEY')
+    @httpretty.activate
+    def test_yandex_batch(self):
+        cache.delete('{0}-languages'.format(YandexTranslation().mtid))
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://translate.yandex.net/api/v1.5/tr.json/getLangs',
+            body=b'{"dirs": ["en-cs"]}'
+        )
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://translate.yandex.net/api/v1.5/tr.json/translate',
+            body=b'{"code": 200, "lang": "en-cs", "text": ["ahoj", "svet"]}'
+        )
+        machine = YandexTranslation()
+        translations = machine.translate_batch('en', 'cs', ['world', 'hello'])
+        self.assertEqual(translations[0][0]['text'], 'svet')
+        self.assertEqual(translations[1][0]['text'], 'ahoj')
+
     @override_settings(MT_YANDEX_KEY='KEY')
     @httpretty.activate
     def test_yandex_error(self):
@@ -387,3 +511,172 @@ class WeblateTranslationTest(ViewTestCase):
             self.user
         )
         self.assertEqual(results, [])
+
+
+class WarmCacheTest(ViewTestCase):
+    def setUp(self):
+        super(WarmCacheTest, self).setUp()
+        cache.clear()
+        if 'dummy' not in MACHINE_TRANSLATION_SERVICES:
+            service = DummyTranslation()
+            MACHINE_TRANSLATION_SERVICES[service.mtid] = service
+
+    def test_warm(self):
+        output = StringIO()
+        call_command(
+            'warm_mt_cache', 'test', service=['dummy'], stdout=output
+        )
+        self.assertIn('Dummy: 0 hits, 4 misses', output.getvalue())
+        unit = self.get_unit()
+        MACHINE_TRANSLATION_SERVICES['dummy'].translate(
+            'cs', unit.get_source_plurals()[0], unit, self.user
+        )
+        self.assertEqual(
+            MACHINE_TRANSLATION_SERVICES['dummy'].get_cache_stats(),
+            {'hits': 1, 'misses': 4}
+        )
+
+    def test_invalid(self):
+        self.assertRaises(
+            CommandError,
+            call_command,
+            'warm_mt_cache', 'test', service=['invalid']
+        )
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Handler for stub machine translation server."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.clients.add(self.client_address)
+        self.server.requests += 1
+        if self.server.responses:
+            status = self.server.responses.pop(0)
+        else:
+            status = self.server.status
+        body = b'{"text": "svet"}'
+        time.sleep(self.server.delay)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        return
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    """Local HTTP server counting requests and connections."""
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubHandler)
+        self.clients = set()
+        self.requests = 0
+        self.responses = []
+        self.status = 200
+        self.delay = 0
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{0}/translate'.format(self.server_port)
+
+
+class StubTranslation(MachineTranslation):
+    """Machine translation using stub server."""
+    name = 'Stub'
+
+    def __init__(self, url):
+        super(StubTranslation, self).__init__()
+        self.url = url
+
+    def download_languages(self):
+        return ('en', 'cs')
+
+    def download_translations(self, source, language, text, unit, user):
+        response = self.json_req(self.url, text=text)
+        return [(response['text'], 100, self.name, text)]
+
+
+@override_settings(MT_RETRY_BACKOFF=0)
+class HTTPClientTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.server = StubServer()
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.machine = StubTranslation(self.server.url)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def translate(self, text='world'):
+        return self.machine.translate('cs', text, MockUnit(), None)
+
+    def test_keep_alive(self):
+        self.assertEqual(self.translate('world')[0]['text'], 'svet')
+        self.assertEqual(self.translate('hello')[0]['text'], 'svet')
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(len(self.server.clients), 1)
+
+    def test_retry(self):
+        self.server.responses = [503, 502]
+        self.assertEqual(self.translate()[0]['text'], 'svet')
+        self.assertEqual(self.server.requests, 3)
+        self.assertFalse(self.machine.circuit.is_open)
+
+    @override_settings(MT_RETRIES=1)
+    def test_retry_failed(self):
+        self.server.status = 500
+        self.assertRaises(MachineTranslationError, self.translate)
+        self.assertEqual(self.server.requests, 2)
+
+    def test_client_error(self):
+        self.server.status = 404
+        self.assertRaises(MachineTranslationError, self.translate)
+        self.assertEqual(self.server.requests, 1)
+        self.assertFalse(self.machine.circuit.is_open)
+
+    @override_settings(MT_RETRIES=0, MT_CIRCUIT_FAILURES=2)
+    def test_circuit(self):
+        self.server.status = 500
+        for text in ('world', 'hello', 'other'):
+            self.assertRaises(MachineTranslationError, self.translate, text)
+        self.assertEqual(self.server.requests, 2)
+        self.assertTrue(self.machine.circuit.is_open)
+
+    @override_settings(MT_RETRIES=0, MT_CIRCUIT_FAILURES=1, MT_CIRCUIT_RESET=0)
+    def test_circuit_reset(self):
+        self.server.responses = [500]
+        self.assertRaises(MachineTranslationError, self.translate)
+        self.assertTrue(self.machine.circuit.is_open)
+        self.assertEqual(self.translate('hello')[0]['text'], 'svet')
+        self.assertFalse(self.machine.circuit.is_open)
+
+    @override_settings(MT_RETRIES=0, MT_REQUEST_TIMEOUT=0.1)
+    def test_request_timeout(self):
+        self.server.delay = 0.5
+        self.assertRaises(MachineTranslationError, self.translate)
+        self.assertEqual(self.server.requests, 1)
+
+    def test_request_details(self):
+        self.server.status = 404
+        with self.assertRaises(requests.HTTPError) as context:
+            self.machine.json_req(self.server.url, text='world')
+        self.assertEqual(context.exception.mt_url, self.server.url)
+        self.assertEqual(context.exception.mt_params, {'text': 'world'})
+
+    def test_latency(self):
+        self.translate()
+        self.assertEqual(self.machine.latency.total, 1)
+        self.assertLessEqual(self.machine.latency.percentile(95), 10)
+
+    def test_fix_json(self):
+        self.assertEqual(
+            json.loads(fix_json('[[,"a",,1],,"en"]')),
+            [['a', None, 1], None, 'en']
+        )
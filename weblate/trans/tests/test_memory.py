@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Tests for translation memory."""
+
+from __future__ import unicode_literals
+
+import threading
+
+from django.test import SimpleTestCase
+from django.test.utils import override_settings
+
+from weblate.trans.machine.weblatetm import (
+    WeblateSimilarTranslation, WeblateTranslation,
+)
+from weblate.trans.memory import (
+    LanguageMemory, TranslationMemory, TRANSLATION_MEMORY, get_ngrams,
+)
+from weblate.trans.models import Unit
+from weblate.trans.tests.test_views import ViewTestCase
+from weblate.trans.util import join_plural
+
+
+class LanguageMemoryTest(SimpleTestCase):
+    def setUp(self):
+        self.memory = LanguageMemory()
+        self.memory.add(1, 'Hello, world!', 'Ahoj světe!', 1, 'Test/Test')
+        self.memory.add(2, 'Hello, world!', 'Nazdar světe!', 2, 'Other/Test')
+        self.memory.add(3, 'Hello, wide world!', 'Ahoj širý světe!', 1, 'A')
+        self.memory.add(4, 'Thank you', 'Děkuji', 1, 'Test/Test')
+
+    def test_ngrams(self):
+        self.assertEqual(get_ngrams('Ab  c'), {' ab', 'ab ', 'b c', ' c '})
+        self.assertEqual(get_ngrams(''), set())
+
+    def test_lookup(self):
+        self.assertEqual(
+            [entry.target for entry in self.memory.lookup(
+                'Hello, world!', {1, 2}, 1
+            )],
+            ['Nazdar světe!']
+        )
+        self.assertEqual(self.memory.lookup('Hello', {1, 2}, None), [])
+
+    def test_lookup_acl(self):
+        self.assertEqual(
+            [entry.origin for entry in self.memory.lookup(
+                'Hello, world!', {1}, None
+            )],
+            ['Test/Test']
+        )
+        self.assertEqual(
+            self.memory.lookup_similar('Hello, world', set(), None, 0.5, 5),
+            []
+        )
+
+    def test_lookup_similar(self):
+        result = self.memory.lookup_similar(
+            'Hello, world', {1, 2}, None, 0.5, 5
+        )
+        self.assertEqual(
+            [entry.target for similarity, entry in result],
+            ['Ahoj světe!', 'Nazdar světe!', 'Ahoj širý světe!']
+        )
+        self.assertGreater(result[0][0], result[2][0])
+        self.assertLess(result[0][0], 1)
+        # Same string is not included
+        self.assertEqual(
+            len(self.memory.lookup_similar(
+                'Hello, world!', {1, 2}, None, 0.5, 5
+            )),
+            1
+        )
+        # Limits
+        self.assertEqual(
+            len(self.memory.lookup_similar(
+                'Hello, world', {1, 2}, None, 0.8, 5
+            )),
+            2
+        )
+        self.assertEqual(
+            len(self.memory.lookup_similar(
+                'Hello, world', {1, 2}, None, 0.5, 1
+            )),
+            1
+        )
+
+    def test_remove(self):
+        self.memory.remove(2)
+        self.memory.remove(2)
+        self.memory.add(1, 'Thank you', 'Díky', 1, 'Test/Test')
+        self.assertEqual(
+            self.memory.lookup('Hello, world!', {1, 2}, None), []
+        )
+        self.assertEqual(
+            len(self.memory.lookup('Thank you', {1, 2}, None)), 2
+        )
+        self.assertNotIn('hello, world!', self.memory.exact)
+
+    def test_plural(self):
+        self.memory.add(
+            5, join_plural(['File', 'Files']), join_plural(['Soubor']), 1, 'A'
+        )
+        self.assertEqual(
+            self.memory.lookup('File', {1}, None)[0].target,
+            'Soubor'
+        )
+
+
+class UpdatingMemory(TranslationMemory):
+    """Translation memory with unit deleted while it is loaded."""
+    def load(self, language):
+        memory = LanguageMemory()
+        memory.add(1, 'Hello', 'Ahoj', 1, 'A')
+        memory.add(2, 'Thank you', 'Děkuji', 1, 'A')
+        # Would block if the lock was held while loading
+        self.delete_units(language, [1])
+        return memory
+
+
+class BlockingMemory(TranslationMemory):
+    """Translation memory with load waiting for event."""
+    def __init__(self):
+        super(BlockingMemory, self).__init__()
+        self.loads = 0
+        self.started = threading.Event()
+        self.proceed = threading.Event()
+
+    def load(self, language):
+        self.loads += 1
+        self.started.set()
+        self.proceed.wait()
+        memory = LanguageMemory()
+        memory.add(self.loads, 'Hello', 'Ahoj', 1, 'A')
+        return memory
+
+
+class TranslationMemoryLoadTest(SimpleTestCase):
+    def test_load_unlocked(self):
+        memory = UpdatingMemory()
+        self.assertEqual(list(memory.get(1).entries), [2])
+        self.assertEqual(memory.loading, {})
+        self.assertIn(1, memory.languages)
+
+    def start_get(self, memory):
+        result = []
+        thread = threading.Thread(
+            target=lambda: result.append(memory.get(1))
+        )
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(memory.proceed.set)
+        memory.started.wait()
+        return thread, result
+
+    def test_load_once(self):
+        memory = BlockingMemory()
+        thread, result = self.start_get(memory)
+        waiting, waiting_result = self.start_get(memory)
+        memory.proceed.set()
+        thread.join()
+        waiting.join()
+        self.assertEqual(memory.loads, 1)
+        self.assertIs(result[0], waiting_result[0])
+
+    @override_settings(MT_WEBLATE_REFRESH=0)
+    def test_reload_stale(self):
+        memory = BlockingMemory()
+        memory.proceed.set()
+        stale = memory.get(1)
+        memory.started.clear()
+        memory.proceed.clear()
+        thread, result = self.start_get(memory)
+        # Stale memory is used while it is being reloaded
+        self.assertIs(memory.get(1), stale)
+        memory.proceed.set()
+        thread.join()
+        self.assertEqual(memory.loads, 2)
+        self.assertIsNot(result[0], stale)
+        self.assertEqual(list(result[0].entries), [2])
+
+
+class TranslationMemoryTest(ViewTestCase):
+    def setUp(self):
+        super(TranslationMemoryTest, self).setUp()
+        self.subproject2 = self.create_linked(
+            self.subproject, allow_translation_propagation=False
+        )
+
+    def get_unit2(self):
+        return self.get_linked_units().get(
+            translation__subproject=self.subproject2
+        )
+
+    def lookup(self, machine=WeblateTranslation):
+        return machine().translate(
+            'cs', 'Hello, world!\n', self.get_unit2(), self.user
+        )
+
+    def test_lookup(self):
+        self.assertEqual(self.lookup(), [])
+        self.change_unit('Nazdar svete!\n')
+        self.assertEqual(
+            self.lookup(),
+            [{
+                'text': 'Nazdar svete!\n',
+                'quality': 100,
+                'service': 'Weblate (Test/Test)',
+                'source': 'Hello, world!\n',
+            }]
+        )
+        self.change_unit('')
+        self.assertEqual(self.lookup(), [])
+
+    def test_similar(self):
+        unit = self.get_unit()
+        unit.source = 'Hello, world'
+        unit.target = 'Nazdar svete!'
+        unit.translated = True
+        unit.save(backend=True)
+        results = self.lookup(WeblateSimilarTranslation)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['text'], 'Nazdar svete!')
+        self.assertEqual(results[0]['quality'], 88)
+
+    def test_acl(self):
+        self.change_unit('Nazdar svete!\n')
+        self.project.enable_acl = True
+        self.project.save()
+        self.assertEqual(self.lookup(), [])
+
+    @override_settings(MT_WEBLATE_REFRESH=0)
+    def test_refresh(self):
+        self.assertEqual(self.lookup(), [])
+        # Changes not done through Weblate are loaded on refresh
+        Unit.objects.filter(pk=self.get_unit().pk).update(
+            target='Nazdar svete!\n', translated=True
+        )
+        self.assertEqual(len(self.lookup()), 1)
+
+    def test_delete(self):
+        self.change_unit('Nazdar svete!\n')
+        self.assertEqual(len(self.lookup()), 1)
+        self.assertEqual(len(TRANSLATION_MEMORY.languages), 1)
+        self.subproject.delete()
+        self.assertEqual(TRANSLATION_MEMORY.languages, {})
+        self.assertEqual(self.lookup(), [])
@@ -25,17 +25,20 @@ from __future__ import print_function
 import shutil
 import os
 
+from django.db import connection
 from django.test import TestCase
-from django.test.utils import override_settings
+from django.test.utils import override_settings, CaptureQueriesContext
 from django.utils import timezone
 from django.contrib.auth.models import User, Group
 from django.core.exceptions import ValidationError
 
 from weblate.trans.models import (
     Project, Source, Unit, WhiteboardMessage, Check, ComponentList,
-    AutoComponentList, get_related_units,
+    AutoComponentList, Translation, get_related_units,
 )
 import weblate.trans.models.subproject
+from weblate.trans.models.translation import STATS_FIELDS
+from weblate.trans.bulk import BulkChecks
 from weblate.lang.models import Language
 from weblate.permissions.helpers import can_access_project
 from weblate.trans.tests.utils import get_test_file, RepoTestMixin
@@ -172,6 +175,152 @@ class TranslationTest(RepoTestCase):
         translation.unit_set.all().delete()
         translation.update_stats()
 
+    def assert_stats(self, translation):
+        stats = translation.calculate_stats()
+        stored = Translation.objects.get(pk=translation.pk)
+        for field in STATS_FIELDS:
+            self.assertEqual(getattr(translation, field), stats[field])
+            self.assertEqual(getattr(stored, field), stats[field])
+
+    def test_update_stats_delta(self):
+        """Check incremental stats match full recalculation."""
+        project = self.create_subproject()
+        translation = project.translation_set.get(language_code='cs')
+        stale = Translation.objects.get(pk=translation.pk)
+        unit = translation.unit_set.filter(translated=False)[0]
+        unit.target = 'Test'
+        unit.translated = True
+        unit.fuzzy = False
+        unit.save(backend=True)
+        self.assert_stats(translation)
+        unit.fuzzy = True
+        unit.translated = False
+        unit.save(backend=True)
+        self.assert_stats(translation)
+        # Saving outdated instance should not overwrite stats
+        stale.commit_message = 'Test'
+        stale.save()
+        self.assert_stats(translation)
+
+    def get_units_data(self, subproject):
+        return sorted(
+            Unit.objects.filter(
+                translation__subproject=subproject
+            ).values_list(
+                'translation__language_code', 'id_hash', 'content_hash',
+                'source', 'target', 'context', 'location', 'comment', 'flags',
+                'previous_source', 'fuzzy', 'translated', 'position',
+                'priority', 'num_words', 'has_failing_check',
+                'has_suggestion', 'has_comment',
+            )
+        )
+
+    def reload_units(self, subproject, bulk):
+        Unit.objects.filter(translation__subproject=subproject).delete()
+        with CaptureQueriesContext(connection) as context:
+            subproject.create_translations(force=True, bulk=bulk)
+        return len(context.captured_queries)
+
+    def verify_bulk(self, subproject):
+        expected = self.get_units_data(subproject)
+        queries = self.reload_units(subproject, False)
+        self.assertEqual(expected, self.get_units_data(subproject))
+        bulk_queries = self.reload_units(subproject, True)
+        self.assertEqual(expected, self.get_units_data(subproject))
+        self.assertLess(bulk_queries, queries)
+
+    def test_check_sync_bulk(self):
+        self.verify_bulk(self.create_subproject())
+
+    def test_check_sync_bulk_mono(self):
+        self.verify_bulk(self.create_po_mono())
+
+    def test_check_sync_bulk_update(self):
+        subproject = self.create_subproject()
+        translation = subproject.translation_set.get(language_code='cs')
+        expected = self.get_units_data(subproject)
+        translation.unit_set.update(target='', fuzzy=True, position=0)
+        translation.check_sync(force=True, bulk=True)
+        self.assertEqual(expected, self.get_units_data(subproject))
+
+    def get_checks_data(self):
+        return list(
+            Check.objects.order_by(
+                'content_hash', 'language', 'check'
+            ).values_list(
+                'content_hash', 'language_id', 'check', 'ignore'
+            )
+        )
+
+    def test_bulk_checks(self):
+        subproject = self.create_subproject()
+        units = Unit.objects.filter(translation__subproject=subproject)
+        expected = self.get_units_data(subproject)
+        expected_checks = self.get_checks_data()
+        self.assertNotEqual(expected_checks, [])
+
+        # Cleanup and run checks on all units at once
+        Check.objects.all().delete()
+        units.update(has_failing_check=False)
+        checks = BulkChecks()
+        for unit in units.all():
+            checks.add(unit)
+        with CaptureQueriesContext(connection) as context:
+            checks.run()
+        bulk_queries = len(context.captured_queries)
+        self.assertEqual(expected, self.get_units_data(subproject))
+        self.assertEqual(expected_checks, self.get_checks_data())
+
+        # Compare with running checks one by one
+        Check.objects.all().delete()
+        units.update(has_failing_check=False)
+        with CaptureQueriesContext(connection) as context:
+            for unit in units.all():
+                unit.run_checks()
+        self.assertEqual(expected, self.get_units_data(subproject))
+        self.assertEqual(expected_checks, self.get_checks_data())
+        self.assertLess(bulk_queries, len(context.captured_queries))
+
+    def test_bulk_checks_cleanup(self):
+        subproject = self.create_subproject()
+        unit = Unit.objects.filter(
+            translation__subproject=subproject,
+            translated=True,
+        )[0]
+        expected = set(unit.checks().values_list('check', flat=True))
+        # Add check which is not failing
+        Check.objects.create(
+            content_hash=unit.content_hash,
+            project=subproject.project,
+            language=unit.translation.language,
+            ignore=False,
+            check='zero-width-space',
+        )
+        unit = Unit.objects.get(pk=unit.pk)
+        self.assertTrue(unit.has_failing_check)
+        checks = BulkChecks()
+        checks.add(unit)
+        checks.run()
+        self.assertEqual(
+            expected,
+            set(unit.checks().values_list('check', flat=True))
+        )
+        self.assertEqual(unit.has_failing_check, bool(expected))
+        self.assertEqual(
+            Unit.objects.get(pk=unit.pk).has_failing_check,
+            bool(expected)
+        )
+
+        # Missing checks are created again
+        unit.checks().delete()
+        checks = BulkChecks()
+        checks.add(unit)
+        checks.run()
+        self.assertEqual(
+            expected,
+            set(unit.checks().values_list('check', flat=True))
+        )
+
 
 class ComponentListTest(RepoTestCase):
     """Test(s) for ComponentList model."""
@@ -266,25 +415,6 @@ class SourceTest(ModelTestCase):
         self.assertEqual(Check.objects.count(), 0)
 
 
-class UnitTest(ModelTestCase):
-    @override_settings(MT_WEBLATE_LIMIT=15)
-    def test_more_like(self):
-        unit = Unit.objects.all()[0]
-        self.assertEqual(Unit.objects.more_like_this(unit).count(), 0)
-
-    @override_settings(MT_WEBLATE_LIMIT=0)
-    def test_more_like_timeout(self):
-        unit = Unit.objects.all()[0]
-        self.assertRaisesMessage(
-            Exception, 'Request timed out.', Unit.objects.more_like_this, unit
-        )
-
-    @override_settings(MT_WEBLATE_LIMIT=-1)
-    def test_more_like_no_fork(self):
-        unit = Unit.objects.all()[0]
-        self.assertEqual(Unit.objects.more_like_this(unit).count(), 0)
-
-
 class WhiteboardMessageTest(ModelTestCase):
     """Test(s) for WhiteboardMessage model."""
     def setUp(self):
@@ -238,6 +238,43 @@ class MultiRepoTest(ViewTestCase):
         )
         self.assertEqual(translation.total, 5)
 
+    def test_update_changed(self):
+        """Test that update checks only changed files."""
+        self.push_replace(EXTRA_PO, 'a')
+
+        # Mark other translations outdated, they should be checked as well
+        others = self.subproject2.translation_set.exclude(language_code='cs')
+        others.update(revision='')
+
+        self.subproject2.do_update(self.request)
+
+        translation = self.subproject2.translation_set.get(
+            language_code='cs'
+        )
+        self.assertEqual(translation.total, 5)
+        self.assertTrue(others.exists())
+        self.assertFalse(others.filter(revision='').exists())
+
+    def test_unchanged_translations(self):
+        """Test detection of translations not needing check."""
+        translations = self.subproject2.translation_set.all()
+        self.assertEqual(
+            len(self.subproject2.get_unchanged_translations(set())),
+            translations.count()
+        )
+        translation = translations.get(language_code='cs')
+        self.assertNotIn(
+            translation.filename,
+            self.subproject2.get_unchanged_translations(
+                {translation.filename}
+            )
+        )
+        translations.filter(pk=translation.pk).update(revision='')
+        self.assertNotIn(
+            translation.filename,
+            self.subproject2.get_unchanged_translations(set())
+        )
+
     def test_deleted_unit(self):
         """Test removing several units from remote repo."""
         self.push_replace(MINIMAL_PO, 'w')
@@ -25,16 +25,22 @@ from __future__ import unicode_literals
 import re
 import shutil
 import tempfile
+from importlib import import_module
 import os.path
-from unittest import TestCase
+from unittest import TestCase, skipUnless
 from whoosh.filedb.filestore import FileStorage
 from whoosh.fields import Schema, ID, TEXT
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.test.utils import override_settings
 from weblate.trans.tests.test_views import ViewTestCase
-from weblate.trans.search import update_index_unit, fulltext_search
+from weblate.trans.search import (
+    update_index_unit, fulltext_search,
+    WhooshSearch, DatabaseSearch,
+)
+from weblate.trans.indexer import Indexer
 import weblate.trans.search
-from weblate.trans.models import IndexUpdate
+from weblate.trans.models import IndexUpdate, Unit
 
 
 class SearchViewTest(ViewTestCase):
@@ -443,6 +449,161 @@ class SearchBackendTest(ViewTestCase):
         update = IndexUpdate.objects.all()[0]
         self.assertTrue(update.source, True)
 
+    @override_settings(OFFLOAD_INDEXING=True)
+    def test_indexer(self):
+        self.do_index_update()
+        unit = self.get_translation().unit_set.get(
+            source='Hello, world!\n',
+        )
+        indexer = Indexer(commit_size=1, merge_interval=0)
+        indexer.run(once=True)
+        self.assertEqual(IndexUpdate.objects.count(), 0)
+        self.assertEqual(indexer.stats.updates, 1)
+        self.assertEqual(indexer.stats.commits, 1)
+        self.assertIn(
+            unit.pk,
+            fulltext_search('Nazdar', 'cs', {'target': True})
+        )
+        self.assertIn(
+            unit.pk,
+            fulltext_search('Hello', 'cs', {'source': True})
+        )
+
+        # Removal from the index
+        IndexUpdate.objects.create(
+            unitid=unit.pk,
+            to_delete=True,
+            language_code='cs',
+        )
+        Indexer().run(once=True)
+        self.assertNotIn(
+            unit.pk,
+            fulltext_search('Nazdar', 'cs', {'target': True})
+        )
+
+    @override_settings(OFFLOAD_INDEXING=True)
+    def test_indexer_uncommitted(self):
+        self.do_index_update()
+        indexer = Indexer()
+        self.assertEqual(indexer.process(), 1)
+        # Updates are kept in the queue until written to the index
+        self.assertEqual(IndexUpdate.objects.count(), 1)
+        self.assertEqual(indexer.process(), 0)
+        indexer.commit()
+        self.assertEqual(IndexUpdate.objects.count(), 0)
+
+    @override_settings(OFFLOAD_INDEXING=True)
+    def test_indexer_refreshed(self):
+        self.do_index_update()
+        indexer = Indexer()
+        self.assertEqual(indexer.process(), 1)
+        # The unit is changed again before the index is committed
+        update_index_unit(self.get_unit(), False)
+        indexer.commit()
+        self.assertEqual(IndexUpdate.objects.count(), 1)
+        self.assertEqual(indexer.process(), 1)
+        indexer.commit()
+        self.assertEqual(IndexUpdate.objects.count(), 0)
+
+
+class DatabaseSearchTest(ViewTestCase):
+    """Database search backend testing, compared with Whoosh"""
+    def setUp(self):
+        super(DatabaseSearchTest, self).setUp()
+        self.edit_unit(
+            'Hello, world!\n',
+            'Nazdar svete!\n'
+        )
+        self.edit_unit(
+            'Thank you for using Weblate.',
+            'Diky za pouzivani Weblate.'
+        )
+        # Rebuild Whoosh index from scratch
+        units = Unit.objects.all()
+        WhooshSearch().update_index(units, units)
+        self.units = set(
+            self.get_translation().unit_set.values_list('pk', flat=True)
+        )
+
+    def assert_parity(self, query, params):
+        whoosh = WhooshSearch().fulltext_search(query, 'cs', params)
+        database = DatabaseSearch().fulltext_search(query, 'cs', params)
+        # Whoosh source index is not split by language
+        self.assertEqual(whoosh & self.units, database)
+        return database
+
+    def test_parity(self):
+        self.assertEqual(
+            len(self.assert_parity('Hello', {'source': True})), 1
+        )
+        self.assertEqual(
+            len(self.assert_parity('Weblate', {'source': True})), 2
+        )
+        self.assertEqual(
+            len(self.assert_parity('Weblate', {'target': True})), 1
+        )
+        self.assertEqual(
+            len(self.assert_parity('Nazdar', {'target': True})), 1
+        )
+        self.assertEqual(
+            len(self.assert_parity('Orangutan', {'source': True})), 1
+        )
+        self.assertEqual(
+            len(self.assert_parity('Nazdar', {'source': True})), 0
+        )
+        self.assertEqual(
+            len(self.assert_parity(
+                'Nazdar', {'source': True, 'target': True}
+            )),
+            1
+        )
+
+    def test_index_expression(self):
+        """Test that search vectors match the indexed expressions."""
+        migration = import_module(
+            'weblate.trans.migrations.0092_unit_fulltext_index'
+        )
+        backend = DatabaseSearch()
+        for field in migration.FIELDS:
+            sql, params = Unit.objects.annotate(
+                fts=backend.get_vector(field)
+            ).values_list('fts').query.sql_with_params()
+            self.assertEqual(params, ('simple', ''))
+            self.assertIn(
+                migration.EXPRESSION.format(
+                    '"trans_unit"."{0}"'.format(field)
+                ),
+                sql % tuple("'{0}'".format(param) for param in params)
+            )
+
+    @skipUnless(connection.vendor == 'postgresql', 'Needs PostgreSQL')
+    def test_index_used(self):
+        for field in ('source', 'target', 'context', 'comment', 'location'):
+            sql, params = DatabaseSearch().get_queryset(
+                'Nazdar', 'cs', [field]
+            ).values_list('pk').query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+                cursor.execute('EXPLAIN {0}'.format(sql), params)
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+                cursor.execute('RESET enable_seqscan')
+            self.assertIn('trans_unit_{0}_fts'.format(field), plan)
+
+    @override_settings(
+        SEARCH_BACKEND='weblate.trans.search.DatabaseSearch',
+        OFFLOAD_INDEXING=True,
+    )
+    def test_backend(self):
+        unit = self.get_translation().unit_set.get(
+            source='Thank you for using Weblate.',
+        )
+        update_index_unit(unit)
+        self.assertEqual(IndexUpdate.objects.count(), 0)
+        self.assertEqual(
+            fulltext_search('Diky', 'cs', {'target': True}),
+            {unit.pk}
+        )
+
 
 class SearchMigrationTest(TestCase):
     """Search index migration testing"""
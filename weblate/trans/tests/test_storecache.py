@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Tests for parsed stores cache."""
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase
+from django.test.utils import override_settings
+
+from weblate.trans.formats import PoFormat, XliffFormat
+from weblate.trans.storecache import StoreCache
+from weblate.trans.tests.utils import get_test_file
+
+TEST_PO = get_test_file('cs.po')
+TEST_XLIFF = get_test_file('cs.xliff')
+
+
+class StoreCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.cache = StoreCache()
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_parse(self):
+        store = self.cache.parse(PoFormat, TEST_PO)
+        self.assertEqual(self.cache.misses, 1)
+        cached = self.cache.parse(PoFormat, TEST_PO)
+        self.assertEqual(self.cache.hits, 1)
+        # Every lookup gets own copy
+        self.assertIsNot(store, cached)
+        self.assertEqual(len(store.units), len(cached.units))
+        cached.units[1].settarget('Changed')
+        self.assertNotEqual(store.units[1].target, 'Changed')
+        self.assertNotEqual(
+            self.cache.parse(PoFormat, TEST_PO).units[1].target,
+            'Changed'
+        )
+
+    def test_filename(self):
+        filename = os.path.join(self.tempdir, 'test.po')
+        shutil.copy(TEST_PO, filename)
+        self.cache.parse(PoFormat, TEST_PO)
+        store = self.cache.parse(PoFormat, filename)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(store.filename, filename)
+
+    def test_changed(self):
+        filename = os.path.join(self.tempdir, 'test.po')
+        shutil.copy(TEST_PO, filename)
+        self.cache.parse(PoFormat, filename)
+        with open(filename, 'ab') as handle:
+            handle.write(b'\nmsgid "Added"\nmsgstr "Pridano"\n')
+        store = self.cache.parse(PoFormat, filename)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(store.units[-1].source, 'Added')
+
+    @override_settings(STORE_CACHE_SIZE=0)
+    def test_disabled(self):
+        self.cache.parse(PoFormat, TEST_PO)
+        self.cache.parse(PoFormat, TEST_PO)
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.misses, 0)
+
+    def test_not_cacheable(self):
+        for dummy in range(2):
+            store = self.cache.parse(XliffFormat, TEST_XLIFF)
+            self.assertEqual(len(store.units), 4)
+            self.assertEqual(store.units[0].source, 'Hello, world!\n')
+            self.assertIn(b'Hello, world!', bytes(store))
+        self.assertEqual(self.cache.size, 0)
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.misses, 0)
+
+    def test_format_load(self):
+        # Loading goes through the global cache
+        for dummy in range(2):
+            store = XliffFormat(TEST_XLIFF)
+            self.assertEqual(store.count_units(), 4)
+            self.assertIn(b'Hello, world!', bytes(store.store))
+
+    def test_unsupported(self):
+        class BrokenStore(object):
+            units = ()
+
+            def __reduce__(self):
+                raise TypeError('can not pickle')
+
+        class BrokenFormat(PoFormat):
+            format_id = 'broken'
+
+            @staticmethod
+            def parse_store(storefile):
+                return BrokenStore()
+
+        self.cache.parse(BrokenFormat, TEST_PO)
+        self.assertIn(BrokenFormat.format_id, self.cache.unsupported)
+        self.assertEqual(self.cache.size, 0)
+        self.cache.parse(BrokenFormat, TEST_PO)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_disk(self):
+        with override_settings(STORE_CACHE_DIR=self.tempdir):
+            self.cache.parse(PoFormat, TEST_PO)
+            self.assertEqual(len(os.listdir(self.tempdir)), 1)
+            # Loads from disk
+            self.cache.clear()
+            store = self.cache.parse(PoFormat, TEST_PO)
+            self.assertEqual(self.cache.hits, 1)
+            self.assertEqual(store.filename, TEST_PO)
+
+    @override_settings(STORE_CACHE_SIZE=0.002)
+    def test_evict(self):
+        limit = 0.002 * 1024 * 1024
+        self.cache.parse(PoFormat, TEST_PO)
+        self.cache.parse(PoFormat, get_test_file('cs-fuzzy.po'))
+        self.assertLessEqual(self.cache.size, limit)
+        self.assertEqual(len(self.cache.entries), 1)
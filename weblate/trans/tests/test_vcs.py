@@ -20,6 +20,7 @@
 
 from __future__ import unicode_literals
 
+import gc
 import tempfile
 import shutil
 import os.path
@@ -31,7 +32,7 @@ from django.utils import timezone
 from weblate.trans.tests.test_models import RepoTestCase
 from weblate.trans.vcs import GitRepository, HgRepository, \
     RepositoryException, GitWithGerritRepository, GithubRepository, \
-    SubversionRepository
+    SubversionRepository, close_repositories
 from weblate.trans.tests.utils import get_test_file
 
 
@@ -105,6 +106,7 @@ class VCSGitTest(RepoTestCase):
 
     def tearDown(self):
         if self._tempdir is not None:
+            self.repo.close()
             shutil.rmtree(self._tempdir)
 
     def add_remote_commit(self, conflict=False):
@@ -335,6 +337,17 @@ class VCSGitTest(RepoTestCase):
                 'Foo <bar@example.com>',
             )
 
+    def test_changed_files(self):
+        revision = self.repo.last_revision
+        self.test_commit()
+        changed = self.repo.get_changed_files(revision)
+        if changed is None:
+            raise SkipTest('Listing not supported')
+        self.assertEqual(changed, ['testfile'])
+        self.assertEqual(
+            self.repo.get_changed_files(self.repo.last_revision), []
+        )
+
     def test_remove(self):
         self.repo.set_committer('Foo Bar', 'foo@example.net')
         self.assertTrue(
@@ -353,6 +366,64 @@ class VCSGitTest(RepoTestCase):
             40
         )
 
+    def test_object_hashes(self):
+        hashes = self.repo.get_object_hashes()
+        if hashes is None:
+            raise SkipTest('Listing not supported')
+        self.assertEqual(
+            hashes['README.md'],
+            self.repo.get_object_hash('README.md')
+        )
+        self.assertIn('po/cs.po', hashes)
+        # The listing is cached for current revision
+        self.assertIs(hashes, self.repo.get_object_hashes())
+
+    def test_read_channel(self):
+        channel = getattr(self.repo, '_cat_file_check', None)
+        if channel is None:
+            raise SkipTest('Read channel not supported')
+        revision = self.repo.last_revision
+        process = channel.process
+        self.assertIsNotNone(process)
+        # The process is reused for following reads
+        self.assertEqual(
+            revision, self.repo.resolve_revision('HEAD')
+        )
+        self.assertFalse(self.repo.needs_merge())
+        self.assertIs(process, channel.process)
+        self.assertRaises(
+            RepositoryException,
+            self.repo.resolve_revision,
+            'nonexisting-revision'
+        )
+        self.assertIs(process, channel.process)
+        # Finished request terminates it
+        close_repositories()
+        self.assertIsNone(channel.process)
+        self.assertIsNotNone(process.returncode)
+        self.repo.resolve_revision('HEAD')
+        process = channel.process
+        # Commit invalidates it
+        self.test_commit()
+        self.assertIsNot(process, channel.process)
+        self.assertNotEqual(revision, self.repo.last_revision)
+
+    def test_read_channel_release(self):
+        repo = self._class(self.repo.path)
+        channel = getattr(repo, '_cat_file_check', None)
+        if channel is None:
+            raise SkipTest('Read channel not supported')
+        repo.resolve_revision('HEAD')
+        process = channel.process
+        # Dropped repository terminates the process without cyclic GC
+        gc.disable()
+        try:
+            del repo
+            del channel
+        finally:
+            gc.enable()
+        self.assertIsNotNone(process.returncode)
+
     def test_configure_remote(self):
         with self.repo.lock:
             self.repo.configure_remote('pullurl', 'pushurl', 'branch')
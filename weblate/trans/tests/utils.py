@@ -25,9 +25,11 @@ from tarfile import TarFile
 from unittest import SkipTest
 
 from django.conf import settings
+from django.db import connection
 
 from weblate.trans.formats import FILE_FORMATS
-from weblate.trans.models import Project, SubProject
+from weblate.trans.memory import TRANSLATION_MEMORY
+from weblate.trans.models import Project, SubProject, Unit
 from weblate.trans.search import clean_indexes
 from weblate.trans.vcs import HgRepository, SubversionRepository
 
@@ -46,6 +48,16 @@ def get_test_file(name):
     return os.path.join(TEST_DATA, name)
 
 
+def is_test_db_shared():
+    """Check whether test database is visible to other threads and
+    processes, what is not the case for in-memory SQLite database."""
+    if connection.vendor != 'sqlite':
+        return True
+    return not connection.creation.is_in_memory_db(
+        connection.settings_dict['TEST']['NAME'] or ':memory:'
+    )
+
+
 def remove_readonly(func, path, _):
     "Clear the readonly bit and reattempt the removal"
     os.chmod(path, stat.S_IWRITE)
@@ -157,6 +169,7 @@ class RepoTestMixin(object):
 
         # Remove indexes
         clean_indexes()
+        TRANSLATION_MEMORY.clear()
 
     def create_project(self):
         """Create test project."""
@@ -393,13 +406,26 @@ class RepoTestMixin(object):
         )
 
     def create_link(self):
-        parent = self.create_iphone()
+        return self.create_linked(self.create_iphone())
+
+    @staticmethod
+    def create_linked(parent, **kwargs):
+        """Create Gettext component sharing repository with parent."""
         return SubProject.objects.create(
             name='Test2',
             slug='test2',
             project=parent.project,
-            repo='weblate://test/test',
+            repo=parent.get_repo_link_url(),
             file_format='po',
             filemask='po/*.po',
             new_lang='contact',
+            **kwargs
         )
+
+    @staticmethod
+    def get_linked_units(source='Hello, world!\n'):
+        """Return Czech units with given source ordered by component."""
+        return Unit.objects.filter(
+            translation__language_code='cs',
+            source=source,
+        ).order_by('translation__subproject__slug')
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2017 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Worker processing queued repository updates."""
+
+from __future__ import unicode_literals
+
+import sys
+import threading
+import time
+
+from django.db import connection
+from django.utils import timezone
+
+from weblate.logger import LOGGER
+from weblate.trans.models import UpdateJob
+from weblate.utils.errors import report_error
+
+
+class UpdaterStats(object):
+    """Metrics of the update worker."""
+    def __init__(self):
+        self.jobs = 0
+        self.failed = 0
+        self.requests = 0
+        self.wait_max = 0.0
+        self.latency_time = 0.0
+        self.latency_max = 0.0
+
+    def add_job(self, job, success, finished):
+        self.jobs += 1
+        if not success:
+            self.failed += 1
+        self.requests += job.requests
+        wait = (job.started - job.timestamp).total_seconds()
+        latency = (finished - job.timestamp).total_seconds()
+        self.wait_max = max(self.wait_max, wait)
+        self.latency_time += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    @property
+    def latency_avg(self):
+        if not self.jobs:
+            return 0.0
+        return self.latency_time / self.jobs
+
+
+class Updater(object):
+    """Worker processing queued repository updates.
+
+    Each repository is updated by single thread at time, several
+    repositories can be updated in parallel.
+    """
+    def __init__(self, threads=1, stale_timeout=3600):
+        self.threads = threads
+        self.stale_timeout = stale_timeout
+        self.stats = UpdaterStats()
+        self.lock = threading.Lock()
+
+    def process_job(self, job):
+        """Perform update for the job."""
+        success = False
+        try:
+            success = job.subproject.do_update()
+        except Exception as error:
+            LOGGER.error('failed to update %s', job.subproject)
+            report_error(error, sys.exc_info())
+        finally:
+            job.delete()
+        with self.lock:
+            self.stats.add_job(job, success, timezone.now())
+
+    def process(self):
+        """Process single job.
+
+        Returns whether there was a job to process.
+        """
+        job = UpdateJob.objects.fetch(self.stale_timeout)
+        if job is None:
+            return False
+        self.process_job(job)
+        return True
+
+    def work(self, stop, poll_interval, once):
+        """Process jobs until stopped."""
+        while not stop.is_set():
+            if not self.process():
+                if once:
+                    break
+                stop.wait(poll_interval)
+
+    def work_thread(self, stop, poll_interval, once):
+        try:
+            self.work(stop, poll_interval, once)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def get_queue_status():
+        """Return number of pending jobs and age of the oldest one."""
+        queue = UpdateJob.objects.pending().order_by('timestamp')
+        count = queue.count()
+        if not count:
+            return 0, 0.0
+        lag = timezone.now() - queue[0].timestamp
+        return count, lag.total_seconds()
+
+    def report_stats(self, report):
+        with self.lock:
+            report(self)
+            self.stats = UpdaterStats()
+
+    def run(self, poll_interval=1, report_interval=60, report=None,
+            once=False):
+        """Process jobs until interrupted.
+
+        With once set, processing ends when the queue is empty.
+        """
+        stop = threading.Event()
+        if self.threads <= 1:
+            workers = []
+        else:
+            workers = [
+                threading.Thread(
+                    target=self.work_thread,
+                    args=(stop, poll_interval, once)
+                )
+                for dummy in range(self.threads)
+            ]
+        for worker in workers:
+            worker.start()
+        last_report = time.time()
+        try:
+            while True:
+                if workers:
+                    if not any(worker.is_alive() for worker in workers):
+                        break
+                    time.sleep(min(poll_interval, report_interval))
+                elif not self.process():
+                    if once:
+                        break
+                    time.sleep(poll_interval)
+                if (report is not None and
+                        time.time() - last_report >= report_interval):
+                    self.report_stats(report)
+                    last_report = time.time()
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+        if report is not None:
+            self.report_stats(report)
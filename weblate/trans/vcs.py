@@ -21,6 +21,7 @@
 from __future__ import unicode_literals
 # For some reasons, this fails in PyLint sometimes...
 # pylint: disable=E0611,F0401
+from datetime import datetime
 from distutils.version import LooseVersion
 import email.utils
 import hashlib
@@ -29,10 +30,15 @@ import os.path
 import re
 import subprocess
 import logging
+import threading
+import weakref
 
 from dateutil import parser
+from dateutil.tz import tzoffset
 
 from django.conf import settings
+from django.core.signals import request_finished
+from django.dispatch import receiver
 from django.utils.encoding import force_text
 
 import six
@@ -49,6 +55,10 @@ LOGGER = logging.getLogger('weblate-vcs')
 VCS_REGISTRY = {}
 VCS_CHOICES = []
 
+# Running long lived processes reading repositories
+CAT_FILES = weakref.WeakSet()
+CAT_FILES_LOCK = threading.RLock()
+
 
 def register_vcs(vcs):
     """Register VCS if it's supported."""
@@ -108,6 +118,9 @@ class Repository(object):
             self.branch = branch
         self.component = component
         self.last_output = ''
+        # Object hashes listing and revision it was made for
+        self._object_hashes = None
+        self._object_hashes_revision = None
         self.lock = FileLock(
             self.path.rstrip('/').rstrip('\\') + '.lock',
             timeout=120
@@ -119,6 +132,10 @@ class Repository(object):
     def log(cls, message):
         return LOGGER.debug('weblate: %s: %s', cls._cmd, message)
 
+    def close(self):
+        """Release resources held by the repository object."""
+        return
+
     def check_config(self):
         """Check VCS configuration."""
         raise NotImplementedError()
@@ -185,7 +202,7 @@ class Repository(object):
 
     def execute(self, args, needs_lock=True):
         """Execute command and caches its output."""
-        if needs_lock and not self.lock.is_locked:
+        if needs_lock and not self.lock.is_exclusive:
             raise RuntimeWarning('Repository operation without lock held!')
         self.last_output = self._popen(args, self.path)
         return self.last_output
@@ -228,10 +245,11 @@ class Repository(object):
 
     def status(self):
         """Return status of the repository."""
-        return self.execute(
-            self._cmd_status,
-            needs_lock=False
-        )
+        with self.lock.shared:
+            return self.execute(
+                self._cmd_status,
+                needs_lock=False
+            )
 
     def push(self):
         """Push given branch to remote repository."""
@@ -318,6 +336,32 @@ class Repository(object):
         """Remove files and creates new revision."""
         raise NotImplementedError()
 
+    def _get_object_hashes(self):
+        """Return dictionary of hashes of all files in the VCS.
+
+        Returns None if the VCS does not support listing them at once.
+        """
+        return None
+
+    def get_object_hashes(self):
+        """Return dictionary of hashes of all files in current revision.
+
+        The listing is done at once and cached for the current revision.
+        """
+        with self.lock.shared:
+            revision = self.last_revision
+            if self._object_hashes_revision != revision:
+                self._object_hashes = self._get_object_hashes()
+                self._object_hashes_revision = revision
+        return self._object_hashes
+
+    def get_changed_files(self, compare_to):
+        """Return list of files changed since given revision.
+
+        Returns None if the VCS can not list them.
+        """
+        return None
+
     def get_object_hash(self, path):
         """Return hash of object in the VCS in a way compatible with Git."""
         real_path = os.path.join(
@@ -326,7 +370,7 @@ class Repository(object):
         )
         objhash = hashlib.sha1()
 
-        with open(real_path, 'rb') as handle:
+        with self.lock.shared, open(real_path, 'rb') as handle:
             data = handle.read()
             objhash.update('blob {0}\0'.format(len(data)).encode('ascii'))
             objhash.update(data)
@@ -363,22 +407,152 @@ class Repository(object):
         return merge_driver
 
 
+@receiver(request_finished)
+def close_repositories(sender=None, **kwargs):
+    """Terminate all long lived processes reading repositories."""
+    with CAT_FILES_LOCK:
+        cat_files = list(CAT_FILES)
+    for cat_file in cat_files:
+        cat_file.close()
+
+
+class GitCatFile(object):
+    """Long lived git cat-file process answering object queries.
+
+    The process is started on first query and reused for following ones,
+    it has to be closed whenever repository content changes. The repository
+    is referenced weakly, so the process is terminated once the repository
+    object is dropped.
+    """
+    def __init__(self, repository, mode='--batch'):
+        self._repository = weakref.ref(repository)
+        self.mode = mode
+        self.process = None
+        self.lock = threading.Lock()
+
+    def __del__(self):
+        self.close()
+
+    @property
+    def repository(self):
+        return self._repository()
+
+    def start(self):
+        """Start the cat-file process."""
+        with open(os.devnull, 'wb') as devnull:
+            self.process = subprocess.Popen(
+                [self.repository._cmd, 'cat-file', self.mode],
+                cwd=self.repository.path,
+                env=self.repository._getenv(),
+                stdout=subprocess.PIPE,
+                stderr=devnull,
+                stdin=subprocess.PIPE,
+            )
+        with CAT_FILES_LOCK:
+            CAT_FILES.add(self)
+        self.repository.log('cat-file {0} [started]'.format(self.mode))
+
+    def close(self):
+        """Terminate the cat-file process."""
+        with self.lock:
+            if self.process is not None:
+                try:
+                    self.process.stdin.close()
+                    self.process.stdout.close()
+                except (IOError, OSError):
+                    pass
+                self.process.wait()
+                self.process = None
+        with CAT_FILES_LOCK:
+            CAT_FILES.discard(self)
+
+    def query(self, name):
+        """Return object hash, type and content (for --batch mode)."""
+        if '\n' in name:
+            raise RepositoryException(
+                128, 'Invalid object name: {0}'.format(name), ''
+            )
+        with self.lock:
+            if self.process is None or self.process.poll() is not None:
+                self.start()
+            try:
+                self.process.stdin.write(name.encode('utf-8') + b'\n')
+                self.process.stdin.flush()
+                header = self.process.stdout.readline().decode('utf-8')
+            except (IOError, OSError):
+                header = ''
+            if not header:
+                self.process = None
+                raise RepositoryException(
+                    1, 'git cat-file terminated unexpectedly', ''
+                )
+            if header.endswith((' missing\n', ' ambiguous\n')):
+                raise RepositoryException(
+                    128, 'Invalid object name: {0}'.format(name), ''
+                )
+            objhash, objtype, size = header.split()
+            content = None
+            if self.mode == '--batch':
+                # Content is followed by newline
+                content = self.process.stdout.read(int(size) + 1)[:-1]
+            return objhash, objtype, content
+
+
 @register_vcs
 class GitRepository(Repository):
     """Repository implementation for Git."""
     _cmd = 'git'
-    _cmd_last_revision = [
-        'log', '-n', '1', '--format=format:%H', 'HEAD'
-    ]
-    _cmd_last_remote_revision = [
-        'log', '-n', '1', '--format=format:%H', '@{upstream}'
-    ]
     _cmd_update_remote = ['fetch', 'origin']
     _cmd_push = ['push', 'origin']
     name = 'Git'
     req_version = '1.6'
     default_branch = 'master'
 
+    def __init__(self, path, branch=None, component=None):
+        # Long lived processes used for reading repository objects
+        self._cat_file = GitCatFile(self, '--batch')
+        self._cat_file_check = GitCatFile(self, '--batch-check')
+        super(GitRepository, self).__init__(path, branch, component)
+
+    def close(self):
+        """Terminate long lived processes reading the repository."""
+        self._cat_file.close()
+        self._cat_file_check.close()
+
+    def _invalidate(self):
+        """Drop cached revision and reading processes after change."""
+        self._last_revision = None
+        self.close()
+
+    def resolve_revision(self, name):
+        """Return hash of the object matching given revision name."""
+        return self._cat_file_check.query(name)[0]
+
+    @property
+    def last_revision(self):
+        """Return last local revision."""
+        if self._last_revision is None:
+            self._last_revision = self.resolve_revision('HEAD')
+        return self._last_revision
+
+    @property
+    def last_remote_revision(self):
+        """Return last remote revision."""
+        if self._last_remote_revision is None:
+            self._last_remote_revision = self.resolve_revision(
+                self.get_remote_branch_name()
+            )
+        return self._last_remote_revision
+
+    def get_remote_branch_name(self):
+        """Return the remote branch name."""
+        return 'origin/{0}'.format(self.branch)
+
+    def update_remote(self):
+        """Update remote repository."""
+        super(GitRepository, self).update_remote()
+        self.close()
+
     def is_valid(self):
         """Check whether this is a valid repository."""
         return (
@@ -422,7 +596,7 @@ class GitRepository(Repository):
     def reset(self):
         """Reset working copy to match remote branch."""
         self.execute(['reset', '--hard', 'origin/{0}'.format(self.branch)])
-        self._last_revision = None
+        self._invalidate()
 
     def rebase(self, abort=False):
         """Rebase working copy on top of remote branch."""
@@ -430,6 +604,7 @@ class GitRepository(Repository):
             self.execute(['rebase', '--abort'])
         else:
             self.execute(['rebase', 'origin/{0}'.format(self.branch)])
+        self._invalidate()
 
     def merge(self, abort=False):
         """Merge remote branch or reverts the merge."""
@@ -437,6 +612,7 @@ class GitRepository(Repository):
             self.execute(['merge', '--abort'])
         else:
             self.execute(['merge', 'origin/{0}'.format(self.branch)])
+        self._invalidate()
 
     def needs_commit(self, filename=None):
         """Check whether repository needs commit."""
@@ -449,46 +625,46 @@ class GitRepository(Repository):
 
     def get_revision_info(self, revision):
         """Return dictionary with detailed revision information."""
-        text = self.execute(
-            [
-                'log',
-                '-1',
-                '--format=fuller',
-                '--date=rfc',
-                '--abbrev-commit',
-                revision
-            ],
-            needs_lock=False
+        objhash, objtype, content = self._cat_file.query(
+            '{0}^{{commit}}'.format(revision)
         )
+        headers, text = content.split(b'\n\n', 1)
 
         result = {
             'revision': revision,
+            'shortrevision': objhash[:7],
         }
+        parents = []
 
-        message = []
+        for line in headers.decode('utf-8', 'replace').splitlines():
+            # Continuation of multiline header such as gpgsig
+            if line.startswith(' '):
+                continue
+            name, value = line.split(' ', 1)
+            if name == 'parent':
+                parents.append(value[:7])
+            elif name in ('author', 'committer'):
+                # Git log uses commit as name for committer
+                name = name[:6]
+                value, timestamp, offset = value.rsplit(' ', 2)
+                offset = (
+                    int(offset[1:3]) * 3600 + int(offset[3:5]) * 60
+                ) * (-1 if offset[0] == '-' else 1)
+                result['{0}date'.format(name)] = datetime.fromtimestamp(
+                    int(timestamp), tzoffset(None, offset)
+                )
+                result[name] = value
+                parsed = email.utils.parseaddr(value)
+                result['{0}_name'.format(name)] = parsed[0]
+                result['{0}_email'.format(name)] = parsed[1]
 
-        header = True
+        if len(parents) > 1:
+            result['merge'] = ' '.join(parents)
 
-        for line in text.splitlines():
-            if header:
-                if not line:
-                    header = False
-                elif line.startswith('commit'):
-                    result['shortrevision'] = line.split()[1]
-                else:
-                    name, value = line.strip().split(':', 1)
-                    value = value.strip()
-                    name = name.lower()
-                    if 'date' in name:
-                        result[name] = parser.parse(value)
-                    else:
-                        result[name] = value
-                        if '@' in value:
-                            parsed = email.utils.parseaddr(value)
-                            result['{0}_name'.format(name)] = parsed[0]
-                            result['{0}_email'.format(name)] = parsed[1]
-            else:
-                message.append(line.strip())
+        message = [
+            line.strip()
+            for line in text.decode('utf-8', 'replace').splitlines()
+        ]
 
         result['message'] = '\n'.join(message)
         result['summary'] = message[0]
@@ -502,20 +678,31 @@ class GitRepository(Repository):
             needs_lock=False
         )
 
+    def _is_synced(self):
+        """Check whether local and remote branch point to same revision."""
+        return (
+            self.resolve_revision('HEAD') ==
+            self.resolve_revision(self.get_remote_branch_name())
+        )
+
     def needs_merge(self):
         """Check whether repository needs merge with upstream
         (is missing some revisions).
         """
+        if self._is_synced():
+            return False
         return self._log_revisions(
-            '..origin/{0}'.format(self.branch)
+            '..{0}'.format(self.get_remote_branch_name())
         ) != ''
 
     def needs_push(self):
         """Check whether repository needs push to upstream
         (has additional revisions).
         """
+        if self._is_synced():
+            return False
         return self._log_revisions(
-            'origin/{0}..'.format(self.branch)
+            '{0}..'.format(self.get_remote_branch_name())
         ) != ''
 
     @classmethod
@@ -541,26 +728,45 @@ class GitRepository(Repository):
         # Execute it
         self.execute(cmd)
         # Clean cache
-        self._last_revision = None
+        self._invalidate()
 
     def remove(self, files, message, author=None):
         """Remove files and creates new revision."""
         self.execute(['rm', '--force', '--'] + files)
         self.commit(message, author)
 
+    def _get_object_hashes(self):
+        """Return dictionary of hashes of all files in the VCS."""
+        result = {}
+        listing = self.execute(
+            ['ls-tree', '-r', '-z', 'HEAD'],
+            needs_lock=False
+        )
+        for item in listing.split('\0'):
+            if not item:
+                continue
+            info, filename = item.split('\t', 1)
+            result[filename] = info.split()[2]
+        return result
+
+    def get_changed_files(self, compare_to):
+        """Return list of files changed since given revision."""
+        output = self.execute(
+            ['diff', '--name-only', '--no-renames', '-z', compare_to, 'HEAD'],
+            needs_lock=False
+        )
+        return [filename for filename in output.split('\0') if filename]
+
     def get_object_hash(self, path):
         """Return hash of object in the VCS."""
         real_path = self.resolve_symlinks(path)
 
-        git_hash = self.execute(
-            ['ls-tree', 'HEAD', real_path],
-            needs_lock=False
-        )
+        git_hash = self.get_object_hashes().get(real_path)
 
-        if not git_hash:
+        if git_hash is None:
             return super(GitRepository, self).get_object_hash(path)
 
-        return git_hash.split()[2]
+        return git_hash
 
     def configure_remote(self, pull_url, push_url, branch):
         """Configure remote repository."""
@@ -627,6 +833,7 @@ class GitRepository(Repository):
         # Checkout
         self.execute(['checkout', branch])
         self.branch = branch
+        self._invalidate()
 
     def describe(self):
         """Verbosely describes current revision."""
@@ -722,40 +929,12 @@ class SubversionRepository(GitRepository):
             self.execute(['rebase', '--abort'])
         else:
             self.execute(['svn', 'rebase'])
-
-    def needs_merge(self):
-        """Check whether repository needs merge with upstream
-        (is missing some revisions).
-        """
-        return self._log_revisions(
-            '..{0}'.format(self.get_remote_branch_name())
-        ) != ''
-
-    def needs_push(self):
-        """Check whether repository needs push to upstream
-        (has additional revisions).
-        """
-        return self._log_revisions(
-            '{0}..'.format(self.get_remote_branch_name())
-        ) != ''
+        self._invalidate()
 
     def reset(self):
         """Reset working copy to match remote branch."""
         self.execute(['reset', '--hard', self.get_remote_branch_name()])
-        self._last_revision = None
-
-    @property
-    def last_remote_revision(self):
-        """Return last remote revision."""
-        if self._last_remote_revision is None:
-            self._last_remote_revision = self.execute(
-                [
-                    'log', '-n', '1', '--format=format:%H',
-                    self.get_remote_branch_name()
-                ],
-                needs_lock=False
-            )
-        return self._last_remote_revision
+        self._invalidate()
 
     def get_remote_branch_name(self):
         """Return the remote branch name: trunk if local branch is master,
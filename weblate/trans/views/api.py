@@ -22,7 +22,6 @@ import csv
 import json
 import re
 import sys
-import threading
 
 import six
 
@@ -92,8 +91,7 @@ def register_hook(handler):
 def perform_update(obj):
     """Trigger update of given object."""
     if settings.BACKGROUND_HOOKS:
-        thread = threading.Thread(target=obj.do_update)
-        thread.start()
+        obj.queue_update()
     else:
         obj.do_update()
 
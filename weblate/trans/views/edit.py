@@ -28,7 +28,9 @@ from django.shortcuts import get_object_or_404, redirect
 from django.views.decorators.http import require_POST
 from django.utils.translation import ugettext as _, ungettext
 from django.utils.encoding import force_text
-from django.http import HttpResponseRedirect, HttpResponse
+from django.conf import settings
+from django.core.urlresolvers import reverse
+from django.http import HttpResponseRedirect, HttpResponse, JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.utils import formats
 from django.core.exceptions import PermissionDenied
@@ -36,7 +38,7 @@ from django.core.exceptions import PermissionDenied
 from weblate.utils import messages
 from weblate.permissions.helpers import check_access
 from weblate.trans.models import (
-    Unit, Change, Comment, Suggestion, Dictionary,
+    Unit, Change, Comment, Suggestion, Dictionary, ReplaceJob,
     get_related_units,
 )
 from weblate.trans.autofixes import fix_target
@@ -51,7 +53,12 @@ from weblate.trans.views.helper import (
 )
 from weblate.trans.checks import CHECKS
 from weblate.trans.util import join_plural, render
-from weblate.trans.autotranslate import auto_translate
+from weblate.trans.autotranslate import auto_translate, machine_translate
+from weblate.trans.machine import MACHINE_TRANSLATION_SERVICES
+from weblate.trans.machine.base import MachineTranslationError
+from weblate.trans.replace import (
+    search_replace as replace_units, start_search_replace,
+)
 from weblate.permissions.helpers import (
     can_translate, can_suggest, can_accept_suggestion, can_delete_suggestion,
     can_vote_suggestion, can_delete_comment, can_automatic_translation,
@@ -615,13 +622,28 @@ def auto_translation(request, project, subproject, lang):
         messages.error(request, _('Failed to process form!'))
         return redirect(translation)
 
-    updated = auto_translate(
-        request.user,
-        translation,
-        autoform.cleaned_data['subproject'],
-        autoform.cleaned_data['inconsistent'],
-        autoform.cleaned_data['overwrite']
-    )
+    if autoform.cleaned_data['machine']:
+        try:
+            updated = machine_translate(
+                request.user,
+                translation,
+                MACHINE_TRANSLATION_SERVICES[autoform.cleaned_data['machine']],
+                autoform.cleaned_data['overwrite']
+            )
+        except MachineTranslationError as error:
+            messages.error(
+                request,
+                _('Machine translation failed: %s') % force_text(error)
+            )
+            return redirect(translation)
+    else:
+        updated = auto_translate(
+            request.user,
+            translation,
+            autoform.cleaned_data['subproject'],
+            autoform.cleaned_data['inconsistent'],
+            autoform.cleaned_data['overwrite']
+        )
 
     import_message(
         request, updated,
@@ -839,12 +861,20 @@ def search_replace(request, project, subproject=None, lang=None):
     search_text = form.cleaned_data['search']
     replacement = form.cleaned_data['replacement']
 
-    matching = unit_set.filter(target__contains=search_text)
-    updated = matching.count()
+    if settings.BACKGROUND_REPLACE:
+        job_id = start_search_replace(
+            request.user, unit_set, search_text, replacement
+        )
+        messages.info(
+            request,
+            _(
+                'Search and replace is running in background, '
+                'you can watch its progress at %s.'
+            ) % reverse('replace-progress', kwargs={'job_id': job_id})
+        )
+        return redirect(obj)
 
-    for unit in matching.iterator():
-        unit.target = unit.target.replace(search_text, replacement)
-        unit.save_backend(request, change_action=Change.ACTION_REPLACE)
+    updated = replace_units(request, unit_set, search_text, replacement)
 
     import_message(
         request, updated,
@@ -857,3 +887,9 @@ def search_replace(request, project, subproject=None, lang=None):
     )
 
     return redirect(obj)
+
+
+@login_required
+def search_replace_progress(request, job_id):
+    job = get_object_or_404(ReplaceJob, pk=job_id, user=request.user)
+    return JsonResponse(job.get_progress())
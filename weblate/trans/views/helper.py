@@ -123,6 +123,9 @@ def download_translation_file(translation, fmt=None):
             )
         )
 
+    # Make sure all changes are in the file
+    translation.write_pending()
+
     srcfilename = translation.get_filename()
 
     # Construct file name (do not use real filename as it is usually not
@@ -18,9 +18,17 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import json
+from multiprocessing.pool import ThreadPool
+import threading
+import time
+
 from django.shortcuts import render, get_object_or_404
+from django.conf import settings
+from django.db import connection
 from django.http import (
     HttpResponse, HttpResponseBadRequest, Http404, JsonResponse,
+    StreamingHttpResponse,
 )
 from django.core.exceptions import PermissionDenied
 from django.utils.encoding import force_text
@@ -40,23 +48,31 @@ from weblate.permissions.helpers import (
 )
 from weblate.utils.hash import checksum_to_hash
 
+from six.moves import queue
 from six.moves.urllib.parse import urlencode
 
+# Thread pool for querying machine translation services
+MT_POOL = None
+MT_POOL_LOCK = threading.Lock()
 
-def translate(request, unit_id):
-    """AJAX handler for translating."""
-    unit = get_object_or_404(Unit, pk=int(unit_id))
+
+def get_mt_unit(request, unit_id):
+    """Return unit for machine translation checking permissions."""
+    unit = get_object_or_404(
+        Unit.objects.select_related(
+            'translation__language',
+            'translation__subproject__project__source_language',
+        ),
+        pk=int(unit_id)
+    )
     check_access(request, unit.translation.subproject.project)
     if not can_use_mt(request.user, unit.translation):
         raise PermissionDenied()
+    return unit
 
-    service_name = request.GET.get('service', 'INVALID')
-
-    if service_name not in MACHINE_TRANSLATION_SERVICES:
-        return HttpResponseBadRequest('Invalid service specified')
-
-    translation_service = MACHINE_TRANSLATION_SERVICES[service_name]
 
+def get_mt_response(translation_service, unit, user):
+    """Return response with translations from single service."""
     # Error response
     response = {
         'responseStatus': 500,
@@ -72,7 +88,7 @@ def translate(request, unit_id):
             unit.translation.language.code,
             unit.get_source_plurals()[0],
             unit,
-            request.user
+            user
         )
         response['responseStatus'] = 200
     except Exception as exc:
@@ -81,8 +97,119 @@ def translate(request, unit_id):
             str(exc)
         )
 
+    return response
+
+
+def translate(request, unit_id):
+    """AJAX handler for translating."""
+    unit = get_mt_unit(request, unit_id)
+
+    service_name = request.GET.get('service', 'INVALID')
+
+    if service_name not in MACHINE_TRANSLATION_SERVICES:
+        return HttpResponseBadRequest('Invalid service specified')
+
+    translation_service = MACHINE_TRANSLATION_SERVICES[service_name]
+
     return JsonResponse(
-        data=response,
+        data=get_mt_response(translation_service, unit, request.user),
+    )
+
+
+def get_mt_pool():
+    """Return thread pool for querying remote machine translation services.
+
+    The pool is shared by all requests, so that the number of threads
+    is bounded by MT_SERVICES_THREADS.
+    """
+    global MT_POOL
+    with MT_POOL_LOCK:
+        if MT_POOL is None:
+            MT_POOL = ThreadPool(settings.MT_SERVICES_THREADS)
+        return MT_POOL
+
+
+def translate_all_stream(unit, user):
+    """Query all machine translation services concurrently.
+
+    Yields JSON encoded response for each service as soon as it is
+    available, leaving out translations already yielded. Services which
+    do not respond within MT_SERVICES_TIMEOUT are reported as failed.
+    """
+    results = queue.Queue()
+    pending = {}
+    deadline = time.time() + settings.MT_SERVICES_TIMEOUT
+
+    def worker(service):
+        # Do not query the service when the results would be discarded
+        if time.time() >= deadline:
+            return
+        try:
+            results.put(get_mt_response(service, unit, user))
+        finally:
+            # The thread has own database connection
+            connection.close()
+
+    pool = get_mt_pool()
+    local = []
+    for service_name in MACHINE_TRANSLATION_SERVICES:
+        service = MACHINE_TRANSLATION_SERVICES[service_name]
+        pending[service.name] = service
+        if service.remote:
+            pool.apply_async(worker, (service,))
+        else:
+            local.append(service)
+
+    # Services using the database do not wait on network and need the
+    # request database connection, they are queried once all network
+    # requests are queued
+    for service in local:
+        if time.time() >= deadline:
+            break
+        results.put(get_mt_response(service, unit, user))
+
+    seen = set()
+    while pending:
+        try:
+            response = results.get(
+                timeout=max(0, deadline - time.time())
+            )
+        except queue.Empty:
+            break
+        del pending[response['service']]
+        translations = []
+        for item in sorted(
+                response['translations'],
+                key=lambda item: -item['quality']):
+            if item['text'] in seen:
+                continue
+            seen.add(item['text'])
+            translations.append(item)
+        response['translations'] = translations
+        yield json.dumps(response) + '\n'
+
+    for name in sorted(pending):
+        yield json.dumps({
+            'responseStatus': 504,
+            'service': name,
+            'responseDetails': 'Timeout',
+            'translations': [],
+            'lang': unit.translation.language.code,
+            'dir': unit.translation.language.direction,
+        }) + '\n'
+
+
+def translate_all(request, unit_id):
+    """AJAX handler for translating using all services.
+
+    The response consists of JSON encoded lines with the same content as
+    the translate view returns, streamed as the services respond.
+    """
+    unit = get_mt_unit(request, unit_id)
+
+    return StreamingHttpResponse(
+        translate_all_stream(unit, request.user),
+        content_type='application/x-ndjson',
     )
 
 
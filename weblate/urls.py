@@ -238,6 +238,11 @@ urlpatterns = [
         weblate.trans.views.edit.search_replace,
         name='replace',
     ),
+    url(
+        r'^replace-progress/(?P<job_id>[0-9]+)/$',
+        weblate.trans.views.edit.search_replace_progress,
+        name='replace-progress',
+    ),
     url(
         r'^credits/' + SUBPROJECT + '$',
         weblate.trans.views.reports.get_credits,
@@ -711,6 +716,11 @@ urlpatterns = [
         weblate.trans.views.js.translate,
         name='js-translate',
     ),
+    url(
+        r'^js/translate-all/(?P<unit_id>[0-9]+)/$',
+        weblate.trans.views.js.translate_all,
+        name='js-translate-all',
+    ),
     url(
         r'^js/changes/(?P<unit_id>[0-9]+)/$',
         weblate.trans.views.js.get_unit_changes,